@@ -2,7 +2,11 @@ from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 import secrets
+import time
+
+from app.cache import token_payload_cache
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -33,12 +37,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Decode and verify a JWT token."""
+    payload = token_payload_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    # Never serve a payload from cache past the token's own expiry
+    token_payload_cache.set(token, payload, ttl_seconds=token_ttl(payload))
+    return payload
+
+def token_ttl(payload: dict) -> float:
+    """Seconds a decoded token may be cached for."""
+    remaining = payload.get("exp", 0) - time.time()
+    return max(0.0, min(token_payload_cache.ttl_seconds, remaining))
+
+# Leading characters of an API key kept in clear text so users can tell keys apart
+API_KEY_PREFIX_LENGTH = 10
 
 def generate_api_key() -> str:
     """Generate a secure API key."""
     return f"sk_{secrets.token_urlsafe(32)}"
+
+def hash_api_key(key: str) -> str:
+    """Digest an API key for storage and lookup.
+
+    Keys are 256-bit random tokens, so a fast unsalted hash is sufficient;
+    it keeps lookups to a single indexed equality match.
+    """
+    return hashlib.sha256(key.encode()).hexdigest()
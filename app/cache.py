@@ -0,0 +1,88 @@
+"""
+In-process caches for hot read paths.
+Entries are bounded by count (LRU) and by age (TTL). Caches are per
+process, so the TTL also bounds how stale a worker can be after a change
+made through another worker.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+API_KEY_CACHE_SIZE = int(os.getenv("API_KEY_CACHE_SIZE", "10000"))
+API_KEY_CACHE_TTL_SECONDS = float(os.getenv("API_KEY_CACHE_TTL_SECONDS", "60"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "30"))
+# 0 disables the analytics cache
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "10000"))
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "10"))
+# 0 disables the user report cache
+USER_REPORT_CACHE_SIZE = int(os.getenv("USER_REPORT_CACHE_SIZE", "10000"))
+USER_REPORT_CACHE_TTL_SECONDS = float(os.getenv("USER_REPORT_CACHE_TTL_SECONDS", "60"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Remove every entry for which predicate(key, value) is true."""
+        with self._lock:
+            keys = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Shared cache instances
+# Resolved API keys by key digest: {"api_key_id", "organization_id", "is_active", "expires_at", "organization"}
+api_key_cache = TTLCache(maxsize=API_KEY_CACHE_SIZE, ttl_seconds=API_KEY_CACHE_TTL_SECONDS)
+# Decoded JWT payloads by token
+token_payload_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl_seconds=TOKEN_CACHE_TTL_SECONDS)
+# Authenticated user and organization column snapshots by token
+principal_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl_seconds=TOKEN_CACHE_TTL_SECONDS)
+# Item analytics results by organization id
+analytics_cache = TTLCache(maxsize=ANALYTICS_CACHE_SIZE, ttl_seconds=ANALYTICS_CACHE_TTL_SECONDS)
+# User reports by (organization id, user id)
+user_report_cache = TTLCache(maxsize=USER_REPORT_CACHE_SIZE, ttl_seconds=USER_REPORT_CACHE_TTL_SECONDS)
@@ -1,47 +1,96 @@
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, Request, status, Header, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.ext.asyncio import AsyncSession
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, Organization, APIKey, UserRole
-from app.auth import decode_access_token
+from app.auth import decode_access_token, hash_api_key, token_ttl
+from app.cache import api_key_cache, principal_cache
+from app.writers import last_seen_writer
+from app.pagination import Cursor, decode_cursor
 
 security = HTTPBearer()
 
+# These dependencies run on the event loop; only use the AsyncSession here
+
+def _snapshot(obj) -> Mapping[str, Any]:
+    """Read-only copy of an ORM object's column values, safe to cache and share."""
+    return MappingProxyType({attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs})
+
+def _restore(model, values: Optional[Mapping[str, Any]]):
+    """A fresh detached instance built from a snapshot, so requests never share ORM objects.
+
+    Relationships other than those set by the caller are unloaded and raise
+    DetachedInstanceError if touched, rather than lazy-loading.
+    """
+    if values is None:
+        return None
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return obj
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    """Get the current authenticated user from JWT token."""
+    """Get the current authenticated user from JWT token.
+
+    The user and their organization are loaded in one query and cached by
+    token for a short time, as read-only column snapshots; each request gets
+    its own detached User built from them. Services invalidate the cache on
+    deactivation. The organization id is left on request.state for usage
+    logging.
+    """
     token = credentials.credentials
-    payload = decode_access_token(token)
-    
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    principal = principal_cache.get(token)
     
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+    if principal is None:
+        payload = decode_access_token(token)
+        
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        try:
+            user_id = int(payload["sub"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+        
+        result = await db.execute(
+            select(User).options(joinedload(User.organization)).where(User.id == user_id)
         )
+        user = result.scalars().first()
+        if user is None or not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found or inactive",
+            )
+        
+        principal = {
+            "user": _snapshot(user),
+            "organization": _snapshot(user.organization) if user.organization else None,
+        }
+        principal_cache.set(token, principal, ttl_seconds=token_ttl(payload))
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
-        )
+    user = _restore(User, principal["user"])
+    set_committed_value(user, "organization", _restore(Organization, principal["organization"]))
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login (buffered; flushed in batches by the writer)
+    last_seen_writer.touch_user(user.id)
+    request.state.organization_id = user.organization_id
     
     return user
 
@@ -54,13 +103,10 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_organization(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user)
 ) -> Organization:
-    """Get the organization of the current user."""
-    org = db.query(Organization).filter(
-        Organization.id == current_user.organization_id
-    ).first()
+    """Get the organization of the current user (loaded with the user)."""
+    org = current_user.organization
     
     if not org or not org.is_active:
         raise HTTPException(
@@ -70,6 +116,18 @@ async def get_current_organization(
     
     return org
 
+def get_cursor(cursor: Optional[str] = Query(None)) -> Optional[Cursor]:
+    """Decode the ?cursor= pagination token."""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
 def require_role(required_role: UserRole):
     """Dependency to check if user has required role."""
     async def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
@@ -90,41 +148,62 @@ def require_role(required_role: UserRole):
     return role_checker
 
 async def verify_api_key(
+    request: Request,
     x_api_key: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Organization:
-    """Verify API key and return associated organization."""
+    """Verify API key and return associated organization (also left on request.state)."""
     if not x_api_key:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API key required"
         )
     
-    api_key = db.query(APIKey).filter(
-        APIKey.key == x_api_key,
-        APIKey.is_active == True
-    ).first()
+    # Resolved keys are cached by digest, so steady-state calls skip the database
+    key_hash = hash_api_key(x_api_key)
+    cached = api_key_cache.get(key_hash)
+    
+    if cached is None:
+        result = await db.execute(
+            select(APIKey, Organization)
+            .outerjoin(Organization, Organization.id == APIKey.organization_id)
+            .where(APIKey.key_hash == key_hash)
+        )
+        row = result.first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key"
+            )
+        
+        api_key, org = row
+        cached = {
+            "api_key_id": api_key.id,
+            "organization_id": api_key.organization_id,
+            "is_active": api_key.is_active,
+            "expires_at": api_key.expires_at,
+            "organization": _snapshot(org) if org else None,
+        }
+        api_key_cache.set(key_hash, cached)
     
-    if not api_key:
+    if not cached["is_active"]:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key"
         )
     
     # Check expiration
-    if api_key.expires_at and api_key.expires_at < datetime.utcnow():
+    if cached["expires_at"] and cached["expires_at"] < datetime.utcnow():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="API key expired"
         )
     
-    # Update last used
-    api_key.last_used_at = datetime.utcnow()
-    db.commit()
+    # Update last used (buffered; flushed in batches by the writer)
+    last_seen_writer.touch_api_key(cached["api_key_id"])
+    request.state.organization_id = cached["organization_id"]
     
-    org = db.query(Organization).filter(
-        Organization.id == api_key.organization_id
-    ).first()
+    org = _restore(Organization, cached["organization"])
     
     if not org or not org.is_active:
         raise HTTPException(
@@ -1,33 +1,358 @@
 """
 Export service for generating reports and exporting data in various formats.
-Supports CSV, JSON, and summary reports for items, teams, and analytics.
+Supports CSV, JSON, NDJSON, Parquet/Arrow (with pyarrow installed), and
+summary reports for items, teams, and analytics.
 """
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional, Iterator, Callable, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session, selectinload
+import copy
 import csv
 import json
 import io
+import os
 from collections import defaultdict
 
-from app.models import Item, User, Team, Organization, Comment, ActivityLog, ItemStatus, PriorityLevel
-from app.services import get_items, get_item_analytics
+try:
+    import orjson
+except ImportError:  # optional: faster NDJSON encoding
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: Parquet/Arrow exports
+    pa = pq = None
+
+from app.database import SessionLocal
+from app.models import (
+    Item, ItemTombstone, User, Team, Organization, Comment, ActivityLog, ItemStatus, PriorityLevel,
+    item_assignees, user_teams
+)
+from app.cache import user_report_cache, USER_REPORT_CACHE_TTL_SECONDS
+from app.services import get_item_analytics
+
+# Rows fetched per round trip by streaming exports; relationships are
+# batch-loaded once per chunk
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+# Delta exports stop this far behind now, so rows from transactions still
+# committing land in the next pull instead of being skipped
+EXPORT_DELTA_LAG_SECONDS = int(os.getenv("EXPORT_DELTA_LAG_SECONDS", "5"))
+# Tombstones of deleted items are kept this long; older cursors need a full export
+EXPORT_TOMBSTONE_RETENTION_DAYS = int(os.getenv("EXPORT_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# (since, until] of a delta export
+DeltaWindow = Tuple[datetime, datetime]
+
+ITEM_CSV_HEADER = [
+    'ID', 'Title', 'Description', 'Status', 'Priority',
+    'Team ID', 'Created By', 'Assignees', 'Tags',
+    'Created At', 'Due Date', 'Completed At',
+    'Estimated Hours', 'Actual Hours'
+]
+
+ACTIVITY_CSV_HEADER = [
+    'ID', 'Action', 'Entity Type', 'Entity ID',
+    'User', 'Item ID', 'Details', 'Created At'
+]
+
+# Columnar export formats: media type and file extension
+COLUMNAR_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+}
+
+# Fixed dictionaries, so every record batch shares them
+_STATUS_VALUES = [s.value for s in ItemStatus]
+_PRIORITY_VALUES = [p.value for p in PriorityLevel]
+
+
+def _format_datetime(value: Optional[datetime]) -> str:
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _item_dict(item: Item, include_comments: bool = False) -> Dict[str, Any]:
+    """JSON-ready representation of an item with its related records."""
+    item_dict = {
+        'id': item.id,
+        'title': item.title,
+        'description': item.description,
+        'status': item.status.value,
+        'priority': item.priority.value,
+        'team_id': item.team_id,
+        'parent_item_id': item.parent_item_id,
+        'created_by': {
+            'id': item.creator.id,
+            'name': item.creator.full_name,
+            'email': item.creator.email
+        } if item.creator else None,
+        'assignees': [
+            {
+                'id': a.id,
+                'name': a.full_name,
+                'email': a.email
+            } for a in item.assignees
+        ],
+        'tags': [
+            {
+                'id': t.id,
+                'name': t.name,
+                'color': t.color
+            } for t in item.tags
+        ],
+        'created_at': _isoformat(item.created_at),
+        'due_date': _isoformat(item.due_date),
+        'completed_at': _isoformat(item.completed_at),
+        'estimated_hours': item.estimated_hours,
+        'actual_hours': item.actual_hours
+    }
+    
+    if include_comments:
+        item_dict['comments'] = [
+            {
+                'id': c.id,
+                'content': c.content,
+                'author': {
+                    'id': c.author.id,
+                    'name': c.author.full_name
+                } if c.author else None,
+                'created_at': _isoformat(c.created_at)
+            } for c in item.comments
+        ]
+    
+    return item_dict
+
+
+def _tombstone_dict(tombstone: ItemTombstone) -> Dict[str, Any]:
+    return {'id': tombstone.item_id, 'deleted_at': _isoformat(tombstone.deleted_at)}
+
+
+def _json_line(data: Dict[str, Any]) -> bytes:
+    """Compact JSON followed by a newline, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode() + b'\n'
+
+
+class _StreamSink:
+    """Write-only file object that a generator drains after each write."""
+    
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _dictionary_array(indices: List[Optional[int]], dictionary: List[str]):
+    return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(dictionary, pa.string()))
+
+
+def _item_schema(window: Optional[DeltaWindow] = None):
+    enum_type = pa.dictionary(pa.int32(), pa.string())
+    fields = [
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('description', pa.string()),
+        ('status', enum_type),
+        ('priority', enum_type),
+        ('team_id', pa.int64()),
+        ('parent_item_id', pa.int64()),
+        ('created_by_id', pa.int64()),
+        ('created_by', pa.string()),
+        ('assignee_ids', pa.list_(pa.int64())),
+        ('assignees', pa.list_(pa.string())),
+        ('tags', pa.list_(enum_type)),
+        ('created_at', pa.timestamp('us')),
+        ('updated_at', pa.timestamp('us')),
+        ('due_date', pa.timestamp('us')),
+        ('completed_at', pa.timestamp('us')),
+        ('estimated_hours', pa.int64()),
+        ('actual_hours', pa.int64()),
+    ]
+    if not window:
+        return pa.schema(fields)
+    return pa.schema(
+        fields + [('deleted_at', pa.timestamp('us'))],
+        metadata={'since': window[0].isoformat(), 'next_cursor': window[1].isoformat()}
+    )
+
+
+def _activity_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('action', pa.string()),
+        ('entity_type', pa.string()),
+        ('entity_id', pa.int64()),
+        ('user_id', pa.int64()),
+        ('user', pa.string()),
+        ('item_id', pa.int64()),
+        ('details', pa.string()),
+        ('created_at', pa.timestamp('us')),
+    ])
+
+
+def _write_columnar(file_format: str, schema, batches: Iterator) -> Iterator[bytes]:
+    """
+    Encode record batches as a Parquet (one row group each) or Arrow IPC file.
+    
+    A dictionary may grow from one batch to the next; the IPC file records
+    the new entries as dictionary deltas.
+    """
+    sink = _StreamSink()
+    out = pa.PythonFile(sink, mode='w')
+    if file_format == 'parquet':
+        writer = pq.ParquetWriter(out, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(out, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
 
 
 class ExportService:
     """Service for exporting data in various formats."""
     
-    def export_items_to_csv(
+    def open_stream(self, export: Callable[..., Iterator], *args, **kwargs) -> Iterator:
+        """
+        Run a streaming export with its own database session.
+        
+        For StreamingResponse bodies, which are consumed after the request's
+        session has been closed. The session closes when the stream ends or
+        the client disconnects.
+        """
+        db = SessionLocal()
+        try:
+            yield from export(db, *args, **kwargs)
+        finally:
+            db.close()
+    
+    def iter_item_chunks(
         self,
         db: Session,
         org_id: int,
         team_id: Optional[int] = None,
         status: Optional[ItemStatus] = None,
-        priority: Optional[PriorityLevel] = None
-    ) -> str:
+        priority: Optional[PriorityLevel] = None,
+        include_comments: bool = False,
+        window: Optional[DeltaWindow] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Iterator[List[Item]]:
         """
-        Export items to CSV format.
+        Yield an organization's items in chunks, ordered by ID.
+        
+        Rows are streamed from the database (yield_per) and each chunk's
+        creators, assignees and tags (and comments with their authors, if
+        requested) are loaded with one query apiece. With a delta window,
+        only items created or updated within it are returned.
+        """
+        query = select(Item).options(
+            selectinload(Item.creator),
+            selectinload(Item.assignees),
+            selectinload(Item.tags)
+        ).where(Item.organization_id == org_id)
+        if include_comments:
+            query = query.options(selectinload(Item.comments).selectinload(Comment.author))
+        
+        if team_id:
+            query = query.where(Item.team_id == team_id)
+        if status:
+            query = query.where(Item.status == status)
+        if priority:
+            query = query.where(Item.priority == priority)
+        if window:
+            query = query.where(Item.updated_at > window[0], Item.updated_at <= window[1])
+        
+        result = db.scalars(query.order_by(Item.id).execution_options(yield_per=chunk_size))
+        for chunk in result.partitions():
+            yield chunk
+    
+    def delta_window(self, since: datetime, now: Optional[datetime] = None) -> DeltaWindow:
+        """
+        Window for a delta export from a `since` cursor (an updated_at value).
+        
+        The window ends EXPORT_DELTA_LAG_SECONDS before now; its end is the
+        next cursor. Raises ValueError if deletions from that far back are no
+        longer recorded.
+        """
+        now = now or datetime.utcnow()
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        if since < now - timedelta(days=EXPORT_TOMBSTONE_RETENTION_DAYS):
+            raise ValueError(
+                f"since is older than the {EXPORT_TOMBSTONE_RETENTION_DAYS}-day deletion history; "
+                "run a full export instead"
+            )
+        return since, max(since, now - timedelta(seconds=EXPORT_DELTA_LAG_SECONDS))
+    
+    def iter_tombstone_chunks(
+        self,
+        db: Session,
+        org_id: int,
+        window: DeltaWindow,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Iterator[List[ItemTombstone]]:
+        """
+        Yield the items deleted within a delta window, oldest first.
+        
+        IDs that belong to an existing item of the organization again
+        (SQLite can reuse the highest rowid) are skipped, so a delta never
+        both updates and deletes the same ID.
+        """
+        query = select(ItemTombstone).where(
+            ItemTombstone.organization_id == org_id,
+            ItemTombstone.deleted_at > window[0],
+            ItemTombstone.deleted_at <= window[1],
+            ~select(Item.id).where(
+                Item.id == ItemTombstone.item_id,
+                Item.organization_id == ItemTombstone.organization_id
+            ).exists()
+        ).order_by(ItemTombstone.deleted_at, ItemTombstone.id)
+        result = db.scalars(query.execution_options(yield_per=chunk_size))
+        for chunk in result.partitions():
+            yield chunk
+    
+    def stream_items_csv(
+        self,
+        db: Session,
+        org_id: int,
+        team_id: Optional[int] = None,
+        status: Optional[ItemStatus] = None,
+        priority: Optional[PriorityLevel] = None,
+        window: Optional[DeltaWindow] = None
+    ) -> Iterator[str]:
+        """
+        Stream items as CSV, one chunk of rows at a time.
         
         Args:
             db: Database session
@@ -35,47 +360,69 @@ class ExportService:
             team_id: Optional team filter
             status: Optional status filter
             priority: Optional priority filter
+            window: Optional delta window; adds a Deleted At column and a row
+                per item deleted within it
             
-        Returns:
-            CSV string
+        Yields:
+            CSV text, starting with the header row
         """
-        items = get_items(db, org_id, team_id, status, priority, skip=0, limit=10000)
-        
         output = io.StringIO()
         writer = csv.writer(output)
+        writer.writerow(ITEM_CSV_HEADER + (['Deleted At'] if window else []))
+        delta_columns = [''] if window else []
+        
+        for chunk in self.iter_item_chunks(db, org_id, team_id, status, priority, window=window):
+            for item in chunk:
+                writer.writerow([
+                    item.id,
+                    item.title,
+                    item.description,
+                    item.status.value,
+                    item.priority.value,
+                    item.team_id,
+                    item.creator.full_name if item.creator else 'Unknown',
+                    ', '.join([a.full_name for a in item.assignees]),
+                    ', '.join([t.name for t in item.tags]),
+                    _format_datetime(item.created_at),
+                    _format_datetime(item.due_date),
+                    _format_datetime(item.completed_at),
+                    item.estimated_hours,
+                    item.actual_hours
+                ] + delta_columns)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+        
+        if window:
+            blanks = [''] * (len(ITEM_CSV_HEADER) - 1)
+            for chunk in self.iter_tombstone_chunks(db, org_id, window):
+                for tombstone in chunk:
+                    writer.writerow([tombstone.item_id] + blanks + [_format_datetime(tombstone.deleted_at)])
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        
+        if output.tell():
+            yield output.getvalue()
+    
+    def export_items_to_csv(
+        self,
+        db: Session,
+        org_id: int,
+        team_id: Optional[int] = None,
+        status: Optional[ItemStatus] = None,
+        priority: Optional[PriorityLevel] = None
+    ) -> str:
+        """
+        Export items to CSV format.
         
-        # Write header
-        writer.writerow([
-            'ID', 'Title', 'Description', 'Status', 'Priority',
-            'Team ID', 'Created By', 'Assignees', 'Tags',
-            'Created At', 'Due Date', 'Completed At',
-            'Estimated Hours', 'Actual Hours'
-        ])
-        
-        # Write data
-        for item in items:
-            assignees = ', '.join([a.full_name for a in item.assignees])
-            tags = ', '.join([t.name for t in item.tags])
-            created_by = item.created_by.full_name if item.created_by else 'Unknown'
-            
-            writer.writerow([
-                item.id,
-                item.title,
-                item.description,
-                item.status.value,
-                item.priority.value,
-                item.team_id,
-                created_by,
-                assignees,
-                tags,
-                item.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                item.due_date.strftime('%Y-%m-%d %H:%M:%S') if item.due_date else '',
-                item.completed_at.strftime('%Y-%m-%d %H:%M:%S') if item.completed_at else '',
-                item.estimated_hours,
-                item.actual_hours
-            ])
-        
-        return output.getvalue()
+        Builds the whole file in memory; prefer stream_items_csv for large
+        organizations.
+        
+        Returns:
+            CSV string
+        """
+        return ''.join(self.stream_items_csv(db, org_id, team_id, status, priority))
     
     def export_items_to_json(
         self,
@@ -84,11 +431,15 @@ class ExportService:
         team_id: Optional[int] = None,
         status: Optional[ItemStatus] = None,
         priority: Optional[PriorityLevel] = None,
-        include_comments: bool = False
+        include_comments: bool = False,
+        window: Optional[DeltaWindow] = None
     ) -> str:
         """
         Export items to JSON format.
         
+        Builds the whole document in memory; stream_items_json produces the
+        same document incrementally.
+        
         Args:
             db: Database session
             org_id: Organization ID
@@ -96,110 +447,249 @@ class ExportService:
             status: Optional status filter
             priority: Optional priority filter
             include_comments: Whether to include comments
+            window: Optional delta window; adds the deleted items and the
+                next cursor
             
         Returns:
             JSON string
         """
-        items = get_items(db, org_id, team_id, status, priority, skip=0, limit=10000)
-        
-        items_data = []
-        for item in items:
-            item_dict = {
-                'id': item.id,
-                'title': item.title,
-                'description': item.description,
-                'status': item.status.value,
-                'priority': item.priority.value,
-                'team_id': item.team_id,
-                'parent_item_id': item.parent_item_id,
-                'created_by': {
-                    'id': item.created_by.id,
-                    'name': item.created_by.full_name,
-                    'email': item.created_by.email
-                } if item.created_by else None,
-                'assignees': [
-                    {
-                        'id': a.id,
-                        'name': a.full_name,
-                        'email': a.email
-                    } for a in item.assignees
-                ],
-                'tags': [
-                    {
-                        'id': t.id,
-                        'name': t.name,
-                        'color': t.color
-                    } for t in item.tags
-                ],
-                'created_at': item.created_at.isoformat(),
-                'due_date': item.due_date.isoformat() if item.due_date else None,
-                'completed_at': item.completed_at.isoformat() if item.completed_at else None,
-                'estimated_hours': item.estimated_hours,
-                'actual_hours': item.actual_hours
-            }
+        return ''.join(
+            self.stream_items_json(db, org_id, team_id, status, priority, include_comments, window)
+        )
+    
+    def stream_items_json(
+        self,
+        db: Session,
+        org_id: int,
+        team_id: Optional[int] = None,
+        status: Optional[ItemStatus] = None,
+        priority: Optional[PriorityLevel] = None,
+        include_comments: bool = False,
+        window: Optional[DeltaWindow] = None
+    ) -> Iterator[str]:
+        """
+        Stream items as one JSON document, one chunk of items at a time.
+        
+        The document has export_date, organization_id and items, followed by
+        total_items (known once the items are written) and, with a delta
+        window, since, next_cursor and the deleted items.
+        
+        Yields:
+            JSON text
+        """
+        yield '{"export_date": %s, "organization_id": %s, "items": [' % (
+            json.dumps(datetime.utcnow().isoformat()), json.dumps(org_id)
+        )
+        total_items = 0
+        for chunk in self.iter_item_chunks(db, org_id, team_id, status, priority, include_comments, window):
+            yield ''.join(
+                (',\n' if total_items + n else '\n') + json.dumps(_item_dict(item, include_comments))
+                for n, item in enumerate(chunk)
+            )
+            total_items += len(chunk)
+        yield '\n], "total_items": %d' % total_items
+        
+        if window:
+            yield ', "since": %s, "next_cursor": %s, "deleted": [' % (
+                json.dumps(window[0].isoformat()), json.dumps(window[1].isoformat())
+            )
+            deleted = 0
+            for chunk in self.iter_tombstone_chunks(db, org_id, window):
+                yield ''.join(
+                    (',\n' if deleted + n else '\n') + json.dumps(_tombstone_dict(tombstone))
+                    for n, tombstone in enumerate(chunk)
+                )
+                deleted += len(chunk)
+            yield '\n]'
+        yield '}\n'
+    
+    def stream_items_ndjson(
+        self,
+        db: Session,
+        org_id: int,
+        team_id: Optional[int] = None,
+        status: Optional[ItemStatus] = None,
+        priority: Optional[PriorityLevel] = None,
+        include_comments: bool = False,
+        window: Optional[DeltaWindow] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream items as newline-delimited JSON, one compact object per line.
+        
+        With a delta window, items deleted within it follow as
+        {"id": ..., "deleted_at": ...} lines.
+        
+        Yields:
+            Encoded lines, one batch per chunk of items
+        """
+        for chunk in self.iter_item_chunks(db, org_id, team_id, status, priority, include_comments, window):
+            yield b''.join(_json_line(_item_dict(item, include_comments)) for item in chunk)
+        if window:
+            for chunk in self.iter_tombstone_chunks(db, org_id, window):
+                yield b''.join(_json_line(_tombstone_dict(tombstone)) for tombstone in chunk)
+    
+    def columnar_available(self) -> bool:
+        """Whether Parquet/Arrow exports can run (pyarrow is installed)."""
+        return pa is not None
+    
+    def stream_items_columnar(
+        self,
+        db: Session,
+        org_id: int,
+        file_format: str = 'parquet',
+        team_id: Optional[int] = None,
+        status: Optional[ItemStatus] = None,
+        priority: Optional[PriorityLevel] = None,
+        window: Optional[DeltaWindow] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream items, with their assignees and tags, as Parquet or Arrow IPC.
+        
+        Each chunk of items becomes one record batch (one Parquet row
+        group). Status, priority and tag names are dictionary-encoded, so
+        they load as categoricals in pandas or polars. With a delta window,
+        a deleted_at column is added, items deleted within the window follow
+        as rows with only id and deleted_at set, and the schema metadata
+        carries the next cursor.
+        
+        Args:
+            db: Database session
+            org_id: Organization ID
+            file_format: 'parquet' or 'arrow'
+            team_id: Optional team filter
+            status: Optional status filter
+            priority: Optional priority filter
+            window: Optional delta window
             
-            if include_comments:
-                item_dict['comments'] = [
-                    {
-                        'id': c.id,
-                        'content': c.content,
-                        'author': {
-                            'id': c.author.id,
-                            'name': c.author.full_name
-                        },
-                        'created_at': c.created_at.isoformat()
-                    } for c in item.comments
-                ]
+        Yields:
+            Encoded file contents
+        """
+        schema = _item_schema(window)
+        # Tags enter the dictionary as chunks reach them, so a tag created
+        # mid-export only extends it; later batches carry the longer dictionary
+        tag_names: List[str] = []
+        tag_index: Dict[int, int] = {}
+        status_index = {value: i for i, value in enumerate(_STATUS_VALUES)}
+        priority_index = {value: i for i, value in enumerate(_PRIORITY_VALUES)}
+        
+        def batches():
+            for chunk in self.iter_item_chunks(db, org_id, team_id, status, priority, window=window):
+                tag_offsets = [0]
+                tag_indices = []
+                for item in chunk:
+                    for tag in item.tags:
+                        if tag.id not in tag_index:
+                            tag_index[tag.id] = len(tag_names)
+                            tag_names.append(tag.name)
+                        tag_indices.append(tag_index[tag.id])
+                    tag_offsets.append(len(tag_indices))
+                columns = {
+                    'id': pa.array([i.id for i in chunk], pa.int64()),
+                    'title': pa.array([i.title for i in chunk], pa.string()),
+                    'description': pa.array([i.description for i in chunk], pa.string()),
+                    'status': _dictionary_array(
+                        [status_index[i.status.value] if i.status else None for i in chunk], _STATUS_VALUES
+                    ),
+                    'priority': _dictionary_array(
+                        [priority_index[i.priority.value] if i.priority else None for i in chunk], _PRIORITY_VALUES
+                    ),
+                    'team_id': pa.array([i.team_id for i in chunk], pa.int64()),
+                    'parent_item_id': pa.array([i.parent_item_id for i in chunk], pa.int64()),
+                    'created_by_id': pa.array([i.created_by_id for i in chunk], pa.int64()),
+                    'created_by': pa.array([i.creator.full_name if i.creator else None for i in chunk], pa.string()),
+                    'assignee_ids': pa.array([[a.id for a in i.assignees] for i in chunk], pa.list_(pa.int64())),
+                    'assignees': pa.array([[a.full_name for a in i.assignees] for i in chunk], pa.list_(pa.string())),
+                    'tags': pa.ListArray.from_arrays(
+                        pa.array(tag_offsets, pa.int32()), _dictionary_array(tag_indices, tag_names)
+                    ),
+                    'created_at': pa.array([i.created_at for i in chunk], pa.timestamp('us')),
+                    'updated_at': pa.array([i.updated_at for i in chunk], pa.timestamp('us')),
+                    'due_date': pa.array([i.due_date for i in chunk], pa.timestamp('us')),
+                    'completed_at': pa.array([i.completed_at for i in chunk], pa.timestamp('us')),
+                    'estimated_hours': pa.array([i.estimated_hours for i in chunk], pa.int64()),
+                    'actual_hours': pa.array([i.actual_hours for i in chunk], pa.int64()),
+                    'deleted_at': pa.nulls(len(chunk), pa.timestamp('us')),
+                }
+                yield pa.RecordBatch.from_arrays([columns[name] for name in schema.names], schema=schema)
             
-            items_data.append(item_dict)
-        
-        return json.dumps({
-            'export_date': datetime.utcnow().isoformat(),
-            'organization_id': org_id,
-            'total_items': len(items_data),
-            'items': items_data
-        }, indent=2)
+            if not window:
+                return
+            for chunk in self.iter_tombstone_chunks(db, org_id, window):
+                count = len(chunk)
+                columns = {
+                    name: pa.nulls(count, schema.field(name).type) for name in schema.names
+                }
+                columns.update({
+                    'id': pa.array([t.item_id for t in chunk], pa.int64()),
+                    'status': _dictionary_array([None] * count, _STATUS_VALUES),
+                    'priority': _dictionary_array([None] * count, _PRIORITY_VALUES),
+                    'tags': pa.ListArray.from_arrays(
+                        pa.array([0] * (count + 1), pa.int32()), _dictionary_array([], tag_names)
+                    ),
+                    'deleted_at': pa.array([t.deleted_at for t in chunk], pa.timestamp('us')),
+                })
+                yield pa.RecordBatch.from_arrays([columns[name] for name in schema.names], schema=schema)
+        
+        yield from _write_columnar(file_format, schema, batches())
     
-    def generate_team_report(self, db: Session, team_id: int) -> Dict[str, Any]:
+    def generate_team_report(self, db: Session, team_id: int, org_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Generate a comprehensive report for a team.
         
+        Counts are aggregated in SQL: one query for the team, one grouped by
+        status and priority, and one grouped by assignee.
+        
         Args:
             db: Database session
             team_id: Team ID
+            org_id: Organization the team must belong to
             
         Returns:
             Dictionary containing team report data
         """
-        team = db.query(Team).filter(Team.id == team_id).first()
+        member_count = select(func.count()).select_from(user_teams).where(
+            user_teams.c.team_id == Team.id
+        ).scalar_subquery()
+        query = select(Team.id, Team.name, Team.description, member_count).where(Team.id == team_id)
+        if org_id is not None:
+            query = query.where(Team.organization_id == org_id)
+        team = db.execute(query).first()
         if not team:
             return {'error': 'Team not found'}
         
-        items = db.query(Item).filter(Item.team_id == team_id).all()
-        
-        # Calculate statistics
-        total_items = len(items)
-        completed_items = sum(1 for item in items if item.status == ItemStatus.DONE)
-        in_progress_items = sum(1 for item in items if item.status == ItemStatus.IN_PROGRESS)
-        overdue_items = sum(1 for item in items if item.due_date and item.due_date < datetime.utcnow() and item.status != ItemStatus.DONE)
+        now = datetime.utcnow()
+        is_done = Item.status == ItemStatus.DONE
+        overdue = case((and_(Item.due_date < now, ~is_done), 1))
         
-        # Status breakdown
+        total_items = completed_items = in_progress_items = overdue_items = 0
         status_breakdown = defaultdict(int)
-        for item in items:
-            status_breakdown[item.status.value] += 1
-        
-        # Priority breakdown
         priority_breakdown = defaultdict(int)
-        for item in items:
-            priority_breakdown[item.priority.value] += 1
-        
-        # Member workload
+        for item_status, item_priority, count, overdue_count in db.execute(
+            select(Item.status, Item.priority, func.count(), func.count(overdue))
+            .where(Item.team_id == team_id)
+            .group_by(Item.status, Item.priority)
+        ):
+            total_items += count
+            overdue_items += overdue_count
+            status_breakdown[item_status.value] += count
+            priority_breakdown[item_priority.value] += count
+            if item_status == ItemStatus.DONE:
+                completed_items += count
+            elif item_status == ItemStatus.IN_PROGRESS:
+                in_progress_items += count
+        
+        # Member workload, keyed by name as before
         member_workload = defaultdict(lambda: {'assigned': 0, 'completed': 0})
-        for item in items:
-            for assignee in item.assignees:
-                member_workload[assignee.full_name]['assigned'] += 1
-                if item.status == ItemStatus.DONE:
-                    member_workload[assignee.full_name]['completed'] += 1
+        for name, assigned, completed in db.execute(
+            select(User.full_name, func.count(), func.count(case((is_done, 1))))
+            .select_from(Item)
+            .join(item_assignees, item_assignees.c.item_id == Item.id)
+            .join(User, User.id == item_assignees.c.user_id)
+            .where(Item.team_id == team_id)
+            .group_by(User.id, User.full_name)
+        ):
+            member_workload[name]['assigned'] += assigned
+            member_workload[name]['completed'] += completed
         
         # Calculate completion rate
         completion_rate = (completed_items / total_items * 100) if total_items > 0 else 0
@@ -209,7 +699,7 @@ class ExportService:
                 'id': team.id,
                 'name': team.name,
                 'description': team.description,
-                'member_count': len(team.members)
+                'member_count': team[3]
             },
             'summary': {
                 'total_items': total_items,
@@ -221,13 +711,18 @@ class ExportService:
             'status_breakdown': dict(status_breakdown),
             'priority_breakdown': dict(priority_breakdown),
             'member_workload': dict(member_workload),
-            'generated_at': datetime.utcnow().isoformat()
+            'generated_at': now.isoformat()
         }
     
     def generate_user_report(self, db: Session, user_id: int, org_id: int) -> Dict[str, Any]:
         """
         Generate a report for a specific user's activities and assignments.
         
+        Assigned items are aggregated in one query grouped by priority; the
+        user and created item count come from another. Reports are cached per
+        user for USER_REPORT_CACHE_TTL_SECONDS and dropped when the user's
+        items or activity change; callers get their own copy.
+        
         Args:
             db: Database session
             user_id: User ID
@@ -236,42 +731,58 @@ class ExportService:
         Returns:
             Dictionary containing user report data
         """
-        user = db.query(User).filter(User.id == user_id, User.organization_id == org_id).first()
-        if not user:
-            return {'error': 'User not found'}
+        if USER_REPORT_CACHE_TTL_SECONDS > 0:
+            cached = user_report_cache.get((org_id, user_id))
+            if cached is not None:
+                return copy.deepcopy(cached)
         
-        # Get all items assigned to user
-        assigned_items = db.query(Item).join(Item.assignees).filter(
-            User.id == user_id,
+        created_count = select(func.count()).select_from(Item).where(
+            Item.created_by_id == User.id,
             Item.organization_id == org_id
-        ).all()
+        ).scalar_subquery()
+        user = db.execute(
+            select(User.id, User.full_name, User.email, User.role, created_count)
+            .where(User.id == user_id, User.organization_id == org_id)
+        ).first()
+        if not user:
+            return {'error': 'User not found'}
         
-        # Get items created by user
-        created_items = db.query(Item).filter(
-            Item.created_by_id == user_id,
-            Item.organization_id == org_id
+        now = datetime.utcnow()
+        is_done = Item.status == ItemStatus.DONE
+        total_assigned = completed_assigned = in_progress_assigned = overdue_assigned = 0
+        total_estimated_hours = total_actual_hours = 0
+        priority_breakdown = {}
+        for row in db.execute(
+            select(
+                Item.priority,
+                func.count(),
+                func.count(case((is_done, 1))),
+                func.count(case((Item.status == ItemStatus.IN_PROGRESS, 1))),
+                func.count(case((and_(Item.due_date < now, ~is_done), 1))),
+                func.coalesce(func.sum(Item.estimated_hours), 0),
+                func.coalesce(func.sum(Item.actual_hours), 0)
+            )
+            .join(item_assignees, item_assignees.c.item_id == Item.id)
+            .where(item_assignees.c.user_id == user_id, Item.organization_id == org_id)
+            .group_by(Item.priority)
+        ):
+            priority, count, completed, in_progress, overdue, estimated, actual = row
+            priority_breakdown[priority.value] = count
+            total_assigned += count
+            completed_assigned += completed
+            in_progress_assigned += in_progress
+            overdue_assigned += overdue
+            total_estimated_hours += estimated
+            total_actual_hours += actual
+        
+        recent_activities = db.execute(
+            select(ActivityLog.action, ActivityLog.entity_type, ActivityLog.created_at)
+            .where(ActivityLog.user_id == user_id)
+            .order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+            .limit(10)
         ).all()
         
-        # Calculate statistics
-        total_assigned = len(assigned_items)
-        completed_assigned = sum(1 for item in assigned_items if item.status == ItemStatus.DONE)
-        overdue_assigned = sum(1 for item in assigned_items if item.due_date and item.due_date < datetime.utcnow() and item.status != ItemStatus.DONE)
-        
-        # Priority breakdown for assigned items
-        priority_breakdown = defaultdict(int)
-        for item in assigned_items:
-            priority_breakdown[item.priority.value] += 1
-        
-        # Get recent activity
-        recent_activities = db.query(ActivityLog).filter(
-            ActivityLog.user_id == user_id
-        ).order_by(ActivityLog.created_at.desc()).limit(10).all()
-        
-        # Calculate total hours
-        total_estimated_hours = sum(item.estimated_hours or 0 for item in assigned_items)
-        total_actual_hours = sum(item.actual_hours or 0 for item in assigned_items if item.actual_hours)
-        
-        return {
+        report = {
             'user': {
                 'id': user.id,
                 'name': user.full_name,
@@ -281,14 +792,14 @@ class ExportService:
             'assigned_items': {
                 'total': total_assigned,
                 'completed': completed_assigned,
-                'in_progress': sum(1 for item in assigned_items if item.status == ItemStatus.IN_PROGRESS),
+                'in_progress': in_progress_assigned,
                 'overdue': overdue_assigned,
                 'completion_rate': round((completed_assigned / total_assigned * 100) if total_assigned > 0 else 0, 2)
             },
             'created_items': {
-                'total': len(created_items)
+                'total': user[4]
             },
-            'priority_breakdown': dict(priority_breakdown),
+            'priority_breakdown': priority_breakdown,
             'hours': {
                 'total_estimated': total_estimated_hours,
                 'total_actual': total_actual_hours,
@@ -301,13 +812,19 @@ class ExportService:
                     'created_at': activity.created_at.isoformat()
                 } for activity in recent_activities
             ],
-            'generated_at': datetime.utcnow().isoformat()
+            'generated_at': now.isoformat()
         }
+        if USER_REPORT_CACHE_TTL_SECONDS > 0:
+            user_report_cache.set((org_id, user_id), copy.deepcopy(report))
+        return report
     
     def generate_organization_summary(self, db: Session, org_id: int) -> Dict[str, Any]:
         """
         Generate a comprehensive summary report for an organization.
         
+        This recomputes everything; requests are normally served the
+        periodic snapshot from app.org_summaries instead.
+        
         Args:
             db: Database session
             org_id: Organization ID
@@ -315,35 +832,45 @@ class ExportService:
         Returns:
             Dictionary containing organization summary
         """
-        org = db.query(Organization).filter(Organization.id == org_id).first()
+        team_count = select(func.count()).select_from(Team).where(
+            Team.organization_id == org_id
+        ).scalar_subquery()
+        user_count = select(func.count()).select_from(User).where(
+            User.organization_id == org_id
+        ).scalar_subquery()
+        org = db.execute(
+            select(Organization.id, Organization.name, Organization.created_at, team_count, user_count)
+            .where(Organization.id == org_id)
+        ).first()
         if not org:
             return {'error': 'Organization not found'}
         
         # Get analytics
         analytics = get_item_analytics(db, org_id)
         
-        # Get team count
-        team_count = db.query(Team).filter(Team.organization_id == org_id).count()
-        
-        # Get user count
-        user_count = db.query(User).filter(User.organization_id == org_id).count()
-        
-        # Get active users (users who created or were assigned items in last 30 days)
-        thirty_days_ago = datetime.utcnow() - datetime.timedelta(days=30)
-        active_users = db.query(User).join(Item.assignees).filter(
-            User.organization_id == org_id,
-            Item.created_at >= thirty_days_ago
-        ).distinct().count()
-        
-        # Get top contributors (users who created most items)
-        top_contributors = db.query(
-            User.full_name,
-            db.func.count(Item.id).label('items_created')
-        ).join(Item, Item.created_by_id == User.id).filter(
-            User.organization_id == org_id
-        ).group_by(User.id, User.full_name).order_by(
-            db.func.count(Item.id).desc()
-        ).limit(5).all()
+        # Active users: created or were assigned items in the last 30 days
+        now = datetime.utcnow()
+        recent_items = and_(Item.organization_id == org_id, Item.created_at >= now - timedelta(days=30))
+        active_user_ids = select(Item.created_by_id.label('user_id')).where(recent_items).union(
+            select(item_assignees.c.user_id)
+            .join(Item, Item.id == item_assignees.c.item_id)
+            .where(recent_items)
+        ).subquery()
+        active_users = db.scalar(
+            select(func.count()).select_from(User)
+            .where(User.organization_id == org_id, User.id.in_(select(active_user_ids.c.user_id)))
+        )
+        
+        # Top contributors (users who created most items)
+        items_created = func.count(Item.id)
+        top_contributors = db.execute(
+            select(User.full_name, items_created)
+            .join(Item, Item.created_by_id == User.id)
+            .where(User.organization_id == org_id, Item.organization_id == org_id)
+            .group_by(User.id, User.full_name)
+            .order_by(items_created.desc(), User.id)
+            .limit(5)
+        ).all()
         
         return {
             'organization': {
@@ -352,8 +879,8 @@ class ExportService:
                 'created_at': org.created_at.isoformat()
             },
             'overview': {
-                'total_teams': team_count,
-                'total_users': user_count,
+                'total_teams': org[3],
+                'total_users': org[4],
                 'active_users_30d': active_users
             },
             'items': analytics,
@@ -363,50 +890,105 @@ class ExportService:
                     'items_created': count
                 } for name, count in top_contributors
             ],
-            'generated_at': datetime.utcnow().isoformat()
+            'generated_at': now.isoformat()
         }
     
-    def export_activity_log_to_csv(self, db: Session, org_id: int, limit: int = 1000) -> str:
+    def iter_activity_chunks(
+        self,
+        db: Session,
+        org_id: int,
+        limit: Optional[int] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Iterator[List[ActivityLog]]:
+        """Yield an organization's activity logs in chunks, newest first."""
+        query = select(ActivityLog).options(selectinload(ActivityLog.user)).where(
+            ActivityLog.organization_id == org_id
+        ).order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+        if limit:
+            query = query.limit(limit)
+        
+        result = db.scalars(query.execution_options(yield_per=chunk_size))
+        for chunk in result.partitions():
+            yield chunk
+    
+    def stream_activity_log_csv(self, db: Session, org_id: int, limit: Optional[int] = None) -> Iterator[str]:
         """
-        Export activity logs to CSV format.
+        Stream activity logs as CSV, newest first.
         
         Args:
             db: Database session
             org_id: Organization ID
-            limit: Maximum number of records to export
+            limit: Optional maximum number of records to export
             
-        Returns:
-            CSV string
+        Yields:
+            CSV text, starting with the header row
         """
-        activities = db.query(ActivityLog).join(User).filter(
-            User.organization_id == org_id
-        ).order_by(ActivityLog.created_at.desc()).limit(limit).all()
-        
         output = io.StringIO()
         writer = csv.writer(output)
+        writer.writerow(ACTIVITY_CSV_HEADER)
+        
+        for chunk in self.iter_activity_chunks(db, org_id, limit):
+            for activity in chunk:
+                writer.writerow([
+                    activity.id,
+                    activity.action,
+                    activity.entity_type,
+                    activity.entity_id,
+                    activity.user.full_name if activity.user else 'System',
+                    activity.item_id,
+                    activity.details,
+                    _format_datetime(activity.created_at)
+                ])
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+        
+        if output.tell():
+            yield output.getvalue()
+    
+    def stream_activity_log_columnar(
+        self,
+        db: Session,
+        org_id: int,
+        file_format: str = 'parquet',
+        limit: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Stream activity logs as Parquet or Arrow IPC, newest first.
         
-        # Write header
-        writer.writerow([
-            'ID', 'Action', 'Entity Type', 'Entity ID',
-            'User', 'Item ID', 'Details', 'Created At'
-        ])
+        Each chunk becomes one record batch (one Parquet row group).
+        """
+        schema = _activity_schema()
+        
+        def batches():
+            for chunk in self.iter_activity_chunks(db, org_id, limit):
+                yield pa.RecordBatch.from_arrays([
+                    pa.array([a.id for a in chunk], pa.int64()),
+                    pa.array([a.action for a in chunk], pa.string()),
+                    pa.array([a.entity_type for a in chunk], pa.string()),
+                    pa.array([a.entity_id for a in chunk], pa.int64()),
+                    pa.array([a.user_id for a in chunk], pa.int64()),
+                    pa.array([a.user.full_name if a.user else None for a in chunk], pa.string()),
+                    pa.array([a.item_id for a in chunk], pa.int64()),
+                    pa.array([a.details for a in chunk], pa.string()),
+                    pa.array([a.created_at for a in chunk], pa.timestamp('us')),
+                ], schema=schema)
+        
+        yield from _write_columnar(file_format, schema, batches())
+    
+    def export_activity_log_to_csv(self, db: Session, org_id: int, limit: int = 1000) -> str:
+        """
+        Export activity logs to CSV format.
         
-        # Write data
-        for activity in activities:
-            user_name = activity.user.full_name if activity.user else 'System'
+        Args:
+            db: Database session
+            org_id: Organization ID
+            limit: Maximum number of records to export
             
-            writer.writerow([
-                activity.id,
-                activity.action,
-                activity.entity_type,
-                activity.entity_id,
-                user_name,
-                activity.item_id,
-                activity.details,
-                activity.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        return output.getvalue()
+        Returns:
+            CSV string
+        """
+        return ''.join(self.stream_activity_log_csv(db, org_id, limit))
 
 
 # Singleton instance
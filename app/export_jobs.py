@@ -0,0 +1,452 @@
+"""
+Background export jobs with an on-disk artifact store.
+
+POST /export/jobs records an ExportJob and hands it to a thread pool,
+which runs the matching ExportService export with its own session and
+writes the result to EXPORT_ARTIFACT_DIR. Finished artifacts are served
+with HTTP Range support and removed EXPORT_ARTIFACT_TTL_SECONDS after
+they complete.
+
+Each process heartbeats the jobs it holds. Jobs whose heartbeat stops
+(the process exited or crashed) are picked up by any running process:
+queued ones are re-enqueued, running ones marked failed. On shutdown,
+jobs still waiting in the queue are released for immediate pickup.
+
+Each job's cache_key digests the request together with the dataset
+version (row count and latest change of the exported table), so an
+identical request against unchanged data reuses the existing job.
+
+The same periodic cleanup prunes item tombstones older than
+EXPORT_TOMBSTONE_RETENTION_DAYS, which delta exports no longer accept.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal, SessionLocal
+from app.export import COLUMNAR_FORMATS, EXPORT_TOMBSTONE_RETENTION_DAYS, export_service
+from app.leases import LEASE_PASSES, acquire_lease
+from app.models import ActivityLog, Comment, ExportJob, Item, ItemStatus, ItemTombstone, PriorityLevel
+from app.writers import BackgroundWriter
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "2"))
+EXPORT_ARTIFACT_DIR = os.getenv("EXPORT_ARTIFACT_DIR", "./exports")
+EXPORT_ARTIFACT_TTL_SECONDS = int(os.getenv("EXPORT_ARTIFACT_TTL_SECONDS", "86400"))
+# Queued/running jobs older than this are marked failed and no longer reused
+EXPORT_JOB_TIMEOUT_SECONDS = int(os.getenv("EXPORT_JOB_TIMEOUT_SECONDS", "3600"))
+EXPORT_CLEANUP_INTERVAL_SECONDS = float(os.getenv("EXPORT_CLEANUP_INTERVAL_SECONDS", "300"))
+# Jobs missing this many heartbeats are treated as abandoned by their process
+EXPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("EXPORT_JOB_HEARTBEAT_SECONDS", "15"))
+MISSED_HEARTBEATS = 4
+EXPORT_CLEANUP_LEASE = "export_cleanup"
+
+# Formats each dataset can be exported in
+DATASET_FORMATS = {
+    "items": ("csv", "json", "ndjson", "parquet", "arrow"),
+    "activity_log": ("csv", "parquet", "arrow"),
+}
+
+# format: (media type, file extension)
+MEDIA_TYPES = {
+    "csv": ("text/csv", "csv"),
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    **COLUMNAR_FORMATS,
+}
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def artifact_path(job: ExportJob) -> str:
+    return os.path.join(EXPORT_ARTIFACT_DIR, job.file_name)
+
+
+def _abandoned_before(now: datetime) -> datetime:
+    return now - timedelta(seconds=EXPORT_JOB_HEARTBEAT_SECONDS * MISSED_HEARTBEATS)
+
+
+def dataset_version(db: Session, org_id: int, dataset: str, params: Dict[str, Any]) -> list:
+    """Row count and latest change of the data an export reads."""
+    if dataset == "items":
+        version = list(db.execute(
+            select(func.count(), func.max(Item.updated_at)).where(Item.organization_id == org_id)
+        ).one())
+        if params.get("include_comments"):
+            version += db.execute(
+                select(func.count(), func.max(Comment.updated_at)).join(Item, Item.id == Comment.item_id)
+                .where(Item.organization_id == org_id)
+            ).one()
+        return [str(value) for value in version]
+    return [str(value) for value in db.execute(
+        select(func.count(), func.max(ActivityLog.id)).where(ActivityLog.organization_id == org_id)
+    ).one()]
+
+
+def _cache_key(db: Session, org_id: int, dataset: str, file_format: str, params: Dict[str, Any]) -> str:
+    payload = [org_id, dataset, file_format, params, dataset_version(db, org_id, dataset, params)]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _export_chunks(db: Session, job: ExportJob, params: Dict[str, Any]) -> Iterator:
+    """Run the ExportService export a job describes."""
+    org_id, file_format = job.organization_id, job.format
+    if job.dataset == "activity_log":
+        if file_format == "csv":
+            return export_service.stream_activity_log_csv(db, org_id, params.get("limit"))
+        return export_service.stream_activity_log_columnar(db, org_id, file_format, params.get("limit"))
+
+    filters = (
+        params.get("team_id"),
+        ItemStatus(params["status"]) if params.get("status") else None,
+        PriorityLevel(params["priority"]) if params.get("priority") else None,
+    )
+    if file_format == "csv":
+        return export_service.stream_items_csv(db, org_id, *filters)
+    if file_format == "json":
+        return export_service.stream_items_json(db, org_id, *filters, params.get("include_comments", False))
+    if file_format == "ndjson":
+        return export_service.stream_items_ndjson(db, org_id, *filters, params.get("include_comments", False))
+    return export_service.stream_items_columnar(db, org_id, file_format, *filters)
+
+
+def submit_export_job(
+    db: Session,
+    org_id: int,
+    user_id: Optional[int],
+    dataset: str,
+    file_format: str,
+    params: Dict[str, Any]
+) -> ExportJob:
+    """
+    Queue an export, or return the job for an identical request against
+    unchanged data if it is still pending or its artifact is available.
+    """
+    now = datetime.utcnow()
+    cache_key = _cache_key(db, org_id, dataset, file_format, params)
+    stale_before = now - timedelta(seconds=EXPORT_JOB_TIMEOUT_SECONDS)
+    for job in db.scalars(
+        select(ExportJob).where(
+            ExportJob.organization_id == org_id,
+            ExportJob.cache_key == cache_key,
+            ExportJob.expires_at > now
+        ).order_by(ExportJob.created_at.desc())
+    ):
+        if job.status == "completed" and os.path.exists(artifact_path(job)):
+            return job
+        if (
+            job.status in ("queued", "running")
+            and job.created_at > stale_before
+            and job.heartbeat_at is not None
+            and job.heartbeat_at > _abandoned_before(now)
+        ):
+            return job
+
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        organization_id=org_id,
+        requested_by_id=user_id,
+        dataset=dataset,
+        format=file_format,
+        params=json.dumps(params, sort_keys=True),
+        cache_key=cache_key,
+        status="queued",
+        created_at=now,
+        expires_at=now + timedelta(seconds=EXPORT_ARTIFACT_TTL_SECONDS),
+        heartbeat_at=now
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    export_job_queue.submit(job.id)
+    return job
+
+
+def get_export_job(db: Session, org_id: int, job_id: str) -> Optional[ExportJob]:
+    """An organization's export job by ID."""
+    return db.scalars(
+        select(ExportJob).where(ExportJob.id == job_id, ExportJob.organization_id == org_id)
+    ).first()
+
+
+def run_export_job(job_id: str) -> None:
+    """Write a queued job's artifact and record the outcome."""
+    db = SessionLocal()
+    try:
+        # Claim the job; another process may have re-enqueued it as well
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(ExportJob).where(ExportJob.id == job_id, ExportJob.status == "queued")
+            .values(status="running", started_at=now, heartbeat_at=now)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return
+        job = db.get(ExportJob, job_id)
+
+        file_name = f"{job.id}.{MEDIA_TYPES[job.format][1]}"
+        path = os.path.join(EXPORT_ARTIFACT_DIR, file_name)
+        partial_path = path + ".part"
+        try:
+            os.makedirs(EXPORT_ARTIFACT_DIR, exist_ok=True)
+            with open(partial_path, "wb") as f:
+                for chunk in _export_chunks(db, job, json.loads(job.params or "{}")):
+                    f.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            os.replace(partial_path, path)
+        except Exception as e:
+            logger.error(f"Export job {job_id} failed: {e}", exc_info=True)
+            db.rollback()
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return
+
+        job.status = "completed"
+        job.file_name = file_name
+        job.size_bytes = os.path.getsize(path)
+        job.finished_at = datetime.utcnow()
+        job.expires_at = job.finished_at + timedelta(seconds=EXPORT_ARTIFACT_TTL_SECONDS)
+        db.commit()
+    finally:
+        db.close()
+
+
+def cleanup_export_jobs(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Fail timed-out jobs, delete expired jobs and their artifacts. An artifact
+    that is already gone counts as removed. The caller holds
+    EXPORT_CLEANUP_LEASE and commits.
+    """
+    now = now or datetime.utcnow()
+    stale_before = now - timedelta(seconds=EXPORT_JOB_TIMEOUT_SECONDS)
+    for job in db.scalars(
+        select(ExportJob).where(ExportJob.status.in_(("queued", "running")), ExportJob.created_at < stale_before)
+    ):
+        job.status = "failed"
+        job.error = "Timed out"
+        job.finished_at = now
+
+    expired = db.scalars(select(ExportJob).where(ExportJob.expires_at <= now)).all()
+    for job in expired:
+        if job.file_name:
+            try:
+                os.remove(artifact_path(job))
+            except FileNotFoundError:
+                pass
+        db.delete(job)
+    db.flush()
+    return len(expired)
+
+
+def recover_export_jobs(db: Session, now: Optional[datetime] = None) -> List[str]:
+    """
+    Fail running jobs whose process stopped heartbeating and claim abandoned
+    queued ones. Returns the claimed job IDs to re-enqueue. The caller commits.
+    """
+    now = now or datetime.utcnow()
+    abandoned = or_(ExportJob.heartbeat_at.is_(None), ExportJob.heartbeat_at < _abandoned_before(now))
+    db.execute(
+        update(ExportJob).where(ExportJob.status == "running", abandoned)
+        .values(status="failed", error="Interrupted", finished_at=now, heartbeat_at=None)
+    )
+    claimed = []
+    for job_id in db.scalars(select(ExportJob.id).where(ExportJob.status == "queued", abandoned)).all():
+        if db.execute(
+            update(ExportJob).where(ExportJob.id == job_id, ExportJob.status == "queued", abandoned)
+            .values(heartbeat_at=now)
+        ).rowcount:
+            claimed.append(job_id)
+    return claimed
+
+
+def prune_item_tombstones(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete tombstones past the retention period. The caller commits."""
+    now = now or datetime.utcnow()
+    result = db.execute(delete(ItemTombstone).where(
+        ItemTombstone.deleted_at < now - timedelta(days=EXPORT_TOMBSTONE_RETENTION_DAYS)
+    ))
+    return result.rowcount
+
+
+def byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" Range header into inclusive offsets.
+
+    Returns None to serve the whole file (no header, several ranges or an
+    invalid one); raises ValueError if the range can't be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_text, sep, end_text = range_header[len("bytes="):].strip().partition("-")
+    if not sep or not (start_text or end_text) or not all(t.isdigit() for t in (start_text, end_text) if t):
+        return None
+    if not start_text:
+        suffix = int(end_text)
+        if suffix == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - suffix, 0), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def iter_file(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Read bytes start..end (inclusive) of a file in chunks."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = f.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+class ExportJobQueue:
+    """
+    Thread pool running export jobs off the request path. A daemon thread
+    heartbeats the jobs this process holds and picks up abandoned ones.
+    """
+
+    def __init__(self, workers: int = EXPORT_JOB_WORKERS, heartbeat_seconds: float = EXPORT_JOB_HEARTBEAT_SECONDS):
+        self.workers = workers
+        self.heartbeat_seconds = heartbeat_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._active: set = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start heartbeating; the first beat re-enqueues jobs left behind by a previous run."""
+        self._stopping.clear()
+        if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+            self._heartbeat_thread = threading.Thread(
+                target=self._heartbeat_loop, name="export-job-heartbeat", daemon=True
+            )
+            self._heartbeat_thread.start()
+
+    def submit(self, job_id: str) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export-job")
+            self._active.add(job_id)
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        try:
+            run_export_job(job_id)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def heartbeat(self) -> None:
+        """Refresh this process's jobs, then take over abandoned ones."""
+        with self._lock:
+            active = list(self._active)
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            if active:
+                db.execute(
+                    update(ExportJob).where(ExportJob.id.in_(active), ExportJob.status.in_(("queued", "running")))
+                    .values(heartbeat_at=now)
+                )
+            claimed = [] if self._stopping.is_set() else recover_export_jobs(db, now)
+            db.commit()
+        finally:
+            db.close()
+        for job_id in claimed:
+            self.submit(job_id)
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.error(f"Export job heartbeat failed: {e}", exc_info=True)
+            if not self._stopping.is_set():
+                self._stopping.wait(self.heartbeat_seconds)
+                continue
+            # After shutdown, keep beating until the jobs already running finish
+            with self._lock:
+                if not self._active:
+                    return
+            time.sleep(self.heartbeat_seconds)
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and release the queued ones to other processes."""
+        self._stopping.set()
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            active = list(self._active)
+        if not active:
+            return
+        db = SessionLocal()
+        try:
+            for job_id in active:
+                if db.execute(
+                    update(ExportJob).where(ExportJob.id == job_id, ExportJob.status == "queued")
+                    .values(heartbeat_at=None)
+                ).rowcount:
+                    with self._lock:
+                        self._active.discard(job_id)
+            db.commit()
+        finally:
+            db.close()
+
+
+class ExportCleanupJob(BackgroundWriter):
+    """
+    Runs cleanup_export_jobs and prune_item_tombstones periodically on the
+    event loop, in one process at a time.
+    """
+
+    async def flush(self) -> None:
+        async with AsyncSessionLocal() as db:
+            ttl = self.flush_interval_seconds * LEASE_PASSES
+            if await db.run_sync(acquire_lease, EXPORT_CLEANUP_LEASE, ttl):
+                await db.run_sync(cleanup_export_jobs)
+                await db.run_sync(prune_item_tombstones)
+                await db.commit()
+
+
+# Singleton instances
+export_job_queue = ExportJobQueue()
+export_cleanup_job = ExportCleanupJob(EXPORT_CLEANUP_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        if not acquire_lease(db, EXPORT_CLEANUP_LEASE, EXPORT_CLEANUP_INTERVAL_SECONDS * LEASE_PASSES):
+            print("Another process holds the export cleanup lease; skipped")
+        else:
+            removed = cleanup_export_jobs(db)
+            pruned = prune_item_tombstones(db)
+            db.commit()
+            print(f"Removed {removed} expired export jobs and {pruned} item tombstones")
+    finally:
+        db.close()
@@ -0,0 +1,199 @@
+"""
+Incrementally maintained item counters (the org_item_stats table).
+
+Item services capture each item's counted fields before and after a write
+and apply the difference in the same transaction, so analytics read a few
+counter rows per organization instead of scanning items.
+
+Check the counters against the items table with
+`python -m app.item_stats check`, and recompute them with
+`python -m app.item_stats rebuild` (optionally `--org-id N`). Run rebuilds
+while item writes are quiet; a check afterwards confirms the result.
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Item, OrgItemStat
+
+StatKey = Tuple[str, str]
+# (item_count, hours_count, hours_total)
+StatValues = Tuple[int, int, int]
+# (status, priority, team_id, actual_hours) of one item
+ItemState = Tuple[object, object, Optional[int], Optional[int]]
+
+TOTAL_KEY: StatKey = ("total", "")
+_COUNTERS = ("item_count", "hours_count", "hours_total")
+_PK = ("organization_id", "dimension", "key")
+
+
+def item_state(item) -> ItemState:
+    """Counted fields of an Item, or of a row/namespace with the same attributes."""
+    return (item.status, item.priority, item.team_id, item.actual_hours)
+
+
+def _stat_keys(state: ItemState) -> List[StatKey]:
+    status, priority, team_id, _ = state
+    return [
+        TOTAL_KEY,
+        ("status", getattr(status, "value", "") or ""),
+        ("priority", getattr(priority, "value", "") or ""),
+        ("team", "" if team_id is None else str(team_id)),
+    ]
+
+
+def stats_deltas(transitions: Iterable[Tuple[Optional[ItemState], Optional[ItemState]]]) -> Dict[StatKey, List[int]]:
+    """Counter changes for items moving from a before state to an after state.
+
+    Use (None, state) for a created item and (state, None) for a deleted one.
+    """
+    deltas: Dict[StatKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for before, after in transitions:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            hours = state[3]
+            for key in _stat_keys(state):
+                delta = deltas[key]
+                delta[0] += sign
+                if hours is not None:
+                    delta[1] += sign
+                    delta[2] += sign * hours
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+def _upsert_statement(dialect_name: str, org_id: int, deltas: Dict[StatKey, List[int]]):
+    """INSERT ... ON CONFLICT adding the deltas to existing counter rows."""
+    if not deltas:
+        return None
+    rows = [
+        {"organization_id": org_id, "dimension": dimension, "key": key, **dict(zip(_COUNTERS, delta))}
+        for (dimension, key), delta in deltas.items()
+    ]
+    table = OrgItemStat.__table__
+    if dialect_name == "mysql":
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update({c: table.c[c] + stmt.inserted[c] for c in _COUNTERS})
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = dialect.insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=list(_PK),
+        set_={c: table.c[c] + stmt.excluded[c] for c in _COUNTERS}
+    )
+
+
+def apply_stats_deltas(db: Session, org_id: int, deltas: Dict[StatKey, List[int]]) -> None:
+    """Add counter deltas in the caller's transaction."""
+    stmt = _upsert_statement(db.get_bind().dialect.name, org_id, deltas)
+    if stmt is not None:
+        db.execute(stmt)
+
+
+async def apply_stats_deltas_async(db: AsyncSession, org_id: int, deltas: Dict[StatKey, List[int]]) -> None:
+    """Add counter deltas in the caller's transaction (AsyncSession)."""
+    stmt = _upsert_statement(db.bind.dialect.name, org_id, deltas)
+    if stmt is not None:
+        await db.execute(stmt)
+
+
+def get_org_item_stats(db, org_id: int) -> Dict[StatKey, StatValues]:
+    """Stored counters for one organization. Missing keys are zero."""
+    return _stored_stats(db, org_id).get(org_id, {})
+
+
+def _stored_stats(db, org_id: Optional[int] = None) -> Dict[int, Dict[StatKey, StatValues]]:
+    query = select(
+        OrgItemStat.organization_id, OrgItemStat.dimension, OrgItemStat.key,
+        OrgItemStat.item_count, OrgItemStat.hours_count, OrgItemStat.hours_total
+    )
+    if org_id is not None:
+        query = query.where(OrgItemStat.organization_id == org_id)
+    stats: Dict[int, Dict[StatKey, StatValues]] = defaultdict(dict)
+    for org, dimension, key, *values in db.execute(query):
+        if any(values):
+            stats[org][(dimension, key)] = tuple(values)
+    return stats
+
+
+def compute_stats(db, org_id: Optional[int] = None) -> Dict[int, Dict[StatKey, StatValues]]:
+    """Counters recomputed from the items table, by organization."""
+    query = select(
+        Item.organization_id, Item.status, Item.priority, Item.team_id,
+        func.count(), func.count(Item.actual_hours), func.coalesce(func.sum(Item.actual_hours), 0)
+    ).where(Item.organization_id.isnot(None)).group_by(
+        Item.organization_id, Item.status, Item.priority, Item.team_id
+    )
+    if org_id is not None:
+        query = query.where(Item.organization_id == org_id)
+
+    totals: Dict[int, Dict[StatKey, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0, 0]))
+    for org, status, priority, team_id, count, hours_count, hours_total in db.execute(query):
+        for key in _stat_keys((status, priority, team_id, None)):
+            values = totals[org][key]
+            values[0] += count
+            values[1] += hours_count
+            values[2] += int(hours_total)
+    return {org: {key: tuple(v) for key, v in stats.items()} for org, stats in totals.items()}
+
+
+def check_item_stats(db, org_id: Optional[int] = None) -> List[str]:
+    """Describe every counter that differs from the items table."""
+    stored, expected = _stored_stats(db, org_id), compute_stats(db, org_id)
+    problems = []
+    for org in sorted(set(stored) | set(expected)):
+        have, want = stored.get(org, {}), expected.get(org, {})
+        for key in sorted(set(have) | set(want)):
+            if have.get(key, (0, 0, 0)) != want.get(key, (0, 0, 0)):
+                problems.append(
+                    f"org {org} {key[0]}={key[1]!r}: stored {have.get(key, (0, 0, 0))}, "
+                    f"expected {want.get(key, (0, 0, 0))}"
+                )
+    return problems
+
+
+def rebuild_item_stats(db, org_id: Optional[int] = None) -> int:
+    """Replace the counters with values recomputed from items. The caller commits."""
+    expected = compute_stats(db, org_id)
+    clear = delete(OrgItemStat)
+    if org_id is not None:
+        clear = clear.where(OrgItemStat.organization_id == org_id)
+    db.execute(clear)
+    rows = [
+        {"organization_id": org, "dimension": dimension, "key": key, **dict(zip(_COUNTERS, values))}
+        for org, stats in expected.items()
+        for (dimension, key), values in stats.items()
+    ]
+    if rows:
+        db.execute(OrgItemStat.__table__.insert(), rows)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Check or rebuild the org_item_stats counters.")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--org-id", type=int, default=None, help="Limit to one organization")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            count = rebuild_item_stats(db, args.org_id)
+            db.commit()
+            print(f"Rebuilt {count} counter rows")
+        else:
+            problems = check_item_stats(db, args.org_id)
+            for problem in problems:
+                print(problem)
+            print(f"{len(problems)} mismatched counters")
+            sys.exit(1 if problems else 0)
+    finally:
+        db.close()
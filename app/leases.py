@@ -0,0 +1,53 @@
+"""
+Database leases for periodic jobs that must run in a single process.
+
+Every worker process starts the same background jobs. A job guarded by a
+lease only does its work in the process holding the lease, which renews
+it on each run; if that process stops, another takes over once the
+lease expires.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import JobLease
+
+# Identifies this process as a lease holder
+PROCESS_ID = uuid.uuid4().hex
+# A periodic job's lease lasts this many of its intervals, so another
+# process takes over once the holder has missed that many runs
+LEASE_PASSES = 3
+
+
+def acquire_lease(
+    db: Session,
+    name: str,
+    ttl_seconds: float,
+    holder: str = PROCESS_ID,
+    now: Optional[datetime] = None
+) -> bool:
+    """Take or renew the named lease for ttl_seconds. Commits; False if another holder has it."""
+    now = now or datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    renewed = db.execute(
+        update(JobLease)
+        .where(JobLease.name == name, or_(JobLease.holder == holder, JobLease.expires_at <= now))
+        .values(holder=holder, expires_at=expires_at)
+    ).rowcount
+    if not renewed:
+        if db.get(JobLease, name) is not None:
+            db.rollback()
+            return False
+        db.add(JobLease(name=name, holder=holder, expires_at=expires_at))
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return False
+    db.commit()
+    return True
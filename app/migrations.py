@@ -0,0 +1,164 @@
+"""
+Schema migrations for existing databases.
+
+Base.metadata.create_all() only creates missing tables, so databases
+created by an earlier version never pick up new columns or indexes.
+Versioned migrations below handle column and data changes and are
+recorded in the schema_migrations table; missing indexes declared on the
+models are created on every run.
+
+Run with `python -m app.migrations`; the application also runs them at
+startup.
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, default=datetime.utcnow),
+)
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = []
+
+
+def migration(version: int, description: str):
+    """Register a versioned migration. Versions must be applied in order."""
+    def decorator(fn: Callable[[Connection], None]):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return decorator
+
+
+def _columns(conn: Connection, table: str) -> set:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _rebuild_table(conn: Connection, table_name: str, copy_rows: Callable[[Connection, str], None]) -> None:
+    """Recreate a table from the current model definition.
+
+    SQLite can't drop UNIQUE or indexed columns in place, so the old table
+    is renamed, the new one created, rows copied over and the old one dropped.
+    """
+    old_name = f"{table_name}_old"
+    for index in inspect(conn).get_indexes(table_name):
+        conn.execute(text(f'DROP INDEX IF EXISTS "{index["name"]}"'))
+    conn.execute(text(f'ALTER TABLE "{table_name}" RENAME TO "{old_name}"'))
+    Base.metadata.tables[table_name].create(conn)
+    copy_rows(conn, old_name)
+    conn.execute(text(f'DROP TABLE "{old_name}"'))
+
+
+@migration(1, "Store API keys as SHA-256 digests")
+def _hash_api_keys(conn: Connection) -> None:
+    from app.auth import hash_api_key, API_KEY_PREFIX_LENGTH
+
+    if "key" not in _columns(conn, "api_keys"):
+        return
+
+    def copy_rows(conn: Connection, old_name: str) -> None:
+        old_table = Table(old_name, MetaData(), autoload_with=conn)
+        rows = conn.execute(select(old_table)).mappings().all()
+        if rows:
+            conn.execute(Base.metadata.tables["api_keys"].insert(), [
+                {
+                    **{k: v for k, v in row.items() if k != "key"},
+                    "key_hash": hash_api_key(row["key"]),
+                    "key_prefix": row["key"][:API_KEY_PREFIX_LENGTH],
+                }
+                for row in rows
+            ])
+
+    _rebuild_table(conn, "api_keys", copy_rows)
+
+
+@migration(2, "Add activity_logs.organization_id and backfill it")
+def _activity_log_organization(conn: Connection) -> None:
+    if "organization_id" not in _columns(conn, "activity_logs"):
+        conn.execute(text(
+            "ALTER TABLE activity_logs ADD COLUMN organization_id INTEGER "
+            "REFERENCES organizations(id) ON DELETE CASCADE"
+        ))
+
+    # Prefer the acting user's organization, fall back to the item's
+    conn.execute(text(
+        "UPDATE activity_logs SET organization_id = "
+        "(SELECT users.organization_id FROM users WHERE users.id = activity_logs.user_id) "
+        "WHERE organization_id IS NULL AND user_id IS NOT NULL"
+    ))
+    conn.execute(text(
+        "UPDATE activity_logs SET organization_id = "
+        "(SELECT items.organization_id FROM items WHERE items.id = activity_logs.item_id) "
+        "WHERE organization_id IS NULL AND item_id IS NOT NULL"
+    ))
+
+
+@migration(3, "Backfill org_item_stats counters")
+def _backfill_item_stats(conn: Connection) -> None:
+    from app.item_stats import rebuild_item_stats
+
+    rebuild_item_stats(conn)
+
+
+@migration(4, "Add export_jobs.heartbeat_at")
+def _export_job_heartbeat(conn: Connection) -> None:
+    if "heartbeat_at" not in _columns(conn, "export_jobs"):
+        conn.execute(text("ALTER TABLE export_jobs ADD COLUMN heartbeat_at DATETIME"))
+
+
+def ensure_indexes(conn: Connection) -> List[str]:
+    """Create any index declared on the models that the database lacks."""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+
+def run_migrations(engine: Engine) -> None:
+    """Apply pending migrations, then create missing indexes."""
+    _migration_metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version}: {description}")
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(schema_migrations.insert().values(version=version, description=description))
+
+    with engine.begin() as conn:
+        created = ensure_indexes(conn)
+    for name in created:
+        logger.info(f"Created index {name}")
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401 - register models on Base.metadata
+    from app.database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
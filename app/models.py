@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum, Table
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum, Table, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -9,21 +9,27 @@ user_teams = Table(
     'user_teams',
     Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE')),
-    Column('team_id', Integer, ForeignKey('teams.id', ondelete='CASCADE'))
+    Column('team_id', Integer, ForeignKey('teams.id', ondelete='CASCADE')),
+    Index('ix_user_teams_team_user', 'team_id', 'user_id'),
+    Index('ix_user_teams_user_team', 'user_id', 'team_id')
 )
 
 item_tags = Table(
     'item_tags',
     Base.metadata,
     Column('item_id', Integer, ForeignKey('items.id', ondelete='CASCADE')),
-    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE'))
+    Column('tag_id', Integer, ForeignKey('tags.id', ondelete='CASCADE')),
+    Index('ix_item_tags_item_tag', 'item_id', 'tag_id'),
+    Index('ix_item_tags_tag_item', 'tag_id', 'item_id')
 )
 
 item_assignees = Table(
     'item_assignees',
     Base.metadata,
     Column('item_id', Integer, ForeignKey('items.id', ondelete='CASCADE')),
-    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'))
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE')),
+    Index('ix_item_assignees_item_user', 'item_id', 'user_id'),
+    Index('ix_item_assignees_user_item', 'user_id', 'item_id')
 )
 
 class PriorityLevel(enum.Enum):
@@ -83,7 +89,7 @@ class User(Base):
     full_name = Column(String)
     role = Column(SQLEnum(UserRole), default=UserRole.MEMBER)
     is_active = Column(Boolean, default=True)
-    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"))
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime)
     
@@ -101,7 +107,7 @@ class Team(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(Text)
-    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"))
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -155,6 +161,52 @@ class Item(Base):
     
     # Self-referential for subtasks
     parent_item = relationship("Item", remote_side=[id], backref="subtasks")
+    
+    __table_args__ = (
+        # Keyset pagination: WHERE organization_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_items_org_created_id", "organization_id", "created_at", "id"),
+        # Filtered listings and analytics, always scoped to an organization
+        Index("ix_items_org_status", "organization_id", "status"),
+        Index("ix_items_org_priority", "organization_id", "priority"),
+        Index("ix_items_org_team", "organization_id", "team_id"),
+        Index("ix_items_org_due_date", "organization_id", "due_date"),
+        Index("ix_items_org_completed_at", "organization_id", "completed_at"),
+        Index("ix_items_org_created_by", "organization_id", "created_by_id"),
+        # Delta exports: WHERE organization_id = ? AND updated_at > ?
+        Index("ix_items_org_updated_at", "organization_id", "updated_at"),
+        # Cross-organization reminder and overdue scans
+        Index("ix_items_due_date_status", "due_date", "status"),
+        Index("ix_items_team_status", "team_id", "status"),
+    )
+
+class ItemTombstone(Base):
+    """A deleted item, kept so delta exports can report the deletion."""
+    __tablename__ = "item_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    item_id = Column(Integer, nullable=False)  # No FK: the item row is gone
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_item_tombstones_org_deleted_at", "organization_id", "deleted_at"),
+    )
+
+class OrgItemStat(Base):
+    """
+    Item counters per organization, maintained as deltas by the item services.
+    One row per (dimension, key): ("total", ""), ("status", <value>),
+    ("priority", <value>) and ("team", <team id or "">).
+    """
+    __tablename__ = "org_item_stats"
+    
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(50), primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    # Items with actual_hours set, and their sum (for averages)
+    hours_count = Column(Integer, nullable=False, default=0)
+    hours_total = Column(Integer, nullable=False, default=0)
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -169,6 +221,10 @@ class Comment(Base):
     # Relationships
     item = relationship("Item", back_populates="comments")
     author = relationship("User", back_populates="comments")
+    
+    __table_args__ = (
+        Index("ix_comments_item_created_id", "item_id", "created_at", "id"),
+    )
 
 class Attachment(Base):
     __tablename__ = "attachments"
@@ -196,19 +252,29 @@ class ActivityLog(Base):
     details = Column(Text)  # JSON string with change details
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
     item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=True)
+    # Denormalized so org feeds don't join users (and keep rows of deleted users)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     user = relationship("User", back_populates="activity_logs")
     item = relationship("Item", back_populates="activity_logs")
+    
+    __table_args__ = (
+        # Organization feed and export: WHERE organization_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_activity_logs_org_created_id", "organization_id", "created_at", "id"),
+        Index("ix_activity_logs_item_created_id", "item_id", "created_at", "id"),
+        Index("ix_activity_logs_user_created_id", "user_id", "created_at", "id"),
+    )
 
 class APIKey(Base):
     __tablename__ = "api_keys"
     
     id = Column(Integer, primary_key=True, index=True)
-    key = Column(String, unique=True, index=True, nullable=False)
+    key_hash = Column(String, unique=True, index=True, nullable=False)  # SHA-256 of the key
+    key_prefix = Column(String)  # First characters of the key, for display
     name = Column(String, nullable=False)
-    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"))
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), index=True)
     is_active = Column(Boolean, default=True)
     last_used_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -225,7 +291,7 @@ class Webhook(Base):
     events = Column(String, nullable=False)  # Comma-separated: item.created,item.updated
     is_active = Column(Boolean, default=True)
     secret = Column(String)  # For signature verification
-    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"))
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -244,3 +310,101 @@ class UsageLog(Base):
     
     # Relationships
     organization = relationship("Organization", back_populates="usage_logs")
+    
+    __table_args__ = (
+        Index("ix_usage_logs_org_timestamp", "organization_id", "timestamp"),
+    )
+
+class UsageRollupMinute(Base):
+    """Usage aggregated per organization, endpoint and minute (filled by app.usage)."""
+    __tablename__ = "usage_rollups_minute"
+    
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    endpoint = Column(String, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    total_response_time_ms = Column(BigInteger, nullable=False, default=0)
+
+class UsageRollupHour(Base):
+    """Usage aggregated per organization, endpoint and hour (filled by app.usage)."""
+    __tablename__ = "usage_rollups_hour"
+    
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    endpoint = Column(String, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    total_response_time_ms = Column(BigInteger, nullable=False, default=0)
+
+class UsageLatencySketch(Base):
+    """
+    Serialized response-time sketch (app.sketch) for one organization,
+    endpoint and hour. Writers append a row per flush; the usage rollup job
+    merges each closed hour into a single row.
+    """
+    __tablename__ = "usage_latency_sketches"
+    
+    id = Column(Integer, primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    endpoint = Column(String, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    sketch = Column(Text, nullable=False)
+    
+    __table_args__ = (
+        Index("ix_usage_latency_sketches_org_bucket", "organization_id", "bucket_start"),
+    )
+
+class UsageRollupState(Base):
+    """How far each usage rollup has been computed (exclusive upper bound)."""
+    __tablename__ = "usage_rollup_state"
+    
+    name = Column(String(20), primary_key=True)
+    rolled_up_to = Column(DateTime, nullable=False)
+
+class ExportJob(Base):
+    """
+    A queued or finished background export (app.export_jobs). Completed
+    jobs point at a file in the artifact directory until expires_at.
+    """
+    __tablename__ = "export_jobs"
+    
+    id = Column(String(32), primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    dataset = Column(String(20), nullable=False)  # items, activity_log
+    format = Column(String(10), nullable=False)  # csv, json, ndjson, parquet, arrow
+    params = Column(Text)  # JSON filters
+    # Digest of the request and the dataset version; identical requests reuse the artifact
+    cache_key = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    file_name = Column(String)
+    size_bytes = Column(BigInteger)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    expires_at = Column(DateTime, nullable=False)
+    # Refreshed while a process holds the job queued or running; NULL once released
+    heartbeat_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index("ix_export_jobs_org_cache_key", "organization_id", "cache_key"),
+        Index("ix_export_jobs_expires_at", "expires_at"),
+    )
+
+class OrgSummarySnapshot(Base):
+    """Latest organization summary report, refreshed periodically (app.org_summaries)."""
+    __tablename__ = "org_summary_snapshots"
+    
+    organization_id = Column(Integer, ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    summary = Column(Text, nullable=False)  # JSON report
+    generated_at = Column(DateTime, nullable=False)
+
+class JobLease(Base):
+    """Process currently running a single-instance periodic job (app.leases)."""
+    __tablename__ = "job_leases"
+    
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(32), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
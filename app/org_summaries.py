@@ -0,0 +1,88 @@
+"""
+Organization summary snapshots.
+
+The organization summary report touches every item, user and team of an
+organization, so a periodic job computes it for each organization and
+stores the result in org_summary_snapshots. /reports/organization serves
+the stored snapshot, computing one on first request; `fresh=true`
+recomputes it on demand.
+
+The job runs every ORG_SUMMARY_SNAPSHOT_INTERVAL_SECONDS (0 disables it)
+in whichever worker process holds its lease, committing after each
+organization so the write lock is only held briefly. `python -m
+app.org_summaries` runs a single pass, e.g. from cron.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal, SessionLocal
+from app.export import export_service
+from app.leases import LEASE_PASSES, acquire_lease
+from app.models import Organization, OrgSummarySnapshot
+from app.writers import BackgroundWriter
+
+ORG_SUMMARY_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("ORG_SUMMARY_SNAPSHOT_INTERVAL_SECONDS", "300"))
+
+
+def snapshot_organization_summary(db: Session, org_id: int) -> Dict[str, Any]:
+    """Compute an organization's summary and store it as its snapshot. The caller commits."""
+    summary = export_service.generate_organization_summary(db, org_id)
+    if "error" in summary:
+        return summary
+    snapshot = db.get(OrgSummarySnapshot, org_id)
+    if snapshot is None:
+        snapshot = OrgSummarySnapshot(organization_id=org_id)
+        db.add(snapshot)
+    snapshot.summary = json.dumps(summary)
+    snapshot.generated_at = datetime.fromisoformat(summary["generated_at"])
+    db.flush()
+    return summary
+
+
+def get_organization_summary(db: Session, org_id: int, fresh: bool = False) -> Dict[str, Any]:
+    """An organization's latest summary snapshot, recomputed if fresh or missing."""
+    if not fresh:
+        summary = db.scalar(select(OrgSummarySnapshot.summary).where(OrgSummarySnapshot.organization_id == org_id))
+        if summary is not None:
+            return json.loads(summary)
+    summary = snapshot_organization_summary(db, org_id)
+    db.commit()
+    return summary
+
+
+def snapshot_all_organizations(db: Session) -> int:
+    """Refresh every organization's snapshot, committing after each one."""
+    org_ids = db.scalars(select(Organization.id)).all()
+    for org_id in org_ids:
+        snapshot_organization_summary(db, org_id)
+        db.commit()
+    return len(org_ids)
+
+
+class OrgSummarySnapshotJob(BackgroundWriter):
+    """Runs snapshot_all_organizations periodically on the event loop."""
+
+    async def flush(self) -> None:
+        async with AsyncSessionLocal() as db:
+            ttl = self.flush_interval_seconds * LEASE_PASSES
+            if await db.run_sync(acquire_lease, "org_summary_snapshots", ttl):
+                await db.run_sync(snapshot_all_organizations)
+
+
+# Singleton instance
+org_summary_snapshot_job = OrgSummarySnapshotJob(ORG_SUMMARY_SNAPSHOT_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        count = snapshot_all_organizations(db)
+        print(f"Snapshotted {count} organization summaries")
+    finally:
+        db.close()
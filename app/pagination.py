@@ -0,0 +1,53 @@
+"""
+Opaque keyset cursors for listings ordered by (created_at DESC, id DESC).
+A cursor encodes the sort key of the last row of a page, so the next page
+is an index range scan instead of an ever-growing OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+Cursor = Tuple[datetime, int]
+
+# Row ids are bound as 64-bit integers; anything larger cannot come from encode_cursor
+MAX_ROW_ID = 2 ** 63 - 1
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode a row's sort key as an opaque URL-safe token."""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Decode a token produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, row_id = json.loads(raw)
+        created_at, row_id = datetime.fromisoformat(created_at), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not 0 <= row_id <= MAX_ROW_ID:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def after_cursor(created_at_column, id_column, cursor: Cursor):
+    """Filter for rows that sort after the cursor in (created_at, id) DESC order."""
+    created_at, row_id = cursor
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < row_id)
+    )
+
+
+def next_cursor(rows: Sequence, limit: int) -> Optional[str]:
+    """Cursor for the page after rows, or None if this was the last page."""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -1,29 +1,36 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Path, Query, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import datetime
+import os
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models import User, Organization, UserRole, ItemStatus, PriorityLevel
 from app.schemas import (
     OrganizationCreate, OrganizationRead, OrganizationUpdate,
     UserCreate, UserRead, UserLogin, Token,
     TeamCreate, TeamRead, TeamUpdate,
-    ItemCreate, ItemRead, ItemUpdate,
-    CommentCreate, CommentRead,
+    ItemCreate, ItemRead, ItemUpdate, ItemPage,
+    ItemBulkCreate, ItemBulkUpdate, ItemBulkDelete, BulkItemResponse,
+    CommentCreate, CommentRead, CommentPage,
     TagCreate, TagRead,
     APIKeyCreate, APIKeyRead,
     WebhookCreate, WebhookRead, WebhookUpdate,
-    ActivityLogRead,
+    ActivityLogPage,
+    ExportJobCreate, ExportJobRead,
     ItemAnalytics, UsageAnalytics
 )
 from app.services import (
-    create_organization, get_organization,
-    create_user, get_user_by_email, get_users_by_organization,
+    create_organization, get_organization, deactivate_organization,
+    create_user, get_user_by_email, get_users_by_organization, deactivate_user,
     create_team, add_user_to_team,
-    create_item, get_item, get_items, update_item, delete_item,
+    create_item_async, get_item_async, get_items_async, update_item_async, delete_item,
+    bulk_create_items, bulk_update_items, bulk_delete_items,
     create_comment, get_comments_by_item,
     create_tag, get_tags,
-    create_api_key, get_api_keys,
+    create_api_key, get_api_keys, deactivate_api_key,
     create_webhook, get_webhooks,
     get_activity_logs,
     get_item_analytics, get_usage_analytics
@@ -32,11 +39,17 @@ from app.dependencies import (
     get_current_active_user,
     get_current_organization,
     require_role,
-    verify_api_key
+    verify_api_key,
+    get_cursor
 )
+from app.pagination import Cursor, next_cursor
 from app.auth import verify_password, create_access_token
 from app.notifications import notification_service
-from app.export import export_service
+from app.export import export_service, COLUMNAR_FORMATS
+from app.org_summaries import get_organization_summary
+from app.export_jobs import (
+    DATASET_FORMATS, MEDIA_TYPES, submit_export_job, get_export_job, artifact_path, byte_range, iter_file
+)
 
 router = APIRouter()
 
@@ -80,7 +93,7 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
     
-    access_token = create_access_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/auth/me", response_model=UserRead)
@@ -99,6 +112,16 @@ def get_my_organization(org: Organization = Depends(get_current_organization)):
     """Get current user's organization."""
     return org
 
+@router.delete("/organizations/current", status_code=status.HTTP_204_NO_CONTENT)
+def deactivate_my_organization(
+    current_user: User = Depends(require_role(UserRole.OWNER)),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Deactivate the current organization (Owner only). Its tokens and API keys stop working."""
+    deactivate_organization(db, org.id)
+    return None
+
 @router.get("/organizations/{org_id}/users", response_model=List[UserRead])
 def list_organization_users(
     org_id: int,
@@ -111,6 +134,18 @@ def list_organization_users(
     
     return get_users_by_organization(db, org_id)
 
+@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def deactivate_organization_user(
+    user_id: int,
+    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Deactivate a user of the organization (Admin only). Their tokens stop working."""
+    if not deactivate_user(db, user_id, org.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return None
+
 # ============= Team Routes =============
 @router.post("/teams", response_model=TeamRead, status_code=status.HTTP_201_CREATED)
 def create_new_team(
@@ -134,53 +169,86 @@ def add_team_member(
 
 # ============= Item Routes =============
 @router.post("/items", response_model=ItemRead, status_code=status.HTTP_201_CREATED)
-def create_new_item(
+async def create_new_item(
     item: ItemCreate,
     current_user: User = Depends(get_current_active_user),
     org: Organization = Depends(get_current_organization),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new item."""
-    return create_item(db, item, org.id, current_user)
+    return await create_item_async(db, item, org.id, current_user)
+
+# Bulk routes are declared before /items/{item_id} so "bulk" isn't parsed as an id
+@router.post("/items/bulk", response_model=BulkItemResponse)
+def create_items_bulk(
+    payload: ItemBulkCreate,
+    current_user: User = Depends(get_current_active_user),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Create many items in one transaction."""
+    return {"results": bulk_create_items(db, payload.items, org.id, current_user)}
+
+@router.patch("/items/bulk", response_model=BulkItemResponse)
+def update_items_bulk(
+    payload: ItemBulkUpdate,
+    current_user: User = Depends(get_current_active_user),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Update many items in one transaction."""
+    return {"results": bulk_update_items(db, payload.items, org.id, current_user)}
+
+@router.delete("/items/bulk", response_model=BulkItemResponse)
+def delete_items_bulk(
+    payload: ItemBulkDelete,
+    current_user: User = Depends(get_current_active_user),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Delete many items in one transaction."""
+    return {"results": bulk_delete_items(db, payload.ids, org.id, current_user)}
 
 @router.get("/items/{item_id}", response_model=ItemRead)
-def read_item(
+async def read_item(
     item_id: int,
     current_user: User = Depends(get_current_active_user),
     org: Organization = Depends(get_current_organization),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get an item by ID."""
-    db_item = get_item(db, item_id, org.id)
+    db_item = await get_item_async(db, item_id, org.id)
     if not db_item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
     return db_item
 
-@router.get("/items", response_model=List[ItemRead])
-def list_items(
+@router.get("/items", response_model=ItemPage)
+async def list_items(
     team_id: Optional[int] = Query(None),
     status: Optional[ItemStatus] = Query(None),
     priority: Optional[PriorityLevel] = Query(None),
     assigned_to: Optional[int] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     current_user: User = Depends(get_current_active_user),
     org: Organization = Depends(get_current_organization),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List items with optional filters."""
-    return get_items(db, org.id, team_id, status, priority, assigned_to, skip, limit)
+    items = await get_items_async(db, org.id, team_id, status, priority, assigned_to, skip, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor(items, limit)}
 
 @router.put("/items/{item_id}", response_model=ItemRead)
-def update_existing_item(
+async def update_existing_item(
     item_id: int,
     item: ItemUpdate,
     current_user: User = Depends(get_current_active_user),
     org: Organization = Depends(get_current_organization),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an item."""
-    updated_item = update_item(db, item_id, item, org.id, current_user)
+    updated_item = await update_item_async(db, item_id, item, org.id, current_user)
     if not updated_item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
     return updated_item
@@ -211,15 +279,18 @@ def create_new_comment(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
     return db_comment
 
-@router.get("/items/{item_id}/comments", response_model=List[CommentRead])
+@router.get("/items/{item_id}/comments", response_model=CommentPage)
 def list_item_comments(
     item_id: int,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     current_user: User = Depends(get_current_active_user),
     org: Organization = Depends(get_current_organization),
     db: Session = Depends(get_db)
 ):
-    """Get all comments for an item."""
-    return get_comments_by_item(db, item_id, org.id)
+    """Get comments for an item."""
+    comments = get_comments_by_item(db, item_id, org.id, limit, cursor)
+    return {"items": comments, "next_cursor": next_cursor(comments, limit)}
 
 # ============= Tag Routes =============
 @router.post("/tags", response_model=TagRead, status_code=status.HTTP_201_CREATED)
@@ -259,6 +330,18 @@ def list_api_keys(
     """List all API keys (Admin only)."""
     return get_api_keys(db, org.id)
 
+@router.delete("/api-keys/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
+def revoke_api_key(
+    key_id: int,
+    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Revoke an API key (Admin only)."""
+    if not deactivate_api_key(db, key_id, org.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="API key not found")
+    return None
+
 # ============= Webhook Routes =============
 @router.post("/webhooks", response_model=WebhookRead, status_code=status.HTTP_201_CREATED)
 def create_new_webhook(
@@ -280,16 +363,18 @@ def list_webhooks(
     return get_webhooks(db, org.id)
 
 # ============= Activity Log Routes =============
-@router.get("/activity", response_model=List[ActivityLogRead])
+@router.get("/activity", response_model=ActivityLogPage)
 def list_activity_logs(
     item_id: Optional[int] = Query(None),
     limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     current_user: User = Depends(get_current_active_user),
     org: Organization = Depends(get_current_organization),
     db: Session = Depends(get_db)
 ):
     """Get activity logs."""
-    return get_activity_logs(db, org.id, item_id, limit)
+    logs = get_activity_logs(db, org.id, item_id, limit, cursor)
+    return {"items": logs, "next_cursor": next_cursor(logs, limit)}
 
 # ============= Analytics Routes =============
 @router.get("/analytics/items", response_model=ItemAnalytics)
@@ -332,24 +417,40 @@ def send_overdue_alerts(
     return result
 
 # ============= Export Routes =============
+def _delta_window(since: Optional[datetime], *filters):
+    """Delta window for a `since` cursor, with the header carrying the next cursor."""
+    if since is None:
+        return None, {}
+    # Items leaving a filter would silently drop out of the delta
+    if any(f is not None for f in filters):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since can't be combined with team_id, status or priority filters"
+        )
+    try:
+        window = export_service.delta_window(since)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return window, {"X-Next-Cursor": window[1].isoformat()}
+
 @router.get("/export/items/csv")
 def export_items_csv(
     team_id: Optional[int] = Query(None),
     status: Optional[ItemStatus] = Query(None),
     priority: Optional[PriorityLevel] = Query(None),
+    since: Optional[datetime] = Query(None),
     current_user: User = Depends(get_current_active_user),
-    org: Organization = Depends(get_current_organization),
-    db: Session = Depends(get_db)
+    org: Organization = Depends(get_current_organization)
 ):
-    """Export items to CSV format."""
-    from fastapi.responses import Response
-    
-    csv_data = export_service.export_items_to_csv(db, org.id, team_id, status, priority)
-    
-    return Response(
-        content=csv_data,
+    """Export items to CSV format (streamed); only changes and deletions after `since` if given."""
+    window, headers = _delta_window(since, team_id, status, priority)
+    return StreamingResponse(
+        export_service.open_stream(export_service.stream_items_csv, org.id, team_id, status, priority, window),
         media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=items_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
+        headers={
+            **headers,
+            "Content-Disposition": f"attachment; filename=items_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        }
     )
 
 @router.get("/export/items/json")
@@ -358,37 +459,202 @@ def export_items_json(
     status: Optional[ItemStatus] = Query(None),
     priority: Optional[PriorityLevel] = Query(None),
     include_comments: bool = Query(False),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    since: Optional[datetime] = Query(None),
     current_user: User = Depends(get_current_active_user),
-    org: Organization = Depends(get_current_organization),
-    db: Session = Depends(get_db)
+    org: Organization = Depends(get_current_organization)
 ):
-    """Export items to JSON format."""
-    from fastapi.responses import Response
-    
-    json_data = export_service.export_items_to_json(db, org.id, team_id, status, priority, include_comments)
+    """Export items as one JSON document, or as NDJSON with format=ndjson (both streamed)."""
+    window, headers = _delta_window(since, team_id, status, priority)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if format == "ndjson":
+        return StreamingResponse(
+            export_service.open_stream(
+                export_service.stream_items_ndjson, org.id, team_id, status, priority, include_comments, window
+            ),
+            media_type="application/x-ndjson",
+            headers={**headers, "Content-Disposition": f"attachment; filename=items_export_{timestamp}.ndjson"}
+        )
     
-    return Response(
-        content=json_data,
+    return StreamingResponse(
+        export_service.open_stream(
+            export_service.stream_items_json, org.id, team_id, status, priority, include_comments, window
+        ),
         media_type="application/json",
-        headers={"Content-Disposition": f"attachment; filename=items_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"}
+        headers={**headers, "Content-Disposition": f"attachment; filename=items_export_{timestamp}.json"}
     )
 
 @router.get("/export/activity-log/csv")
 def export_activity_csv(
-    limit: int = Query(1000, ge=1, le=10000),
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    org: Organization = Depends(get_current_organization)
+):
+    """Export activity logs to CSV, newest first (Admin only, streamed)."""
+    return StreamingResponse(
+        export_service.open_stream(export_service.stream_activity_log_csv, org.id, limit),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=activity_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
+    )
+
+def _columnar_response(content, file_format: str, name: str, headers: Optional[dict] = None) -> StreamingResponse:
+    if not export_service.columnar_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet/Arrow export requires pyarrow to be installed"
+        )
+    media_type, extension = COLUMNAR_FORMATS[file_format]
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            **(headers or {}),
+            "Content-Disposition": f"attachment; filename={name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        }
+    )
+
+@router.get("/export/items/{file_format}")
+def export_items_columnar(
+    file_format: str = Path(..., pattern="^(parquet|arrow)$"),
+    team_id: Optional[int] = Query(None),
+    status: Optional[ItemStatus] = Query(None),
+    priority: Optional[PriorityLevel] = Query(None),
+    since: Optional[datetime] = Query(None),
+    current_user: User = Depends(get_current_active_user),
+    org: Organization = Depends(get_current_organization)
+):
+    """Export items with assignees and tags as Parquet or Arrow IPC (streamed)."""
+    window, headers = _delta_window(since, team_id, status, priority)
+    return _columnar_response(
+        export_service.open_stream(
+            export_service.stream_items_columnar, org.id, file_format, team_id, status, priority, window
+        ),
+        file_format,
+        "items_export",
+        headers
+    )
+
+@router.get("/export/activity-log/{file_format}")
+def export_activity_columnar(
+    file_format: str = Path(..., pattern="^(parquet|arrow)$"),
+    limit: Optional[int] = Query(None, ge=1),
     current_user: User = Depends(require_role(UserRole.ADMIN)),
+    org: Organization = Depends(get_current_organization)
+):
+    """Export activity logs as Parquet or Arrow IPC, newest first (Admin only, streamed)."""
+    return _columnar_response(
+        export_service.open_stream(export_service.stream_activity_log_columnar, org.id, file_format, limit),
+        file_format,
+        "activity_log"
+    )
+
+@router.post("/export/jobs", response_model=ExportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def create_export_job(
+    job: ExportJobCreate,
+    current_user: User = Depends(get_current_active_user),
     org: Organization = Depends(get_current_organization),
     db: Session = Depends(get_db)
 ):
-    """Export activity logs to CSV (Admin only)."""
-    from fastapi.responses import Response
+    """
+    Queue an export to run in the background.
     
-    csv_data = export_service.export_activity_log_to_csv(db, org.id, limit)
+    Returns the existing job when the same export of unchanged data is
+    already queued, running or available for download.
+    """
+    if job.format not in DATASET_FORMATS[job.dataset]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{job.dataset} can't be exported as {job.format}"
+        )
+    if job.format in COLUMNAR_FORMATS and not export_service.columnar_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet/Arrow export requires pyarrow to be installed"
+        )
+    _check_export_access(job.dataset, current_user)
     
-    return Response(
-        content=csv_data,
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=activity_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
+    if job.dataset == "items":
+        params = {
+            "team_id": job.team_id,
+            "status": job.status.value if job.status else None,
+            "priority": job.priority.value if job.priority else None,
+            "include_comments": job.include_comments,
+        }
+    else:
+        params = {"limit": job.limit}
+    # Only set filters, so equivalent requests share a cache key
+    params = {key: value for key, value in params.items() if value}
+    
+    return submit_export_job(db, org.id, current_user.id, job.dataset, job.format, params)
+
+def _check_export_access(dataset: str, user: User) -> None:
+    """Activity log exports are admin-only, as on the direct export routes."""
+    if dataset == "activity_log" and user.role not in (UserRole.ADMIN, UserRole.OWNER):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Insufficient permissions. Required role: {UserRole.ADMIN.value}"
+        )
+
+@router.get("/export/jobs/{job_id}", response_model=ExportJobRead)
+def get_export_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Get an export job's status."""
+    job = get_export_job(db, org.id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    _check_export_access(job.dataset, current_user)
+    return job
+
+@router.get("/export/jobs/{job_id}/download")
+def download_export_job(
+    job_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
+    current_user: User = Depends(get_current_active_user),
+    org: Organization = Depends(get_current_organization),
+    db: Session = Depends(get_db)
+):
+    """Download a finished export. Supports single-range Range requests for resuming."""
+    job = get_export_job(db, org.id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    _check_export_access(job.dataset, current_user)
+    if job.status != "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export job is {job.status}")
+    path = artifact_path(job)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Export has expired")
+    
+    size = job.size_bytes
+    etag = f'"{job.id}"'
+    media_type, extension = MEDIA_TYPES[job.format]
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f"attachment; filename={job.dataset}_export_{job.finished_at.strftime('%Y%m%d_%H%M%S')}.{extension}"
+    }
+    try:
+        # Artifacts never change, so If-Range only needs to match the ETag
+        span = byte_range(range_header, size) if if_range in (None, etag) else None
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    start, end = span or (0, size - 1)
+    if span:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        iter_file(path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if span else status.HTTP_200_OK,
+        media_type=media_type,
+        headers=headers
     )
 
 # ============= Report Routes =============
@@ -396,10 +662,11 @@ def export_activity_csv(
 def get_team_report(
     team_id: int,
     current_user: User = Depends(get_current_active_user),
+    org: Organization = Depends(get_current_organization),
     db: Session = Depends(get_db)
 ):
     """Get comprehensive team report."""
-    return export_service.generate_team_report(db, team_id)
+    return export_service.generate_team_report(db, team_id, org.id)
 
 @router.get("/reports/user/{user_id}")
 def get_user_report(
@@ -417,9 +684,10 @@ def get_user_report(
 
 @router.get("/reports/organization")
 def get_organization_report(
+    fresh: bool = Query(False),
     current_user: User = Depends(require_role(UserRole.ADMIN)),
     org: Organization = Depends(get_current_organization),
     db: Session = Depends(get_db)
 ):
-    """Get organization summary report (Admin only)."""
-    return export_service.generate_organization_summary(db, org.id)
+    """Get the latest organization summary snapshot (Admin only); fresh=true recomputes it."""
+    return get_organization_summary(db, org.id, fresh)
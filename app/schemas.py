@@ -141,6 +141,34 @@ class ItemRead(ItemBase):
     class Config:
         orm_mode = True
 
+# Upper bound on rows per bulk request, keeping each batch transaction short
+BULK_MAX_ITEMS = 1000
+
+class ItemBulkCreate(BaseModel):
+    items: List[ItemCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class ItemBulkUpdateEntry(ItemUpdate):
+    id: int
+
+class ItemBulkUpdate(BaseModel):
+    items: List[ItemBulkUpdateEntry] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class ItemBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class BulkItemResult(BaseModel):
+    index: int  # Position in the request
+    id: Optional[int] = None
+    status: str  # created, updated, deleted, not_found, error
+    error: Optional[str] = None
+
+class BulkItemResponse(BaseModel):
+    results: List[BulkItemResult]
+
+class ItemPage(BaseModel):
+    items: List[ItemRead]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to fetch the next page
+
 # ============= Comment Schemas =============
 class CommentBase(BaseModel):
     content: str
@@ -161,6 +189,10 @@ class CommentRead(CommentBase):
     class Config:
         orm_mode = True
 
+class CommentPage(BaseModel):
+    items: List[CommentRead]
+    next_cursor: Optional[str] = None
+
 # ============= Attachment Schemas =============
 class AttachmentRead(BaseModel):
     id: int
@@ -187,6 +219,10 @@ class ActivityLogRead(BaseModel):
     class Config:
         orm_mode = True
 
+class ActivityLogPage(BaseModel):
+    items: List[ActivityLogRead]
+    next_cursor: Optional[str] = None
+
 # ============= API Key Schemas =============
 class APIKeyCreate(BaseModel):
     name: str
@@ -194,7 +230,8 @@ class APIKeyCreate(BaseModel):
 
 class APIKeyRead(BaseModel):
     id: int
-    key: str
+    key: Optional[str] = None  # Only returned once, when the key is created
+    key_prefix: Optional[str] = None
     name: str
     is_active: bool
     created_at: datetime
@@ -226,6 +263,32 @@ class WebhookRead(WebhookBase):
     class Config:
         orm_mode = True
 
+# ============= Export Job Schemas =============
+class ExportJobCreate(BaseModel):
+    dataset: str = Field(..., pattern="^(items|activity_log)$")
+    format: str = Field(..., pattern="^(csv|json|ndjson|parquet|arrow)$")
+    # items filters
+    team_id: Optional[int] = None
+    status: Optional[ItemStatus] = None
+    priority: Optional[PriorityLevel] = None
+    include_comments: bool = False
+    # activity_log: newest rows to export (default all)
+    limit: Optional[int] = Field(None, ge=1)
+
+class ExportJobRead(BaseModel):
+    id: str
+    dataset: str
+    format: str
+    status: str
+    size_bytes: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: datetime
+
+    class Config:
+        orm_mode = True
+
 # ============= Analytics Schemas =============
 class ItemAnalytics(BaseModel):
     total_items: int
@@ -235,8 +298,18 @@ class ItemAnalytics(BaseModel):
     completed_this_week: int
     avg_completion_time_hours: Optional[float] = None
 
+class UsageBucket(BaseModel):
+    bucket_start: datetime
+    requests: int
+    errors: int
+    avg_response_time_ms: float
+
 class UsageAnalytics(BaseModel):
     total_requests: int
     requests_by_endpoint: dict
     avg_response_time_ms: float
     error_rate: float
+    # {"p50": ..., "p95": ..., "p99": ...} in ms, overall and per endpoint
+    latency_percentiles: dict = {}
+    latency_by_endpoint: dict = {}
+    timeseries: List[UsageBucket] = []
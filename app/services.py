@@ -1,19 +1,29 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
-from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, func, and_, or_, select, insert, update, delete
+from typing import Dict, Iterable, List, Optional
 from datetime import datetime, timedelta
 import json
 
 from app.models import (
-    Organization, User, Team, Item, Tag, Comment, Attachment,
+    Organization, User, Team, Item, ItemTombstone, Tag, Comment, Attachment,
     ActivityLog, APIKey, Webhook, UsageLog,
-    ItemStatus, PriorityLevel, UserRole
+    ItemStatus, PriorityLevel, UserRole,
+    item_assignees, item_tags
 )
 from app.schemas import (
-    OrganizationCreate, UserCreate, TeamCreate, ItemCreate, ItemUpdate,
+    OrganizationCreate, UserCreate, TeamCreate, ItemCreate, ItemUpdate, ItemBulkUpdateEntry,
     CommentCreate, APIKeyCreate, WebhookCreate, TagCreate
 )
-from app.auth import get_password_hash, generate_api_key
+from app.auth import get_password_hash, generate_api_key, hash_api_key, API_KEY_PREFIX_LENGTH
+from app.cache import api_key_cache, principal_cache, analytics_cache, user_report_cache, ANALYTICS_CACHE_TTL_SECONDS
+from app.pagination import Cursor, after_cursor
+from app.writers import activity_log_writer, ACTIVITY_LOG_MODE
+from app.usage import floor_to, hourly_usage, latency_sketches
+from app.sketch import QuantileSketch
+from app.item_stats import (
+    TOTAL_KEY, item_state, stats_deltas, apply_stats_deltas, apply_stats_deltas_async, get_org_item_stats
+)
 
 # ============= Organization Services =============
 def create_organization(db: Session, org: OrganizationCreate) -> Organization:
@@ -28,6 +38,21 @@ def get_organization(db: Session, org_id: int) -> Optional[Organization]:
     """Get organization by ID."""
     return db.query(Organization).filter(Organization.id == org_id).first()
 
+def deactivate_organization(db: Session, org_id: int) -> Optional[Organization]:
+    """Deactivate an organization and drop its cached credentials."""
+    org = get_organization(db, org_id)
+    if not org:
+        return None
+    
+    org.is_active = False
+    db.commit()
+    db.refresh(org)
+    
+    api_key_cache.delete_where(lambda _, entry: entry["organization_id"] == org_id)
+    principal_cache.delete_where(lambda _, principal: principal["user"]["organization_id"] == org_id)
+    
+    return org
+
 # ============= User Services =============
 def create_user(db: Session, user: UserCreate) -> User:
     """Create a new user with hashed password."""
@@ -40,12 +65,13 @@ def create_user(db: Session, user: UserCreate) -> User:
         organization_id=user.organization_id
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
     
     # Log activity
-    log_activity(db, "created", "user", db_user.id, user_id=db_user.id)
+    log_activity(db, "created", "user", db_user.id, user_id=db_user.id, organization_id=db_user.organization_id)
     
+    db.commit()
+    db.refresh(db_user)
     return db_user
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -56,6 +82,20 @@ def get_users_by_organization(db: Session, org_id: int) -> List[User]:
     """Get all users in an organization."""
     return db.query(User).filter(User.organization_id == org_id).all()
 
+def deactivate_user(db: Session, user_id: int, org_id: int) -> Optional[User]:
+    """Deactivate a user and drop their cached sessions."""
+    user = db.query(User).filter(User.id == user_id, User.organization_id == org_id).first()
+    if not user:
+        return None
+    
+    user.is_active = False
+    db.commit()
+    db.refresh(user)
+    
+    principal_cache.delete_where(lambda _, principal: principal["user"]["id"] == user_id)
+    
+    return user
+
 # ============= Team Services =============
 def create_team(db: Session, team: TeamCreate, org_id: int, user: User) -> Team:
     """Create a new team."""
@@ -65,11 +105,13 @@ def create_team(db: Session, team: TeamCreate, org_id: int, user: User) -> Team:
         organization_id=org_id
     )
     db.add(db_team)
-    db.commit()
-    db.refresh(db_team)
+    db.flush()
     
-    log_activity(db, "created", "team", db_team.id, user_id=user.id)
+    log_activity(db, "created", "team", db_team.id, user_id=user.id, organization_id=org_id)
     
+    db.commit()
+    invalidate_user_reports(org_id, [user.id])
+    db.refresh(db_team)
     return db_team
 
 def add_user_to_team(db: Session, team_id: int, user_id: int) -> Team:
@@ -85,6 +127,10 @@ def add_user_to_team(db: Session, team_id: int, user_id: int) -> Team:
     return team
 
 # ============= Item Services =============
+# Relationships serialized by ItemRead, batch-loaded with one query each per
+# result set instead of two lazy loads per item
+ITEM_LOAD_OPTIONS = (selectinload(Item.assignees), selectinload(Item.tags))
+
 def create_item(db: Session, item: ItemCreate, org_id: int, user: User) -> Item:
     """Create a new item."""
     db_item = Item(
@@ -112,17 +158,18 @@ def create_item(db: Session, item: ItemCreate, org_id: int, user: User) -> Item:
         tags = db.query(Tag).filter(Tag.id.in_(item.tag_ids)).all()
         db_item.tags.extend(tags)
     
-    db.commit()
-    db.refresh(db_item)
+    apply_stats_deltas(db, org_id, stats_deltas([(None, item_state(db_item))]))
     
     # Log activity
-    log_activity(db, "created", "item", db_item.id, user_id=user.id, item_id=db_item.id)
+    log_activity(db, "created", "item", db_item.id, user_id=user.id, item_id=db_item.id, organization_id=org_id)
     
-    return db_item
+    db.commit()
+    invalidate_item_caches(org_id, [user.id, *(item.assignee_ids or [])])
+    return get_item(db, db_item.id, org_id)
 
 def get_item(db: Session, item_id: int, org_id: int) -> Optional[Item]:
     """Get item by ID within organization."""
-    return db.query(Item).filter(
+    return db.query(Item).options(*ITEM_LOAD_OPTIONS).filter(
         Item.id == item_id,
         Item.organization_id == org_id
     ).first()
@@ -135,10 +182,11 @@ def get_items(
     priority: Optional[PriorityLevel] = None,
     assigned_to: Optional[int] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[Cursor] = None
 ) -> List[Item]:
-    """Get items with filters."""
-    query = db.query(Item).filter(Item.organization_id == org_id)
+    """Get items with filters, newest first. Prefer cursor over skip for deep pages."""
+    query = db.query(Item).options(*ITEM_LOAD_OPTIONS).filter(Item.organization_id == org_id)
     
     if team_id:
         query = query.filter(Item.team_id == team_id)
@@ -148,32 +196,28 @@ def get_items(
         query = query.filter(Item.priority == priority)
     if assigned_to:
         query = query.join(Item.assignees).filter(User.id == assigned_to)
+    if cursor:
+        query = query.filter(after_cursor(Item.created_at, Item.id, cursor))
     
-    return query.order_by(Item.created_at.desc()).offset(skip).limit(limit).all()
+    return query.order_by(Item.created_at.desc(), Item.id.desc()).offset(skip).limit(limit).all()
 
-def update_item(db: Session, item_id: int, item_update: ItemUpdate, org_id: int, user: User) -> Optional[Item]:
-    """Update an item."""
-    db_item = get_item(db, item_id, org_id)
-    if not db_item:
-        return None
-    
-    update_data = item_update.dict(exclude_unset=True)
-    
-    # Track changes for activity log
+def _apply_item_update(db_item: Item, update_data: dict, users: Dict[int, User], tags: Dict[int, Tag]) -> dict:
+    """
+    Apply ItemUpdate fields to an item and return the changes for the activity log.
+    users and tags map the ids referenced by assignee_ids/tag_ids to loaded rows.
+    """
     changes = {}
     
     # Handle assignees separately
     if "assignee_ids" in update_data:
-        assignee_ids = update_data.pop("assignee_ids")
-        assignees = db.query(User).filter(User.id.in_(assignee_ids)).all()
-        db_item.assignees = assignees
+        assignee_ids = update_data.pop("assignee_ids") or []
+        db_item.assignees = [users[i] for i in assignee_ids if i in users]
         changes["assignees"] = assignee_ids
     
     # Handle tags separately
     if "tag_ids" in update_data:
-        tag_ids = update_data.pop("tag_ids")
-        tags = db.query(Tag).filter(Tag.id.in_(tag_ids)).all()
-        db_item.tags = tags
+        tag_ids = update_data.pop("tag_ids") or []
+        db_item.tags = [tags[i] for i in tag_ids if i in tags]
         changes["tags"] = tag_ids
     
     # Update other fields
@@ -188,8 +232,34 @@ def update_item(db: Session, item_id: int, item_update: ItemUpdate, org_id: int,
     if db_item.status == ItemStatus.DONE and not db_item.completed_at:
         db_item.completed_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(db_item)
+    # Assignee/tag changes don't touch the row, but exports key on updated_at
+    if changes:
+        db_item.updated_at = datetime.utcnow()
+    
+    return changes
+
+def _rows_by_id(db: Session, model, ids, *criteria) -> dict:
+    """Load rows of model for the given ids (and any extra criteria) in one query."""
+    if not ids:
+        return {}
+    return {row.id: row for row in db.query(model).filter(model.id.in_(set(ids)), *criteria)}
+
+def update_item(db: Session, item_id: int, item_update: ItemUpdate, org_id: int, user: User) -> Optional[Item]:
+    """Update an item."""
+    db_item = get_item(db, item_id, org_id)
+    if not db_item:
+        return None
+    
+    update_data = item_update.dict(exclude_unset=True)
+    users = _rows_by_id(db, User, update_data.get("assignee_ids"))
+    tags = _rows_by_id(db, Tag, update_data.get("tag_ids"))
+    
+    # Track changes for activity log
+    before = item_state(db_item)
+    report_users = {user.id, *(a.id for a in db_item.assignees)}
+    changes = _apply_item_update(db_item, update_data, users, tags)
+    report_users.update(a.id for a in db_item.assignees)
+    apply_stats_deltas(db, org_id, stats_deltas([(before, item_state(db_item))]))
     
     # Log activity
     if changes:
@@ -197,10 +267,13 @@ def update_item(db: Session, item_id: int, item_update: ItemUpdate, org_id: int,
             db, "updated", "item", db_item.id,
             user_id=user.id,
             item_id=db_item.id,
-            details=json.dumps(changes)
+            details=json.dumps(changes),
+            organization_id=org_id
         )
     
-    return db_item
+    db.commit()
+    invalidate_item_caches(org_id, report_users)
+    return get_item(db, db_item.id, org_id)
 
 def delete_item(db: Session, item_id: int, org_id: int, user: User) -> bool:
     """Delete an item."""
@@ -208,12 +281,306 @@ def delete_item(db: Session, item_id: int, org_id: int, user: User) -> bool:
     if not db_item:
         return False
     
-    log_activity(db, "deleted", "item", item_id, user_id=user.id)
+    log_activity(db, "deleted", "item", item_id, user_id=user.id, organization_id=org_id)
+    apply_stats_deltas(db, org_id, stats_deltas([(item_state(db_item), None)]))
+    db.add(ItemTombstone(organization_id=org_id, item_id=item_id))
+    report_users = {user.id, db_item.created_by_id, *(a.id for a in db_item.assignees)}
     
     db.delete(db_item)
     db.commit()
+    invalidate_item_caches(org_id, report_users)
     return True
 
+# ============= Bulk Item Services =============
+# Each batch runs in a single transaction: items are inserted with one
+# multi-row INSERT, assignees/tags are resolved once per batch, and
+# activity rows are written in bulk. Results are returned per input row.
+
+def bulk_create_items(db: Session, items: List[ItemCreate], org_id: int, user: User) -> List[dict]:
+    """Create many items in one transaction."""
+    results = []
+    
+    # Resolve references once for the whole batch
+    team_ids = {i.team_id for i in items if i.team_id}
+    parent_ids = {i.parent_item_id for i in items if i.parent_item_id}
+    valid_teams = set(db.scalars(
+        select(Team.id).where(Team.id.in_(team_ids), Team.organization_id == org_id)
+    )) if team_ids else set()
+    valid_parents = set(db.scalars(
+        select(Item.id).where(Item.id.in_(parent_ids), Item.organization_id == org_id)
+    )) if parent_ids else set()
+    valid_users = set(db.scalars(
+        select(User.id).where(
+            User.id.in_({u for i in items for u in i.assignee_ids or []}),
+            User.organization_id == org_id
+        )
+    ))
+    valid_tags = set(db.scalars(
+        select(Tag.id).where(Tag.id.in_({t for i in items for t in i.tag_ids or []}))
+    ))
+    
+    rows, accepted = [], []
+    for index, item in enumerate(items):
+        if item.team_id and item.team_id not in valid_teams:
+            results.append({"index": index, "status": "error", "error": "Team not found"})
+            continue
+        if item.parent_item_id and item.parent_item_id not in valid_parents:
+            results.append({"index": index, "status": "error", "error": "Parent item not found"})
+            continue
+        rows.append({
+            "title": item.title,
+            "description": item.description,
+            "status": item.status,
+            "priority": item.priority,
+            "due_date": item.due_date,
+            "estimated_hours": item.estimated_hours,
+            "organization_id": org_id,
+            "team_id": item.team_id,
+            "parent_item_id": item.parent_item_id,
+            "created_by_id": user.id
+        })
+        accepted.append((index, item))
+        results.append(None)  # placeholder, filled once ids are known
+    
+    if rows:
+        item_ids = db.scalars(
+            insert(Item).returning(Item.id, sort_by_parameter_order=True), rows
+        ).all()
+        
+        assignee_rows, tag_rows, activity_rows = [], [], []
+        for item_id, (index, item) in zip(item_ids, accepted):
+            assignee_rows += [
+                {"item_id": item_id, "user_id": u} for u in dict.fromkeys(item.assignee_ids or []) if u in valid_users
+            ]
+            tag_rows += [
+                {"item_id": item_id, "tag_id": t} for t in dict.fromkeys(item.tag_ids or []) if t in valid_tags
+            ]
+            activity_rows.append(activity_entry(
+                "created", "item", item_id, user_id=user.id, item_id=item_id, organization_id=org_id
+            ))
+            results[index] = {"index": index, "id": item_id, "status": "created"}
+        
+        if assignee_rows:
+            db.execute(item_assignees.insert(), assignee_rows)
+        if tag_rows:
+            db.execute(item_tags.insert(), tag_rows)
+        apply_stats_deltas(db, org_id, stats_deltas(
+            [(None, (row["status"], row["priority"], row["team_id"], None)) for row in rows]
+        ))
+        log_activities(db, activity_rows)
+    
+    db.commit()
+    invalidate_item_caches(org_id, [user.id, *valid_users])
+    return results
+
+def bulk_update_items(db: Session, updates: List[ItemBulkUpdateEntry], org_id: int, user: User) -> List[dict]:
+    """Apply many item updates in one transaction."""
+    items_by_id = {
+        i.id: i for i in db.query(Item).options(*ITEM_LOAD_OPTIONS).filter(
+            Item.id.in_({u.id for u in updates}),
+            Item.organization_id == org_id
+        )
+    }
+    users = _rows_by_id(
+        db, User, [a for u in updates for a in u.assignee_ids or []], User.organization_id == org_id
+    )
+    tags = _rows_by_id(db, Tag, [t for u in updates for t in u.tag_ids or []])
+    
+    results, activity_rows = [], []
+    before = {item_id: item_state(db_item) for item_id, db_item in items_by_id.items()}
+    report_users = {user.id}
+    for index, entry in enumerate(updates):
+        db_item = items_by_id.get(entry.id)
+        if not db_item:
+            results.append({"index": index, "id": entry.id, "status": "not_found", "error": "Item not found"})
+            continue
+        
+        update_data = entry.dict(exclude_unset=True, exclude={"id"})
+        report_users.update(a.id for a in db_item.assignees)
+        changes = _apply_item_update(db_item, update_data, users, tags)
+        report_users.update(a.id for a in db_item.assignees)
+        if changes:
+            activity_rows.append(activity_entry(
+                "updated", "item", db_item.id,
+                user_id=user.id, item_id=db_item.id, details=json.dumps(changes), organization_id=org_id
+            ))
+        results.append({"index": index, "id": db_item.id, "status": "updated"})
+    
+    db.flush()
+    apply_stats_deltas(db, org_id, stats_deltas(
+        (state, item_state(items_by_id[item_id])) for item_id, state in before.items()
+    ))
+    log_activities(db, activity_rows)
+    
+    db.commit()
+    invalidate_item_caches(org_id, report_users)
+    return results
+
+def bulk_delete_items(db: Session, item_ids: List[int], org_id: int, user: User) -> List[dict]:
+    """Delete many items in one transaction."""
+    states, report_users = {}, {user.id}
+    for row in db.execute(
+        select(Item.id, Item.status, Item.priority, Item.team_id, Item.actual_hours, Item.created_by_id)
+        .where(Item.id.in_(set(item_ids)), Item.organization_id == org_id)
+    ):
+        states[row.id] = item_state(row)
+        report_users.add(row.created_by_id)
+    found = set(states)
+    
+    if found:
+        report_users.update(db.scalars(
+            select(item_assignees.c.user_id).where(item_assignees.c.item_id.in_(found))
+        ))
+        # Mirror the ORM cascades of Item with set-based statements
+        db.execute(update(Item).where(Item.parent_item_id.in_(found)).values(parent_item_id=None))
+        db.execute(delete(item_assignees).where(item_assignees.c.item_id.in_(found)))
+        db.execute(delete(item_tags).where(item_tags.c.item_id.in_(found)))
+        for model in (Comment, Attachment, ActivityLog):
+            db.execute(delete(model).where(model.item_id.in_(found)))
+        db.execute(delete(Item).where(Item.id.in_(found)))
+        apply_stats_deltas(db, org_id, stats_deltas((state, None) for state in states.values()))
+        deleted_at = datetime.utcnow()
+        db.execute(insert(ItemTombstone), [
+            {"organization_id": org_id, "item_id": item_id, "deleted_at": deleted_at} for item_id in found
+        ])
+        
+        log_activities(db, [
+            activity_entry("deleted", "item", item_id, user_id=user.id, organization_id=org_id)
+            for item_id in found
+        ])
+    
+    db.commit()
+    invalidate_item_caches(org_id, report_users)
+    return [
+        {"index": index, "id": item_id, "status": "deleted"} if item_id in found
+        else {"index": index, "id": item_id, "status": "not_found", "error": "Item not found"}
+        for index, item_id in enumerate(item_ids)
+    ]
+
+# ============= Async Item Services =============
+# Async counterparts of the item services for the AsyncSession path.
+# Relationships are loaded eagerly because lazy loads can't run on the loop.
+
+def _item_select():
+    """Base item query with the relationships ItemRead serializes."""
+    return select(Item).options(*ITEM_LOAD_OPTIONS)
+
+async def create_item_async(db: AsyncSession, item: ItemCreate, org_id: int, user: User) -> Item:
+    """Create a new item."""
+    assignees = []
+    if item.assignee_ids:
+        result = await db.execute(select(User).where(User.id.in_(item.assignee_ids)))
+        assignees = list(result.scalars())
+
+    tags = []
+    if item.tag_ids:
+        result = await db.execute(select(Tag).where(Tag.id.in_(item.tag_ids)))
+        tags = list(result.scalars())
+
+    db_item = Item(
+        title=item.title,
+        description=item.description,
+        status=item.status,
+        priority=item.priority,
+        due_date=item.due_date,
+        estimated_hours=item.estimated_hours,
+        organization_id=org_id,
+        team_id=item.team_id,
+        parent_item_id=item.parent_item_id,
+        created_by_id=user.id,
+        assignees=assignees,
+        tags=tags
+    )
+    db.add(db_item)
+    await db.flush()
+
+    await apply_stats_deltas_async(db, org_id, stats_deltas([(None, item_state(db_item))]))
+
+    # Log activity
+    await log_activity_async(
+        db, "created", "item", db_item.id, user_id=user.id, item_id=db_item.id, organization_id=org_id
+    )
+
+    await db.commit()
+    invalidate_item_caches(org_id, [user.id, *(a.id for a in assignees)])
+    return db_item
+
+async def get_item_async(db: AsyncSession, item_id: int, org_id: int) -> Optional[Item]:
+    """Get item by ID within organization."""
+    result = await db.execute(
+        _item_select().where(Item.id == item_id, Item.organization_id == org_id)
+    )
+    return result.scalars().first()
+
+async def get_items_async(
+    db: AsyncSession,
+    org_id: int,
+    team_id: Optional[int] = None,
+    status: Optional[ItemStatus] = None,
+    priority: Optional[PriorityLevel] = None,
+    assigned_to: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Cursor] = None
+) -> List[Item]:
+    """Get items with filters, newest first. Prefer cursor over skip for deep pages."""
+    query = _item_select().where(Item.organization_id == org_id)
+
+    if team_id:
+        query = query.where(Item.team_id == team_id)
+    if status:
+        query = query.where(Item.status == status)
+    if priority:
+        query = query.where(Item.priority == priority)
+    if assigned_to:
+        query = query.join(Item.assignees).where(User.id == assigned_to)
+    if cursor:
+        query = query.where(after_cursor(Item.created_at, Item.id, cursor))
+
+    result = await db.execute(
+        query.order_by(Item.created_at.desc(), Item.id.desc()).offset(skip).limit(limit)
+    )
+    return list(result.scalars())
+
+async def update_item_async(
+    db: AsyncSession, item_id: int, item_update: ItemUpdate, org_id: int, user: User
+) -> Optional[Item]:
+    """Update an item."""
+    db_item = await get_item_async(db, item_id, org_id)
+    if not db_item:
+        return None
+
+    update_data = item_update.dict(exclude_unset=True)
+
+    users, tags = {}, {}
+    if update_data.get("assignee_ids"):
+        result = await db.execute(select(User).where(User.id.in_(update_data["assignee_ids"])))
+        users = {u.id: u for u in result.scalars()}
+    if update_data.get("tag_ids"):
+        result = await db.execute(select(Tag).where(Tag.id.in_(update_data["tag_ids"])))
+        tags = {t.id: t for t in result.scalars()}
+
+    # Track changes for activity log
+    before = item_state(db_item)
+    report_users = {user.id, *(a.id for a in db_item.assignees)}
+    changes = _apply_item_update(db_item, update_data, users, tags)
+    report_users.update(a.id for a in db_item.assignees)
+    await apply_stats_deltas_async(db, org_id, stats_deltas([(before, item_state(db_item))]))
+
+    # Log activity
+    if changes:
+        await log_activity_async(
+            db, "updated", "item", db_item.id,
+            user_id=user.id,
+            item_id=db_item.id,
+            details=json.dumps(changes),
+            organization_id=org_id
+        )
+
+    await db.commit()
+    invalidate_item_caches(org_id, report_users)
+    return db_item
+
 # ============= Comment Services =============
 def create_comment(db: Session, comment: CommentCreate, user: User, org_id: int) -> Optional[Comment]:
     """Create a comment on an item."""
@@ -228,20 +595,34 @@ def create_comment(db: Session, comment: CommentCreate, user: User, org_id: int)
         author_id=user.id
     )
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
     
-    log_activity(db, "commented", "item", item.id, user_id=user.id, item_id=item.id)
+    log_activity(db, "commented", "item", item.id, user_id=user.id, item_id=item.id, organization_id=org_id)
     
+    db.commit()
+    invalidate_user_reports(org_id, [user.id])
+    db.refresh(db_comment)
     return db_comment
 
-def get_comments_by_item(db: Session, item_id: int, org_id: int) -> List[Comment]:
-    """Get all comments for an item."""
-    item = get_item(db, item_id, org_id)
-    if not item:
+def get_comments_by_item(
+    db: Session,
+    item_id: int,
+    org_id: int,
+    limit: int = 100,
+    cursor: Optional[Cursor] = None
+) -> List[Comment]:
+    """Get comments for an item, newest first."""
+    item_exists = db.query(Item.id).filter(
+        Item.id == item_id,
+        Item.organization_id == org_id
+    ).first()
+    if not item_exists:
         return []
     
-    return db.query(Comment).filter(Comment.item_id == item_id).order_by(Comment.created_at.desc()).all()
+    query = db.query(Comment).filter(Comment.item_id == item_id)
+    if cursor:
+        query = query.filter(after_cursor(Comment.created_at, Comment.id, cursor))
+    
+    return query.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit).all()
 
 # ============= Tag Services =============
 def create_tag(db: Session, tag: TagCreate) -> Tag:
@@ -261,7 +642,8 @@ def create_api_key(db: Session, api_key_data: APIKeyCreate, org_id: int) -> APIK
     """Create a new API key."""
     key = generate_api_key()
     db_api_key = APIKey(
-        key=key,
+        key_hash=hash_api_key(key),
+        key_prefix=key[:API_KEY_PREFIX_LENGTH],
         name=api_key_data.name,
         organization_id=org_id,
         expires_at=api_key_data.expires_at
@@ -269,12 +651,32 @@ def create_api_key(db: Session, api_key_data: APIKeyCreate, org_id: int) -> APIK
     db.add(db_api_key)
     db.commit()
     db.refresh(db_api_key)
+    
+    # Only the digest is stored; hand the raw key back to the caller once
+    db_api_key.key = key
     return db_api_key
 
 def get_api_keys(db: Session, org_id: int) -> List[APIKey]:
     """Get all API keys for an organization."""
     return db.query(APIKey).filter(APIKey.organization_id == org_id).all()
 
+def deactivate_api_key(db: Session, key_id: int, org_id: int) -> Optional[APIKey]:
+    """Deactivate an API key and drop it from the verification cache."""
+    db_api_key = db.query(APIKey).filter(
+        APIKey.id == key_id,
+        APIKey.organization_id == org_id
+    ).first()
+    if not db_api_key:
+        return None
+    
+    db_api_key.is_active = False
+    db.commit()
+    db.refresh(db_api_key)
+    
+    api_key_cache.delete(db_api_key.key_hash)
+    
+    return db_api_key
+
 # ============= Webhook Services =============
 def create_webhook(db: Session, webhook: WebhookCreate, org_id: int) -> Webhook:
     """Create a new webhook."""
@@ -294,6 +696,60 @@ def get_webhooks(db: Session, org_id: int) -> List[Webhook]:
     return db.query(Webhook).filter(Webhook.organization_id == org_id).all()
 
 # ============= Activity Log Services =============
+# Activity rows join the caller's transaction and are committed with the
+# change they describe. With ACTIVITY_LOG_MODE=buffered they are held on
+# the session and queued for bulk inserts by activity_log_writer once it
+# commits; a rollback or close discards them.
+
+PENDING_ACTIVITY_KEY = "pending_activity"
+
+def _hold_until_commit(session: Session, entries: List[dict]):
+    """Keep buffered activity rows on the session until its transaction commits."""
+    if not session.in_transaction():
+        session.begin()
+    session.info.setdefault(PENDING_ACTIVITY_KEY, []).extend(entries)
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_pending_activity(session: Session):
+    entries = session.info.pop(PENDING_ACTIVITY_KEY, None)
+    if entries:
+        activity_log_writer.enqueue(entries)
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_activity(session: Session, transaction):
+    # Runs after after_commit, so only rows of an uncommitted transaction remain
+    if transaction.parent is None:
+        session.info.pop(PENDING_ACTIVITY_KEY, None)
+
+def activity_entry(
+    action: str,
+    entity_type: str,
+    entity_id: int,
+    user_id: Optional[int] = None,
+    item_id: Optional[int] = None,
+    details: Optional[str] = None,
+    organization_id: Optional[int] = None
+) -> dict:
+    """Column values for one ActivityLog row."""
+    return {
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "user_id": user_id,
+        "item_id": item_id,
+        "details": details,
+        "organization_id": organization_id
+    }
+
+def log_activities(db: Session, entries: List[dict]):
+    """Log many activities with one multi-row insert. The caller commits."""
+    if not entries:
+        return
+    if ACTIVITY_LOG_MODE == "buffered":
+        _hold_until_commit(db, entries)
+        return
+    db.execute(insert(ActivityLog), entries)
+
 def log_activity(
     db: Session,
     action: str,
@@ -301,78 +757,88 @@ def log_activity(
     entity_id: int,
     user_id: Optional[int] = None,
     item_id: Optional[int] = None,
-    details: Optional[str] = None
+    details: Optional[str] = None,
+    organization_id: Optional[int] = None
 ):
-    """Log an activity."""
-    activity = ActivityLog(
-        action=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        user_id=user_id,
-        item_id=item_id,
-        details=details
-    )
-    db.add(activity)
-    db.commit()
+    """Log an activity. The caller commits."""
+    log_activities(db, [activity_entry(action, entity_type, entity_id, user_id, item_id, details, organization_id)])
+
+async def log_activity_async(
+    db: AsyncSession,
+    action: str,
+    entity_type: str,
+    entity_id: int,
+    user_id: Optional[int] = None,
+    item_id: Optional[int] = None,
+    details: Optional[str] = None,
+    organization_id: Optional[int] = None
+):
+    """Log an activity on an async session. The caller commits."""
+    entries = [activity_entry(action, entity_type, entity_id, user_id, item_id, details, organization_id)]
+    if ACTIVITY_LOG_MODE == "buffered":
+        _hold_until_commit(db.sync_session, entries)
+        return
+    await db.execute(insert(ActivityLog), entries)
 
 def get_activity_logs(
     db: Session,
     org_id: int,
     item_id: Optional[int] = None,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[Cursor] = None
 ) -> List[ActivityLog]:
-    """Get activity logs."""
-    query = db.query(ActivityLog).join(User).filter(User.organization_id == org_id)
+    """Get activity logs, newest first."""
+    query = db.query(ActivityLog).filter(ActivityLog.organization_id == org_id)
     
     if item_id:
         query = query.filter(ActivityLog.item_id == item_id)
+    if cursor:
+        query = query.filter(after_cursor(ActivityLog.created_at, ActivityLog.id, cursor))
     
-    return query.order_by(ActivityLog.created_at.desc()).limit(limit).all()
+    return query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit).all()
 
 # ============= Analytics Services =============
+def invalidate_user_reports(org_id: int, user_ids: Iterable[int]):
+    """Drop cached user reports. Call after a change to the users' items or activity commits."""
+    for user_id in set(user_ids):
+        user_report_cache.delete((org_id, user_id))
+
+def invalidate_item_caches(org_id: int, user_ids: Iterable[int] = ()):
+    """
+    Drop cached results derived from items. Call after item writes commit.
+    user_ids are the users whose reports the write touched: the actor, and
+    the creator and old/new assignees of each item.
+    """
+    analytics_cache.delete(org_id)
+    invalidate_user_reports(org_id, user_ids)
+
 def get_item_analytics(db: Session, org_id: int):
-    """Get item analytics for an organization."""
-    total_items = db.query(func.count(Item.id)).filter(Item.organization_id == org_id).scalar()
-    
-    # By status
-    by_status = {}
-    for status in ItemStatus:
-        count = db.query(func.count(Item.id)).filter(
-            Item.organization_id == org_id,
-            Item.status == status
-        ).scalar()
-        by_status[status.value] = count
-    
-    # By priority
-    by_priority = {}
-    for priority in PriorityLevel:
-        count = db.query(func.count(Item.id)).filter(
-            Item.organization_id == org_id,
-            Item.priority == priority
-        ).scalar()
-        by_priority[priority.value] = count
-    
-    # Overdue items
-    overdue = db.query(func.count(Item.id)).filter(
-        Item.organization_id == org_id,
-        Item.due_date < datetime.utcnow(),
-        Item.status != ItemStatus.DONE
-    ).scalar()
-    
-    # Completed this week
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    completed_week = db.query(func.count(Item.id)).filter(
-        Item.organization_id == org_id,
-        Item.completed_at >= week_ago
-    ).scalar()
-    
-    # Average completion time
-    avg_time = db.query(func.avg(Item.actual_hours)).filter(
-        Item.organization_id == org_id,
-        Item.actual_hours.isnot(None)
-    ).scalar()
-    
-    return {
+    """Get item analytics for an organization.
+    
+    Counts and the hours average come from the org_item_stats counters; only
+    the time-dependent figures query items, through index range scans.
+    Results are cached per organization for ANALYTICS_CACHE_TTL_SECONDS.
+    """
+    if ANALYTICS_CACHE_TTL_SECONDS > 0:
+        cached = analytics_cache.get(org_id)
+        if cached is not None:
+            return cached
+    
+    stats = get_org_item_stats(db, org_id)
+    total_items, hours_count, hours_total = stats.get(TOTAL_KEY, (0, 0, 0))
+    by_status = {status.value: stats.get(("status", status.value), (0,))[0] for status in ItemStatus}
+    by_priority = {priority.value: stats.get(("priority", priority.value), (0,))[0] for priority in PriorityLevel}
+    avg_time = hours_total / hours_count if hours_count else None
+    
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    org_items = select(func.count(Item.id)).where(Item.organization_id == org_id)
+    overdue, completed_week = db.execute(select(
+        org_items.where(Item.due_date < now, Item.status != ItemStatus.DONE).scalar_subquery(),
+        org_items.where(Item.completed_at >= week_ago).scalar_subquery()
+    )).one()
+    
+    analytics = {
         "total_items": total_items,
         "by_status": by_status,
         "by_priority": by_priority,
@@ -380,6 +846,9 @@ def get_item_analytics(db: Session, org_id: int):
         "completed_this_week": completed_week,
         "avg_completion_time_hours": float(avg_time) if avg_time else None
     }
+    if ANALYTICS_CACHE_TTL_SECONDS > 0:
+        analytics_cache.set(org_id, analytics)
+    return analytics
 
 def log_usage(db: Session, org_id: int, endpoint: str, method: str, status_code: int, response_time_ms: int):
     """Log API usage."""
@@ -393,32 +862,54 @@ def log_usage(db: Session, org_id: int, endpoint: str, method: str, status_code:
     db.add(usage)
     db.commit()
 
+LATENCY_QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+def _percentiles(sketch: QuantileSketch) -> dict:
+    """Latency percentiles in ms, or an empty dict for an empty sketch."""
+    if not sketch.count:
+        return {}
+    return {name: round(sketch.quantile(q), 2) for name, q in LATENCY_QUANTILES.items()}
+
 def get_usage_analytics(db: Session, org_id: int, days: int = 7):
-    """Get usage analytics."""
-    since = datetime.utcnow() - timedelta(days=days)
-    
-    logs = db.query(UsageLog).filter(
-        UsageLog.organization_id == org_id,
-        UsageLog.timestamp >= since
-    ).all()
+    """Get usage analytics with an hourly time series.
     
-    total_requests = len(logs)
+    Aggregated in SQL from the usage rollups plus the raw rows not yet
+    rolled up; the window starts at the hour `days` ago.
+    """
+    since = floor_to(datetime.utcnow() - timedelta(days=days), "hour")
     
-    # By endpoint
     by_endpoint = {}
-    for log in logs:
-        by_endpoint[log.endpoint] = by_endpoint.get(log.endpoint, 0) + 1
-    
-    # Average response time
-    avg_response = sum(log.response_time_ms for log in logs) / total_requests if total_requests > 0 else 0
-    
-    # Error rate
-    errors = sum(1 for log in logs if log.status_code >= 400)
-    error_rate = (errors / total_requests * 100) if total_requests > 0 else 0
+    buckets = {}
+    for bucket_start, endpoint, requests, errors, response_ms in hourly_usage(db, org_id, since):
+        by_endpoint[endpoint] = by_endpoint.get(endpoint, 0) + requests
+        bucket = buckets.setdefault(bucket_start, [0, 0, 0])
+        bucket[0] += requests
+        bucket[1] += errors
+        bucket[2] += response_ms
+    
+    total_requests = sum(b[0] for b in buckets.values())
+    errors = sum(b[1] for b in buckets.values())
+    response_ms = sum(b[2] for b in buckets.values())
+    
+    sketches = latency_sketches(db, org_id, since)
+    overall = QuantileSketch()
+    for sketch in sketches.values():
+        overall.merge(sketch)
     
     return {
         "total_requests": total_requests,
         "requests_by_endpoint": by_endpoint,
-        "avg_response_time_ms": avg_response,
-        "error_rate": error_rate
+        "avg_response_time_ms": response_ms / total_requests if total_requests > 0 else 0,
+        "error_rate": (errors / total_requests * 100) if total_requests > 0 else 0,
+        "latency_percentiles": _percentiles(overall),
+        "latency_by_endpoint": {endpoint: _percentiles(sketch) for endpoint, sketch in sketches.items()},
+        "timeseries": [
+            {
+                "bucket_start": bucket_start,
+                "requests": requests,
+                "errors": bucket_errors,
+                "avg_response_time_ms": bucket_ms / requests if requests else 0
+            }
+            for bucket_start, (requests, bucket_errors, bucket_ms) in sorted(buckets.items())
+        ]
     }
@@ -0,0 +1,85 @@
+"""
+Mergeable quantile sketch for latency percentiles (DDSketch-style).
+
+Values are counted in logarithmically sized bins, so any quantile is
+returned within a fixed relative error and two sketches merge by adding
+bin counts. The number of bins is capped: once full, the lowest bins are
+collapsed together, which keeps the tail (p95/p99) accurate.
+"""
+
+import json
+import math
+from typing import Dict, Optional
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_MAX_BINS = 2048
+
+_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+# Smallest value counted in a log bin; anything below counts as zero
+_MIN_VALUE = 1e-3
+
+
+class QuantileSketch:
+    """Quantile sketch over non-negative values with bounded memory."""
+
+    __slots__ = ("bins", "zero_count", "max_bins")
+
+    def __init__(self, max_bins: int = SKETCH_MAX_BINS):
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.max_bins = max_bins
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        """Count a value (e.g. a response time in milliseconds)."""
+        if value < _MIN_VALUE:
+            self.zero_count += count
+            return
+        key = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add another sketch's counts into this one."""
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1), or None if the sketch is empty."""
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * _GAMMA ** key / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.bins) / (_GAMMA + 1)
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins]
+        target = keys[len(excess)]
+        self.bins[target] += sum(self.bins.pop(key) for key in excess)
+
+    def to_json(self) -> str:
+        return json.dumps({"z": self.zero_count, "b": [[k, c] for k, c in self.bins.items()]}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data: str) -> "QuantileSketch":
+        raw = json.loads(data)
+        sketch = cls()
+        sketch.zero_count = raw["z"]
+        sketch.bins = {key: count for key, count in raw["b"]}
+        return sketch
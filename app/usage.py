@@ -0,0 +1,260 @@
+"""
+Usage analytics rollups.
+
+A periodic job aggregates raw usage_logs rows into per-minute buckets and
+minute buckets into hourly ones (usage_rollups_minute / usage_rollups_hour),
+and merges each closed hour's latency sketch rows into one per endpoint.
+Reads combine hourly rollups, the minute rollups newer than the last full
+hour, and the raw rows newer than the last rolled-up minute, so results are
+current without scanning raw logs for the whole window.
+
+The job runs every USAGE_ROLLUP_INTERVAL_SECONDS (0 disables it) in
+whichever worker process holds its lease, since concurrent passes would
+rewrite the same buckets; `python -m app.usage` runs a single pass under
+the same lease, e.g. from cron.
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import DateTime, case, delete, func, insert, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal
+from app.leases import LEASE_PASSES, acquire_lease
+from app.models import UsageLog, UsageLatencySketch, UsageRollupHour, UsageRollupMinute, UsageRollupState
+from app.sketch import QuantileSketch
+from app.writers import BackgroundWriter
+
+USAGE_ROLLUP_INTERVAL_SECONDS = float(os.getenv("USAGE_ROLLUP_INTERVAL_SECONDS", "60"))
+# Raw rows younger than this are left for the next pass, so late inserts aren't missed
+USAGE_ROLLUP_LAG_SECONDS = int(os.getenv("USAGE_ROLLUP_LAG_SECONDS", "120"))
+USAGE_MINUTE_ROLLUP_RETENTION_HOURS = int(os.getenv("USAGE_MINUTE_ROLLUP_RETENTION_HOURS", "48"))
+USAGE_ROLLUP_LEASE = "usage_rollup"
+
+# (bucket_start, endpoint, request_count, error_count, total_response_time_ms)
+UsageBucketRow = Tuple[datetime, str, int, int, int]
+
+_SQLITE_FORMATS = {"minute": "%Y-%m-%d %H:%M:00.000000", "hour": "%Y-%m-%d %H:00:00.000000"}
+_MYSQL_FORMATS = {"minute": "%Y-%m-%d %H:%i:00", "hour": "%Y-%m-%d %H:00:00"}
+
+
+def floor_to(value: datetime, unit: str) -> datetime:
+    """Truncate a datetime to the start of its minute or hour."""
+    value = value.replace(second=0, microsecond=0)
+    return value.replace(minute=0) if unit == "hour" else value
+
+
+def _truncate(column, unit: str, dialect_name: str):
+    """SQL expression truncating a datetime column to a minute or hour."""
+    if dialect_name == "postgresql":
+        expr = func.date_trunc(unit, column)
+    elif dialect_name == "mysql":
+        expr = func.date_format(column, _MYSQL_FORMATS[unit])
+    else:
+        # Matches SQLAlchemy's SQLite datetime storage format, so stored
+        # buckets compare correctly against bound datetimes
+        expr = func.strftime(_SQLITE_FORMATS[unit], column)
+    return type_coerce(expr, DateTime)
+
+
+def _aggregate(source, unit: str, dialect_name: str):
+    """SELECT of rollup columns from raw logs (source=None) or a rollup table."""
+    if source is None:
+        bucket_expr = _truncate(UsageLog.timestamp, unit, dialect_name)
+        return select(
+            UsageLog.organization_id,
+            bucket_expr,
+            UsageLog.endpoint,
+            func.count(),
+            func.count(case((UsageLog.status_code >= 400, 1))),
+            func.coalesce(func.sum(UsageLog.response_time_ms), 0)
+        ).where(UsageLog.organization_id.isnot(None)).group_by(
+            UsageLog.organization_id, bucket_expr, UsageLog.endpoint
+        )
+    bucket_expr = _truncate(source.bucket_start, unit, dialect_name)
+    return select(
+        source.organization_id,
+        bucket_expr,
+        source.endpoint,
+        func.sum(source.request_count),
+        func.sum(source.error_count),
+        func.sum(source.total_response_time_ms)
+    ).group_by(source.organization_id, bucket_expr, source.endpoint)
+
+
+def _watermark(db: Session, name: str) -> Optional[datetime]:
+    state = db.get(UsageRollupState, name)
+    return state.rolled_up_to if state else None
+
+
+def _set_watermark(db: Session, name: str, value: datetime) -> None:
+    state = db.get(UsageRollupState, name)
+    if state is None:
+        db.add(UsageRollupState(name=name, rolled_up_to=value))
+    else:
+        state.rolled_up_to = value
+    db.flush()
+
+
+def _roll_up_range(db: Session, target, source, start: datetime, end: datetime, unit: str) -> None:
+    """Recompute target buckets in [start, end). Safe to repeat."""
+    dialect_name = db.get_bind().dialect.name
+    time_column = UsageLog.timestamp if source is None else source.bucket_start
+    db.execute(delete(target).where(target.bucket_start >= start, target.bucket_start < end))
+    query = _aggregate(source, unit, dialect_name).where(time_column >= start, time_column < end)
+    db.execute(insert(target).from_select(
+        ["organization_id", "bucket_start", "endpoint", "request_count", "error_count", "total_response_time_ms"],
+        query
+    ))
+
+
+def roll_up_usage(db: Session, now: Optional[datetime] = None) -> None:
+    """
+    Advance the minute and hour rollups up to now minus the lag. The caller
+    holds USAGE_ROLLUP_LEASE and commits.
+    """
+    now = now or datetime.utcnow()
+
+    minute_end = floor_to(now - timedelta(seconds=USAGE_ROLLUP_LAG_SECONDS), "minute")
+    minute_start = _watermark(db, "minute")
+    if minute_start is None:
+        first = db.scalar(select(func.min(UsageLog.timestamp)))
+        minute_start = floor_to(first, "minute") if first else minute_end
+    if minute_start < minute_end:
+        _roll_up_range(db, UsageRollupMinute, None, minute_start, minute_end, "minute")
+    _set_watermark(db, "minute", max(minute_start, minute_end))
+
+    hour_end = floor_to(max(minute_start, minute_end), "hour")
+    hour_start = _watermark(db, "hour")
+    if hour_start is None:
+        first = db.scalar(select(func.min(UsageRollupMinute.bucket_start)))
+        hour_start = floor_to(first, "hour") if first else hour_end
+    if hour_start < hour_end:
+        _roll_up_range(db, UsageRollupHour, UsageRollupMinute, hour_start, hour_end, "hour")
+    _set_watermark(db, "hour", max(hour_start, hour_end))
+
+    sketch_start = _watermark(db, "sketch")
+    if sketch_start is None:
+        first = db.scalar(select(func.min(UsageLatencySketch.bucket_start)))
+        sketch_start = first if first else hour_end
+    if sketch_start < hour_end:
+        _compact_sketches(db, sketch_start, hour_end)
+    _set_watermark(db, "sketch", max(sketch_start, hour_end))
+
+    # Minute buckets are only needed until their hour is rolled up
+    prune_before = min(hour_end, floor_to(now - timedelta(hours=USAGE_MINUTE_ROLLUP_RETENTION_HOURS), "hour"))
+    db.execute(delete(UsageRollupMinute).where(UsageRollupMinute.bucket_start < prune_before))
+
+
+def _compact_sketches(db: Session, start: datetime, end: datetime) -> None:
+    """
+    Merge the sketch rows of each (org, endpoint, hour) in [start, end) into one.
+
+    Runs under the rollup lease. Should another process have compacted the
+    same rows anyway (an expired lease), the delete comes up short and the
+    pass is aborted rather than counting those requests twice.
+    """
+    groups = defaultdict(list)
+    for row in db.execute(
+        select(
+            UsageLatencySketch.id, UsageLatencySketch.organization_id, UsageLatencySketch.endpoint,
+            UsageLatencySketch.bucket_start, UsageLatencySketch.sketch
+        ).where(UsageLatencySketch.bucket_start >= start, UsageLatencySketch.bucket_start < end)
+    ):
+        groups[(row.organization_id, row.endpoint, row.bucket_start)].append(row)
+
+    for (org_id, endpoint, bucket_start), rows in groups.items():
+        if len(rows) < 2:
+            continue
+        merged = QuantileSketch()
+        for row in rows:
+            merged.merge(QuantileSketch.from_json(row.sketch))
+        deleted = db.execute(
+            delete(UsageLatencySketch).where(UsageLatencySketch.id.in_([row.id for row in rows]))
+        ).rowcount
+        if deleted != len(rows):
+            raise RuntimeError(f"Latency sketches for {endpoint} at {bucket_start} were compacted concurrently")
+        db.add(UsageLatencySketch(
+            organization_id=org_id, endpoint=endpoint, bucket_start=bucket_start, sketch=merged.to_json()
+        ))
+    db.flush()
+
+
+def latency_sketches(db: Session, org_id: int, since: datetime) -> Dict[str, QuantileSketch]:
+    """Response-time sketches per endpoint for an organization, merged from `since`."""
+    sketches: Dict[str, QuantileSketch] = {}
+    for endpoint, data in db.execute(
+        select(UsageLatencySketch.endpoint, UsageLatencySketch.sketch).where(
+            UsageLatencySketch.organization_id == org_id,
+            UsageLatencySketch.bucket_start >= since
+        )
+    ):
+        sketch = QuantileSketch.from_json(data)
+        if endpoint in sketches:
+            sketches[endpoint].merge(sketch)
+        else:
+            sketches[endpoint] = sketch
+    return sketches
+
+
+def hourly_usage(db: Session, org_id: int, since: datetime) -> Iterator[UsageBucketRow]:
+    """Hourly usage buckets for an organization from `since` (hour-aligned) until now."""
+    dialect_name = db.get_bind().dialect.name
+    hour_end = max(_watermark(db, "hour") or since, since)
+    minute_end = max(_watermark(db, "minute") or hour_end, hour_end)
+
+    yield from db.execute(
+        select(
+            UsageRollupHour.bucket_start, UsageRollupHour.endpoint, UsageRollupHour.request_count,
+            UsageRollupHour.error_count, UsageRollupHour.total_response_time_ms
+        ).where(
+            UsageRollupHour.organization_id == org_id,
+            UsageRollupHour.bucket_start >= since,
+            UsageRollupHour.bucket_start < hour_end
+        )
+    )
+    for source, time_column, start, end in (
+        (UsageRollupMinute, UsageRollupMinute.bucket_start, hour_end, minute_end),
+        (None, UsageLog.timestamp, minute_end, None),
+    ):
+        if end is not None and start >= end:
+            continue
+        query = _aggregate(source, "hour", dialect_name).where(time_column >= start)
+        if end is not None:
+            query = query.where(time_column < end)
+        org_column = UsageLog.organization_id if source is None else source.organization_id
+        for _, *row in db.execute(query.where(org_column == org_id)):
+            yield tuple(row)
+
+
+class UsageRollupJob(BackgroundWriter):
+    """Runs roll_up_usage periodically on the event loop."""
+
+    async def flush(self) -> None:
+        async with AsyncSessionLocal() as db:
+            ttl = self.flush_interval_seconds * LEASE_PASSES
+            if await db.run_sync(acquire_lease, USAGE_ROLLUP_LEASE, ttl):
+                await db.run_sync(roll_up_usage)
+                await db.commit()
+
+
+# Singleton instance
+usage_rollup_job = UsageRollupJob(USAGE_ROLLUP_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if not acquire_lease(db, USAGE_ROLLUP_LEASE, USAGE_ROLLUP_INTERVAL_SECONDS * LEASE_PASSES):
+            print("Another process holds the usage rollup lease; skipped")
+        else:
+            roll_up_usage(db)
+            db.commit()
+            print(f"Usage rolled up to {_watermark(db, 'minute')} (minutes), {_watermark(db, 'hour')} (hours)")
+    finally:
+        db.close()
@@ -0,0 +1,348 @@
+"""
+Write-behind buffers for high-frequency, low-value writes.
+Values are collected in memory and flushed to the database in batches
+by a background task, so request handlers never wait on a commit.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, insert, update
+
+from app.database import AsyncSessionLocal
+from app.models import User, APIKey, ActivityLog, UsageLog, UsageLatencySketch
+from app.sketch import QuantileSketch
+
+logger = logging.getLogger(__name__)
+
+LAST_SEEN_FLUSH_INTERVAL_SECONDS = float(os.getenv("LAST_SEEN_FLUSH_INTERVAL_SECONDS", "30"))
+LAST_SEEN_GRANULARITY_SECONDS = int(os.getenv("LAST_SEEN_GRANULARITY_SECONDS", "60"))
+
+# "transactional" writes activity rows in the caller's transaction;
+# "buffered" queues them for bulk inserts (higher throughput, not atomic)
+ACTIVITY_LOG_MODE = os.getenv("ACTIVITY_LOG_MODE", "transactional").lower()
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", "500"))
+ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS", "1"))
+
+# Request usage records: the buffer is a ring; when full the oldest record is dropped and counted
+USAGE_LOG_BUFFER_SIZE = int(os.getenv("USAGE_LOG_BUFFER_SIZE", "10000"))
+USAGE_LOG_BATCH_SIZE = int(os.getenv("USAGE_LOG_BATCH_SIZE", "1000"))
+USAGE_LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_LOG_FLUSH_INTERVAL_SECONDS", "2"))
+
+# Latency sketches: one per (org, endpoint, hour) in memory, each with a bounded bin count
+USAGE_SKETCH_MAX_KEYS = int(os.getenv("USAGE_SKETCH_MAX_KEYS", "5000"))
+USAGE_SKETCH_FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_SKETCH_FLUSH_INTERVAL_SECONDS", "60"))
+
+# Keeps each UPDATE ... CASE statement well under bind parameter limits
+FLUSH_CHUNK_SIZE = 500
+
+
+class BackgroundWriter:
+    """Base class running flush() on an interval until stopped."""
+
+    def __init__(self, flush_interval_seconds: float):
+        self.flush_interval_seconds = flush_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def flush(self) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop (an interval of 0 disables it)."""
+        if self._task is None and self.flush_interval_seconds > 0:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def request_flush(self) -> None:
+        """Flush before the interval elapses. Safe to call from any thread."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def stop(self) -> None:
+        """Stop the periodic task and flush whatever is still buffered. No-op if it never started."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"{type(self).__name__} flush failed: {e}", exc_info=True)
+
+
+class LastSeenWriter(BackgroundWriter):
+    """
+    Coalesces User.last_login and APIKey.last_used_at updates.
+
+    Each id is recorded at most once per granularity window, and a flush
+    writes one UPDATE ... CASE statement per table instead of a commit
+    per authenticated request.
+    """
+
+    def __init__(
+        self,
+        granularity_seconds: int = LAST_SEEN_GRANULARITY_SECONDS,
+        flush_interval_seconds: float = LAST_SEEN_FLUSH_INTERVAL_SECONDS
+    ):
+        super().__init__(flush_interval_seconds)
+        self.granularity = timedelta(seconds=granularity_seconds)
+        self._lock = threading.Lock()
+        self._pending: Dict[type, Dict[int, datetime]] = {User: {}, APIKey: {}}
+        self._recorded: Dict[type, Dict[int, datetime]] = {User: {}, APIKey: {}}
+
+    def touch_user(self, user_id: int, seen_at: Optional[datetime] = None) -> None:
+        """Record that a user authenticated."""
+        self._touch(User, user_id, seen_at)
+
+    def touch_api_key(self, api_key_id: int, seen_at: Optional[datetime] = None) -> None:
+        """Record that an API key was used."""
+        self._touch(APIKey, api_key_id, seen_at)
+
+    def _touch(self, model: type, entity_id: int, seen_at: Optional[datetime]) -> None:
+        seen_at = seen_at or datetime.utcnow()
+        with self._lock:
+            recorded = self._recorded[model].get(entity_id)
+            if recorded is not None and seen_at - recorded < self.granularity:
+                return
+            self._recorded[model][entity_id] = seen_at
+            self._pending[model][entity_id] = seen_at
+
+    async def flush(self) -> None:
+        """Write all buffered timestamps in one transaction."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {User: {}, APIKey: {}}
+            # Forget ids outside the window so the map stays bounded
+            cutoff = datetime.utcnow() - self.granularity
+            for recorded in self._recorded.values():
+                for entity_id in [i for i, ts in recorded.items() if ts < cutoff]:
+                    del recorded[entity_id]
+
+        if not any(pending.values()):
+            return
+
+        async with AsyncSessionLocal() as db:
+            for model, column, values in (
+                (User, "last_login", pending[User]),
+                (APIKey, "last_used_at", pending[APIKey]),
+            ):
+                ids = list(values)
+                for start in range(0, len(ids), FLUSH_CHUNK_SIZE):
+                    chunk = {i: values[i] for i in ids[start:start + FLUSH_CHUNK_SIZE]}
+                    await db.execute(
+                        update(model)
+                        .where(model.id.in_(chunk))
+                        .values({column: case(chunk, value=model.id)})
+                        .execution_options(synchronize_session=False)
+                    )
+            await db.commit()
+
+
+class ActivityLogWriter(BackgroundWriter):
+    """
+    Queues activity rows and writes them with bulk inserts.
+
+    Used when ACTIVITY_LOG_MODE is "buffered". Rows are flushed once the
+    queue reaches the batch size or the interval elapses, and on shutdown.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = ACTIVITY_LOG_BATCH_SIZE,
+        flush_interval_seconds: float = ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS
+    ):
+        super().__init__(flush_interval_seconds)
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._queue: List[dict] = []
+
+    def enqueue(self, entries: List[dict]) -> None:
+        """Queue activity rows (ActivityLog column values)."""
+        created_at = datetime.utcnow()
+        with self._lock:
+            self._queue.extend({"created_at": created_at, **entry} for entry in entries)
+            full = len(self._queue) >= self.batch_size
+        if full:
+            self.request_flush()
+
+    async def flush(self) -> None:
+        """Insert all queued rows."""
+        with self._lock:
+            rows, self._queue = self._queue, []
+        if not rows:
+            return
+
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(rows), self.batch_size):
+                await db.execute(insert(ActivityLog), rows[start:start + self.batch_size])
+            await db.commit()
+
+
+class UsageLogWriter(BackgroundWriter):
+    """
+    Collects per-request usage records in a bounded ring buffer and writes
+    them to usage_logs with bulk inserts.
+
+    Recording never blocks or touches the database. If the buffer fills
+    faster than it drains, the oldest records are overwritten and counted
+    in `dropped`. Records from a failed flush go back into the buffer for
+    the next one, as far as it has room.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = USAGE_LOG_BUFFER_SIZE,
+        batch_size: int = USAGE_LOG_BATCH_SIZE,
+        flush_interval_seconds: float = USAGE_LOG_FLUSH_INTERVAL_SECONDS
+    ):
+        super().__init__(flush_interval_seconds)
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._lock = threading.Lock()
+        self._buffer: deque = deque(maxlen=buffer_size)
+
+    def record(
+        self,
+        organization_id: int,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        response_time_ms: int,
+        timestamp: Optional[datetime] = None
+    ) -> None:
+        """Buffer one request's usage record."""
+        entry = {
+            "organization_id": organization_id,
+            "endpoint": endpoint,
+            "method": method,
+            "status_code": status_code,
+            "response_time_ms": response_time_ms,
+            "timestamp": timestamp or datetime.utcnow(),
+        }
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.request_flush()
+
+    async def flush(self) -> None:
+        """Insert all buffered records."""
+        with self._lock:
+            rows = list(self._buffer)
+            self._buffer.clear()
+            dropped, self._reported_dropped = self.dropped - self._reported_dropped, self.dropped
+        if dropped:
+            logger.warning(f"Usage log buffer overflowed; dropped {dropped} records")
+        if not rows:
+            return
+
+        try:
+            async with AsyncSessionLocal() as db:
+                for start in range(0, len(rows), self.batch_size):
+                    await db.execute(insert(UsageLog), rows[start:start + self.batch_size])
+                await db.commit()
+        except BaseException:
+            # Also on cancellation, so stop() can write them in its final flush
+            self._requeue(rows)
+            raise
+
+    def _requeue(self, rows: List[dict]) -> None:
+        """Put unwritten records back ahead of newer ones, dropping the oldest that don't fit."""
+        with self._lock:
+            room = self._buffer.maxlen - len(self._buffer)
+            kept = rows[len(rows) - room:] if room else []
+            self.dropped += len(rows) - len(kept)
+            self._buffer.extendleft(reversed(kept))
+
+
+class LatencySketchWriter(BackgroundWriter):
+    """
+    Folds response times into quantile sketches per organization, endpoint
+    and hour, and appends them to usage_latency_sketches on each flush.
+
+    Memory is bounded by USAGE_SKETCH_MAX_KEYS sketches of at most
+    SKETCH_MAX_BINS bins each; records for new keys beyond that are counted
+    in `dropped`.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = USAGE_SKETCH_MAX_KEYS,
+        flush_interval_seconds: float = USAGE_SKETCH_FLUSH_INTERVAL_SECONDS
+    ):
+        super().__init__(flush_interval_seconds)
+        self.max_keys = max_keys
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._lock = threading.Lock()
+        self._sketches: Dict[tuple, QuantileSketch] = {}
+
+    def record(
+        self,
+        organization_id: int,
+        endpoint: str,
+        response_time_ms: float,
+        timestamp: Optional[datetime] = None
+    ) -> None:
+        """Add one response time to its hourly sketch."""
+        bucket_start = (timestamp or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+        key = (organization_id, endpoint, bucket_start)
+        with self._lock:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                if len(self._sketches) >= self.max_keys:
+                    self.dropped += 1
+                    return
+                sketch = self._sketches[key] = QuantileSketch()
+            sketch.add(response_time_ms)
+
+    async def flush(self) -> None:
+        """Append the accumulated sketches and start new ones."""
+        with self._lock:
+            sketches, self._sketches = self._sketches, {}
+            dropped, self._reported_dropped = self.dropped - self._reported_dropped, self.dropped
+        if dropped:
+            logger.warning(f"Latency sketch limit reached; dropped {dropped} records")
+        if not sketches:
+            return
+
+        rows = [
+            {"organization_id": org_id, "endpoint": endpoint, "bucket_start": bucket_start, "sketch": sketch.to_json()}
+            for (org_id, endpoint, bucket_start), sketch in sketches.items()
+        ]
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                await db.execute(insert(UsageLatencySketch), rows[start:start + FLUSH_CHUNK_SIZE])
+            await db.commit()
+
+
+# Singleton instances
+last_seen_writer = LastSeenWriter()
+activity_log_writer = ActivityLogWriter()
+usage_log_writer = UsageLogWriter()
+latency_sketch_writer = LatencySketchWriter()
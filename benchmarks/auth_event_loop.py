@@ -0,0 +1,143 @@
+"""
+Latency of fast requests while one request is stuck in a slow database
+query, with the authentication dependency doing blocking Session queries
+on the event loop (as it used to) and with the current AsyncSession
+dependency. Fast clients call GET /auth/me with a cached token; one
+client keeps a request in flight whose user lookup takes --slow seconds.
+
+    python benchmarks/auth_event_loop.py [--clients 10] [--seconds 5] [--slow 0.5]
+"""
+
+import argparse
+import asyncio
+import contextvars
+import itertools
+import logging
+import time
+
+from common import use_temp_database
+
+use_temp_database("auth_event_loop")
+
+import httpx  # noqa: E402
+from fastapi import Depends, HTTPException  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.auth import create_access_token, decode_access_token  # noqa: E402
+from app.database import Base, SessionLocal, async_engine, engine, get_db  # noqa: E402
+from app.dependencies import get_current_user, security  # noqa: E402
+from app.models import User  # noqa: E402
+from common import percentile, seed_organization  # noqa: E402
+from main import app  # noqa: E402
+
+slow_query_seconds = contextvars.ContextVar("slow_query_seconds", default=0.0)
+
+
+async def blocking_get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """The dependency as it was: an async def running sync Session queries on the loop."""
+    payload = decode_access_token(credentials.credentials)
+    user = db.query(User).filter(User.id == int(payload["sub"])).first() if payload else None
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    return user
+
+
+def install_slow_queries():
+    """
+    Make every SELECT of a request sent with X-Slow-Query sleep inside
+    SQLite, and return the app wrapped to read that header.
+    """
+    def register_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function("bench_sleep", 1, lambda seconds: time.sleep(seconds) or 1)
+
+    def slow_down(conn, cursor, statement, parameters, context, executemany):
+        seconds = slow_query_seconds.get()
+        if seconds and statement.lstrip().upper().startswith("SELECT"):
+            statement = f"SELECT * FROM ({statement}) WHERE bench_sleep({seconds})"
+        return statement, parameters
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "connect", register_sleep)
+        event.listen(target, "before_cursor_execute", slow_down, retval=True)
+        target.pool.dispose()
+
+    async def mark_slow_requests(scope, receive, send):
+        headers = dict(scope.get("headers", []))
+        token = slow_query_seconds.set(float(headers.get(b"x-slow-query", 0)))
+        try:
+            await app(scope, receive, send)
+        finally:
+            slow_query_seconds.reset(token)
+
+    return mark_slow_requests
+
+
+async def measure(asgi_app, fast_token: str, slow_user_id: int, clients: int, seconds: float, slow: float) -> list:
+    """Per-request latencies (ms) of the fast clients; one slow request is in flight if slow > 0."""
+    transport = httpx.ASGITransport(app=asgi_app)
+    nonces = itertools.count()
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + seconds
+
+        async def fast_client() -> None:
+            headers = {"Authorization": f"Bearer {fast_token}"}
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/auth/me", headers=headers)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        async def slow_client() -> None:
+            while time.perf_counter() < deadline:
+                # A fresh token each time so the principal cache can't answer it
+                token = create_access_token(data={"sub": str(slow_user_id), "nonce": next(nonces)})
+                await client.get(
+                    "/api/v1/auth/me", headers={"Authorization": f"Bearer {token}", "X-Slow-Query": str(slow)}
+                )
+
+        tasks = [fast_client() for _ in range(clients)]
+        if slow:
+            tasks.append(slow_client())
+        await asyncio.gather(*tasks)
+    # Pooled aiosqlite connections belong to this event loop
+    await async_engine.dispose()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--slow", type=float, default=0.5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        _, _, user_ids = seed_organization(db, users=2)
+    fast_token = create_access_token(data={"sub": str(user_ids[0])})
+    asgi_app = install_slow_queries()
+
+    print(f"{args.clients} fast clients, {args.seconds:g}s per run, slow request {args.slow:g}s")
+    dependencies = {"before (sync Session on the loop)": blocking_get_current_user, "after (AsyncSession)": None}
+    for name, override in dependencies.items():
+        app.dependency_overrides.clear()
+        if override is not None:
+            app.dependency_overrides[get_current_user] = override
+        for slow in (0, args.slow):
+            latencies = asyncio.run(measure(asgi_app, fast_token, user_ids[1], args.clients, args.seconds, slow))
+            print(
+                f"{name:34} {'one slow request' if slow else 'no slow request':17} "
+                f"p50 {percentile(latencies, 50):7.1f} ms  p99 {percentile(latencies, 99):7.1f} ms  "
+                f"{len(latencies) / args.seconds:6.0f} req/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
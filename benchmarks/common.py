@@ -0,0 +1,93 @@
+"""
+Shared setup for the benchmark scripts.
+
+Each script points the app at a throwaway SQLite database before importing
+it (DATABASE_URL is read at import time), then seeds it with bulk inserts.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Sequence, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use_temp_database(name: str) -> str:
+    """Point DATABASE_URL at a fresh SQLite file (unless already set) and make `app` importable."""
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-"), f"{name}.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    sys.path.insert(0, ROOT)
+    return os.environ["DATABASE_URL"]
+
+
+def seed_organization(db, users: int = 20, items: int = 0, seed: int = 1) -> Tuple[int, int, List[int]]:
+    """
+    Insert an organization with one team, `users` members and `items` items
+    spread over statuses, priorities and due dates (about a third assigned
+    to two users). Returns (org_id, team_id, user_ids).
+    """
+    from sqlalchemy import insert
+
+    from app.item_stats import rebuild_item_stats
+    from app.models import Item, ItemStatus, Organization, PriorityLevel, Team, User, item_assignees, user_teams
+
+    rnd = random.Random(seed)
+    org = Organization(name=f"Bench {seed}", slug=f"bench-{seed}-{rnd.getrandbits(32):x}")
+    db.add(org)
+    db.flush()
+    team = Team(name="Bench", organization_id=org.id)
+    db.add(team)
+    db.flush()
+    user_ids = list(db.scalars(insert(User).returning(User.id), [
+        {
+            "email": f"user{i}-{org.id}@bench.example", "username": f"user{i}-{org.id}",
+            "hashed_password": "x", "full_name": f"User {i}", "organization_id": org.id
+        }
+        for i in range(users)
+    ]))
+    db.execute(insert(user_teams), [{"user_id": u, "team_id": team.id} for u in user_ids])
+
+    now = datetime.utcnow()
+    statuses, priorities = list(ItemStatus), list(PriorityLevel)
+    for start in range(0, items, 10000):
+        rows = []
+        for i in range(start, min(start + 10000, items)):
+            status = rnd.choice(statuses)
+            rows.append({
+                "title": f"Item {i}", "organization_id": org.id, "team_id": team.id,
+                "created_by_id": user_ids[i % users], "status": status, "priority": rnd.choice(priorities),
+                "due_date": now + timedelta(days=rnd.randint(-30, 30)),
+                "estimated_hours": rnd.randint(1, 8),
+                "actual_hours": rnd.randint(1, 10) if status == ItemStatus.DONE else None,
+                "completed_at": now - timedelta(days=rnd.randint(0, 14)) if status == ItemStatus.DONE else None,
+                "created_at": now - timedelta(minutes=i), "updated_at": now,
+            })
+        item_ids = db.scalars(insert(Item).returning(Item.id, sort_by_parameter_order=True), rows).all()
+        db.execute(insert(item_assignees), [
+            {"item_id": item_id, "user_id": user_ids[(n + k) % users]}
+            for n, item_id in enumerate(item_ids) for k in range(1 + n % 2)
+        ])
+    rebuild_item_stats(db, org.id)
+    db.commit()
+    return org.id, team.id, user_ids
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> float:
+    """Fastest of `repeat` runs of fn, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
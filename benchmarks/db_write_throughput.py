@@ -0,0 +1,104 @@
+"""
+Concurrent write throughput against SQLite: writer threads call
+create_item (which also writes its activity row) while reader threads
+page through items, first with the engine settings the app used to
+hardcode (rollback journal, no busy timeout tuning), then with
+create_db_engine (WAL, synchronous=NORMAL, mmap, busy timeout).
+
+    python benchmarks/db_write_throughput.py [--writers 8] [--readers 4] [--seconds 10]
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from common import use_temp_database
+
+use_temp_database("db_write_throughput")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.database import Base, create_db_engine  # noqa: E402
+from app.models import User  # noqa: E402
+from app.schemas import ItemCreate  # noqa: E402
+from app.services import create_item, get_items  # noqa: E402
+from common import seed_organization  # noqa: E402
+
+
+def run(engine, writers: int, readers: int, seconds: float) -> dict:
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        org_id, _, user_ids = seed_organization(db, users=writers)
+
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def count(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def writer(user_id: int) -> None:
+        with Session() as db:
+            user = db.get(User, user_id)
+            while time.perf_counter() < deadline:
+                try:
+                    create_item(db, ItemCreate(title="Benchmark item", assignee_ids=[user_id]), org_id, user)
+                    count("writes")
+                except OperationalError as e:
+                    db.rollback()
+                    if "locked" not in str(e):
+                        raise
+                    count("locked")
+
+    def reader() -> None:
+        with Session() as db:
+            while time.perf_counter() < deadline:
+                try:
+                    get_items(db, org_id, limit=50)
+                    db.rollback()
+                    count("reads")
+                except OperationalError as e:
+                    db.rollback()
+                    if "locked" not in str(e):
+                        raise
+                    count("locked")
+
+    threads = [threading.Thread(target=writer, args=(user_ids[i],)) for i in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return {key: value / seconds if key != "locked" else value for key, value in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    directory = os.path.dirname(os.environ["DATABASE_URL"][len("sqlite:///"):])
+    configs = {
+        "before (hardcoded engine)": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "after (create_db_engine)": create_db_engine,
+    }
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s each")
+    for n, (name, factory) in enumerate(configs.items()):
+        url = f"sqlite:///{os.path.join(directory, f'throughput-{n}.db')}"
+        result = run(factory(url), args.writers, args.readers, args.seconds)
+        print(
+            f"{name:28} {result['writes']:8.0f} writes/s {result['reads']:8.0f} reads/s "
+            f"{result['locked']:6d} 'database is locked' errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
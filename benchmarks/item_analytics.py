@@ -0,0 +1,89 @@
+"""
+get_item_analytics for one organization among others: the original
+thirteen COUNT/AVG queries, the current implementation with its cache
+cleared before every call, and the current implementation served from
+its per-organization cache.
+
+    python benchmarks/item_analytics.py [--items 100000] [--orgs 2]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from common import use_temp_database
+
+use_temp_database("item_analytics")
+
+from sqlalchemy import event, func  # noqa: E402
+
+from app.cache import analytics_cache  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Item, ItemStatus, PriorityLevel  # noqa: E402
+from app.services import get_item_analytics  # noqa: E402
+from common import best_of, seed_organization  # noqa: E402
+
+
+def item_analytics_per_query(db, org_id: int) -> dict:
+    """get_item_analytics as it was: one query per figure."""
+    by_status = {
+        s.value: db.query(func.count(Item.id)).filter(Item.organization_id == org_id, Item.status == s).scalar()
+        for s in ItemStatus
+    }
+    by_priority = {
+        p.value: db.query(func.count(Item.id)).filter(Item.organization_id == org_id, Item.priority == p).scalar()
+        for p in PriorityLevel
+    }
+    avg_time = db.query(func.avg(Item.actual_hours)).filter(
+        Item.organization_id == org_id, Item.actual_hours.isnot(None)
+    ).scalar()
+    return {
+        "total_items": db.query(func.count(Item.id)).filter(Item.organization_id == org_id).scalar(),
+        "by_status": by_status,
+        "by_priority": by_priority,
+        "overdue_items": db.query(func.count(Item.id)).filter(
+            Item.organization_id == org_id, Item.due_date < datetime.utcnow(), Item.status != ItemStatus.DONE
+        ).scalar(),
+        "completed_this_week": db.query(func.count(Item.id)).filter(
+            Item.organization_id == org_id, Item.completed_at >= datetime.utcnow() - timedelta(days=7)
+        ).scalar(),
+        "avg_completion_time_hours": float(avg_time) if avg_time else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--orgs", type=int, default=2)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        org_ids = [seed_organization(db, items=args.items, seed=n)[0] for n in range(args.orgs)]
+    org_id = org_ids[0]
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def uncached(db) -> dict:
+        analytics_cache.clear()
+        return get_item_analytics(db, org_id)
+
+    variants = {
+        "before (one query per figure)": lambda db: item_analytics_per_query(db, org_id),
+        "after, cache cleared": uncached,
+        "after, cached": lambda db: get_item_analytics(db, org_id),
+    }
+    print(f"{args.items} items per organization, {args.orgs} organizations")
+    with SessionLocal() as db:
+        expected = item_analytics_per_query(db, org_id)
+        for name, fn in variants.items():
+            result = fn(db)
+            assert result == expected, (name, result, expected)
+            statements.clear()
+            fn(db)
+            queries = len(statements)
+            print(f"{name:30} {best_of(lambda: fn(db)):9.3f} ms  {queries:2d} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+POST /items throughput with activity rows written in the request's
+transaction (ACTIVITY_LOG_MODE=transactional) and queued for bulk
+inserts (ACTIVITY_LOG_MODE=buffered). The mode is read at import time,
+so each one runs in its own process against its own database.
+
+    python benchmarks/item_write_throughput.py [--clients 8] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+
+from common import percentile, use_temp_database
+
+MODES = ("transactional", "buffered")
+
+
+async def post_items(client, token: str, user_id: int, clients: int, seconds: float) -> list:
+    """Latencies (ms) of POST /items calls made by `clients` concurrent clients."""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    headers = {"Authorization": f"Bearer {token}"}
+    body = {"title": "Benchmark item", "priority": "medium", "assignee_ids": [user_id]}
+
+    async def post() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/items", json=body, headers=headers)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(post() for _ in range(clients)))
+    return latencies
+
+
+def run(mode: str, clients: int, seconds: float) -> None:
+    use_temp_database(f"item_write_throughput_{mode}")
+    logging.disable(logging.INFO)
+
+    import httpx
+    from sqlalchemy import func, select
+
+    from app.auth import create_access_token
+    from app.database import SessionLocal, async_engine
+    from app.models import ActivityLog
+    from app.writers import activity_log_writer
+    from common import seed_organization
+    from main import app
+
+    with SessionLocal() as db:
+        org_id, _, user_ids = seed_organization(db, users=1)
+    token = create_access_token(data={"sub": str(user_ids[0])})
+
+    async def measure() -> tuple:
+        activity_log_writer.start()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            warmup = await post_items(client, token, user_ids[0], 1, 0.5)
+            started = time.perf_counter()
+            latencies = await post_items(client, token, user_ids[0], clients, seconds)
+        # Count the final flush: every activity row is written before the clock stops
+        await activity_log_writer.stop()
+        elapsed = time.perf_counter() - started
+        await async_engine.dispose()
+        return latencies, len(warmup), elapsed
+
+    latencies, warmup, elapsed = asyncio.run(measure())
+    with SessionLocal() as db:
+        logged = db.scalar(select(func.count(ActivityLog.id)).where(ActivityLog.organization_id == org_id))
+    print(
+        f"{mode:14} {len(latencies) / elapsed:7.0f} items/s  p50 {percentile(latencies, 50):6.1f} ms  "
+        f"p99 {percentile(latencies, 99):6.1f} ms  {logged} activity rows for {warmup + len(latencies)} items"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        run(args.mode, args.clients, args.seconds)
+        return
+
+    print(f"{args.clients} clients, {args.seconds:g}s per mode")
+    for mode in MODES:
+        command = [sys.executable, __file__, "--mode", mode, "--clients", str(args.clients), "--seconds", str(args.seconds)]
+        subprocess.run(command, env=dict(os.environ, ACTIVITY_LOG_MODE=mode), check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+ExportService.generate_team_report for a team with 50k items: the
+original version, which loaded every item and lazy-loaded its assignees,
+and the current version, which aggregates in SQL.
+
+    python benchmarks/team_report.py [--items 50000] [--repeat 3]
+"""
+
+import argparse
+from collections import defaultdict
+from datetime import datetime
+
+from common import use_temp_database
+
+use_temp_database("team_report")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.export import export_service  # noqa: E402
+from app.models import Item, ItemStatus, Team  # noqa: E402
+from common import best_of, seed_organization  # noqa: E402
+
+
+def team_report_in_python(db, team_id: int) -> dict:
+    """generate_team_report as it was: counted in Python over every item."""
+    team = db.query(Team).filter(Team.id == team_id).first()
+    items = db.query(Item).filter(Item.team_id == team_id).all()
+    now = datetime.utcnow()
+    status_breakdown = defaultdict(int)
+    priority_breakdown = defaultdict(int)
+    member_workload = defaultdict(lambda: {'assigned': 0, 'completed': 0})
+    for item in items:
+        status_breakdown[item.status.value] += 1
+        priority_breakdown[item.priority.value] += 1
+        for assignee in item.assignees:
+            member_workload[assignee.full_name]['assigned'] += 1
+            if item.status == ItemStatus.DONE:
+                member_workload[assignee.full_name]['completed'] += 1
+    completed = status_breakdown[ItemStatus.DONE.value]
+    return {
+        'team': {'id': team.id, 'name': team.name, 'description': team.description, 'member_count': len(team.members)},
+        'summary': {
+            'total_items': len(items),
+            'completed_items': completed,
+            'in_progress_items': status_breakdown[ItemStatus.IN_PROGRESS.value],
+            'overdue_items': sum(
+                1 for item in items if item.due_date and item.due_date < now and item.status != ItemStatus.DONE
+            ),
+            'completion_rate': round(completed / len(items) * 100, 2) if items else 0
+        },
+        'status_breakdown': {k: v for k, v in status_breakdown.items() if v},
+        'priority_breakdown': dict(priority_breakdown),
+        'member_workload': dict(member_workload),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        org_id, team_id, _ = seed_organization(db, items=args.items)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def in_python(db) -> dict:
+        db.expunge_all()
+        return team_report_in_python(db, team_id)
+
+    variants = {
+        "before (items loaded into Python)": in_python,
+        "after (aggregated in SQL)": lambda db: export_service.generate_team_report(db, team_id, org_id),
+    }
+    print(f"{args.items} items in one team, best of {args.repeat}")
+    with SessionLocal() as db:
+        expected = in_python(db)
+        for name, fn in variants.items():
+            statements.clear()
+            result = fn(db)
+            queries = len(statements)
+            result.pop('generated_at', None)
+            assert result == expected, (name, result, expected)
+            print(f"{name:34} {best_of(lambda: fn(db), args.repeat):9.1f} ms  {queries:6d} queries")
+
+
+if __name__ == "__main__":
+    main()
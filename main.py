@@ -1,11 +1,17 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from datetime import datetime
 from time import time
 import logging
 
 from app.routes import router as api_router
 from app.database import Base, engine, get_db
+from app.writers import last_seen_writer, activity_log_writer, usage_log_writer, latency_sketch_writer
+from app.usage import usage_rollup_job
+from app.export_jobs import export_job_queue, export_cleanup_job
+from app.org_summaries import org_summary_snapshot_job
+from app.migrations import run_migrations
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -32,13 +38,15 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all requests and track response time."""
+    started_at = datetime.utcnow()
     start_time = time()
     
     # Process request
     response = await call_next(request)
     
     # Calculate response time
-    process_time = int((time() - start_time) * 1000)  # in milliseconds
+    elapsed_ms = (time() - start_time) * 1000
+    process_time = int(elapsed_ms)  # in milliseconds
     
     # Add custom header
     response.headers["X-Process-Time"] = str(process_time)
@@ -50,9 +58,15 @@ async def log_requests(request: Request, call_next):
         f"Time: {process_time}ms"
     )
     
-    # TODO: Log to database for analytics
-    # This would require extracting org_id from auth token
-    # log_usage(db, org_id, request.url.path, request.method, response.status_code, process_time)
+    # Record usage for analytics (buffered; bulk-inserted by the writer).
+    # The org is left on request.state by the request's auth dependency.
+    org_id = getattr(request.state, "organization_id", None)
+    if org_id is not None:
+        # Route template (e.g. /api/v1/items/{item_id}) keeps endpoints groupable
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or request.url.path
+        usage_log_writer.record(org_id, endpoint, request.method, response.status_code, process_time, started_at)
+        latency_sketch_writer.record(org_id, endpoint, elapsed_ms, started_at)
     
     return response
 
@@ -66,8 +80,34 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "Internal server error"}
     )
 
-# Create database tables
+# Create database tables and bring existing ones up to date
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+# Background writers
+@app.on_event("startup")
+async def start_background_writers():
+    """Start the periodic flush tasks for write-behind buffers and rollups."""
+    last_seen_writer.start()
+    activity_log_writer.start()
+    usage_log_writer.start()
+    latency_sketch_writer.start()
+    usage_rollup_job.start()
+    export_job_queue.start()
+    export_cleanup_job.start()
+    org_summary_snapshot_job.start()
+
+@app.on_event("shutdown")
+async def stop_background_writers():
+    """Flush write-behind buffers before the process exits."""
+    await last_seen_writer.stop()
+    await activity_log_writer.stop()
+    await usage_log_writer.stop()
+    await latency_sketch_writer.stop()
+    await usage_rollup_job.stop()
+    await export_cleanup_job.stop()
+    await org_summary_snapshot_job.stop()
+    export_job_queue.shutdown()
 
 # Include routers
 app.include_router(api_router, prefix="/api/v1", tags=["API"])
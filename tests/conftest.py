@@ -0,0 +1,117 @@
+import os
+import tempfile
+
+# The app reads DATABASE_URL at import time; point it at a throwaway file first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='tests-'), 'test.db')}")
+
+import asyncio
+import itertools
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+import pytest
+from sqlalchemy import event, insert
+
+from app.auth import create_access_token
+from app.database import Base, SessionLocal, async_engine, engine
+from app.models import Item, Organization, Tag, User, item_assignees, item_tags
+
+_org_numbers = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def make_org(db, users: int = 20) -> dict:
+    """A fresh organization with `users` members and a tag."""
+    n = next(_org_numbers)
+    organization = Organization(name=f"Org {n}", slug=f"org-{n}")
+    db.add(organization)
+    db.flush()
+    members = [
+        User(email=f"user{i}-{n}@example.com", username=f"user{i}-{n}", hashed_password="x",
+             full_name=f"User {i}", organization_id=organization.id)
+        for i in range(users)
+    ]
+    tag = Tag(name=f"tag-{n}")
+    db.add_all([*members, tag])
+    db.commit()
+    return {"id": organization.id, "users": members, "tag": tag}
+
+
+@pytest.fixture
+def org(db):
+    """A fresh organization with 20 users and a tag."""
+    return make_org(db)
+
+
+@pytest.fixture
+def other_org(db):
+    """A second organization, for checking isolation."""
+    return make_org(db, users=2)
+
+
+def seed_items(db, org, count: int, assignees: int = 2) -> list:
+    """Insert items assigned to the org's first users and tagged with its tag."""
+    item_ids = db.scalars(insert(Item).returning(Item.id, sort_by_parameter_order=True), [
+        {"title": f"Item {i}", "organization_id": org["id"], "created_by_id": org["users"][0].id}
+        for i in range(count)
+    ]).all()
+    db.execute(insert(item_assignees), [
+        {"item_id": item_id, "user_id": user.id} for item_id in item_ids for user in org["users"][:assignees]
+    ])
+    db.execute(insert(item_tags), [{"item_id": item_id, "tag_id": org["tag"].id} for item_id in item_ids])
+    db.commit()
+    return item_ids
+
+
+@contextmanager
+def capture_statements():
+    """Collect the (statement, parameters) of every SQL statement run inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def run_async(coro):
+    """Run a coroutine on a fresh event loop, closing its pooled aiosqlite connections after."""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+@asynccontextmanager
+async def api_client():
+    """An httpx client calling the app in-process through its ASGI interface."""
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
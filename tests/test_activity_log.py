@@ -0,0 +1,46 @@
+import pytest
+
+from app import services
+from app.database import AsyncSessionLocal, SessionLocal
+from app.services import log_activity, log_activity_async
+from app.writers import activity_log_writer
+
+from conftest import run_async
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    """Run in buffered mode and collect what reaches activity_log_writer."""
+    entries = []
+    monkeypatch.setattr(services, "ACTIVITY_LOG_MODE", "buffered")
+    monkeypatch.setattr(activity_log_writer, "enqueue", entries.extend)
+    return entries
+
+
+def test_buffered_activity_is_queued_only_when_the_session_commits(db, org, enqueued):
+    log_activity(db, "created", "item", 1, organization_id=org["id"])
+    assert enqueued == []
+
+    db.commit()
+    assert [entry["action"] for entry in enqueued] == ["created"]
+
+
+@pytest.mark.parametrize("discard", ["rollback", "close"])
+def test_buffered_activity_is_discarded_without_a_commit(org, enqueued, discard):
+    with SessionLocal() as db:
+        log_activity(db, "created", "item", 1, organization_id=org["id"])
+        getattr(db, discard)()
+        db.commit()
+
+    assert enqueued == []
+
+
+def test_buffered_activity_on_an_async_session_is_queued_on_commit(org, enqueued):
+    async def log_and_commit():
+        async with AsyncSessionLocal() as db:
+            await log_activity_async(db, "updated", "item", 1, organization_id=org["id"])
+            assert enqueued == []
+            await db.commit()
+
+    run_async(log_and_commit())
+    assert [entry["action"] for entry in enqueued] == ["updated"]
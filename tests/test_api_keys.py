@@ -0,0 +1,131 @@
+import hashlib
+
+import pytest
+from fastapi import HTTPException, Request
+from sqlalchemy import create_engine, inspect, select, text
+
+from app.auth import API_KEY_PREFIX_LENGTH, hash_api_key
+from app.cache import api_key_cache
+from app.database import AsyncSessionLocal
+from app.dependencies import verify_api_key
+from app.migrations import _hash_api_keys
+from app.models import APIKey, UserRole
+
+from conftest import api_client, auth_headers, run_async
+
+
+def test_api_key_digest_is_sha256():
+    assert hash_api_key("sk_example") == hashlib.sha256(b"sk_example").hexdigest()
+
+
+@pytest.fixture
+def admin_headers(db, org):
+    admin = org["users"][0]
+    admin.role = UserRole.ADMIN
+    db.commit()
+    return auth_headers(admin)
+
+
+def create_key(headers: dict) -> dict:
+    async def post():
+        async with api_client() as client:
+            response = await client.post("/api/v1/api-keys", headers=headers, json={"name": "CI"})
+            assert response.status_code == 201
+            return response.json()
+
+    return run_async(post())
+
+
+def verify(key: str, use_db: bool = True):
+    """Run verify_api_key; without use_db it can only answer from the cache."""
+    async def call():
+        async with AsyncSessionLocal() as db:
+            return await verify_api_key(Request({"type": "http"}), key, db if use_db else None)
+
+    return run_async(call())
+
+
+def test_created_key_is_stored_only_as_a_digest(db, admin_headers):
+    created = create_key(admin_headers)
+
+    key = created["key"]
+    assert key.startswith("sk_")
+    assert created["key_prefix"] == key[:API_KEY_PREFIX_LENGTH]
+    row = db.get(APIKey, created["id"])
+    assert row.key_hash == hash_api_key(key)
+    assert row.key_prefix == key[:API_KEY_PREFIX_LENGTH]
+
+    async def listing():
+        async with api_client() as client:
+            return (await client.get("/api/v1/api-keys", headers=admin_headers)).json()
+
+    (listed,) = run_async(listing())
+    assert listed["key"] is None
+    assert listed["key_prefix"] == created["key_prefix"]
+
+
+def test_verified_key_is_served_from_the_cache(org, admin_headers):
+    key = create_key(admin_headers)["key"]
+
+    assert verify(key).id == org["id"]
+    assert api_key_cache.get(hash_api_key(key))["organization_id"] == org["id"]
+    # A second lookup never reaches the database
+    assert verify(key, use_db=False).id == org["id"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify("sk_unknown")
+    assert exc_info.value.status_code == 401
+
+
+def test_revoking_a_key_evicts_it_from_the_cache(db, org, other_org, admin_headers):
+    created = create_key(admin_headers)
+    verify(created["key"])
+
+    async def revoke(headers: dict):
+        async with api_client() as client:
+            return (await client.delete(f"/api/v1/api-keys/{created['id']}", headers=headers)).status_code
+
+    other_admin = other_org["users"][0]
+    other_admin.role = UserRole.ADMIN
+    db.commit()
+    assert run_async(revoke(auth_headers(other_admin))) == 404
+    assert api_key_cache.get(hash_api_key(created["key"])) is not None
+
+    assert run_async(revoke(admin_headers)) == 204
+    assert api_key_cache.get(hash_api_key(created["key"])) is None
+    with pytest.raises(HTTPException) as exc_info:
+        verify(created["key"])
+    assert exc_info.value.status_code == 401
+
+
+def test_migration_rebuilds_api_keys_from_plaintext_keys(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # api_keys as created before keys were hashed
+        conn.execute(text(
+            "CREATE TABLE api_keys (id INTEGER PRIMARY KEY, key VARCHAR NOT NULL, name VARCHAR NOT NULL, "
+            "organization_id INTEGER, is_active BOOLEAN, last_used_at DATETIME, created_at DATETIME, "
+            "expires_at DATETIME)"
+        ))
+        conn.execute(text("CREATE UNIQUE INDEX ix_api_keys_key ON api_keys (key)"))
+        conn.execute(text(
+            "INSERT INTO api_keys (id, key, name, organization_id, is_active, created_at) "
+            "VALUES (7, 'sk_legacy_plaintext', 'Legacy', 3, 1, '2020-01-01 00:00:00')"
+        ))
+
+    with engine.begin() as conn:
+        _hash_api_keys(conn)
+        # Already migrated: a second run leaves the table alone
+        _hash_api_keys(conn)
+
+    with engine.connect() as conn:
+        columns = {column["name"] for column in inspect(conn).get_columns("api_keys")}
+        row = conn.execute(select(APIKey.__table__)).mappings().one()
+        indexes = {index["name"] for index in inspect(conn).get_indexes("api_keys")}
+    engine.dispose()
+
+    assert "key" not in columns
+    assert row["id"] == 7 and row["name"] == "Legacy" and row["organization_id"] == 3
+    assert row["key_hash"] == hash_api_key("sk_legacy_plaintext")
+    assert row["key_prefix"] == "sk_legacy_plaintext"[:API_KEY_PREFIX_LENGTH]
+    assert "ix_api_keys_key_hash" in indexes
@@ -0,0 +1,121 @@
+from app.database import get_async_db
+from app.models import ItemStatus, Organization, PriorityLevel
+from app.schemas import ItemCreate, ItemRead, ItemUpdate
+from app.services import create_item_async, get_item_async, get_items_async, update_item_async
+
+from conftest import api_client, auth_headers, run_async, seed_items
+
+
+def test_async_item_services(org, other_org):
+    user, assignee = org["users"][:2]
+
+    async def scenario():
+        async for db in get_async_db():
+            item = await create_item_async(
+                db, ItemCreate(title="Async item", assignee_ids=[user.id], tag_ids=[org["tag"].id]), org["id"], user
+            )
+            # Everything ItemRead needs is loaded; a lazy load would fail off the greenlet
+            created = ItemRead.model_validate(item, from_attributes=True)
+            assert [a.id for a in created.assignees] == [user.id]
+            assert [t.id for t in created.tags] == [org["tag"].id]
+
+            fetched = await get_item_async(db, item.id, org["id"])
+            assert fetched.id == item.id
+            assert await get_item_async(db, item.id, other_org["id"]) is None
+
+            assert [i.id for i in await get_items_async(db, org["id"], status=ItemStatus.TODO)] == [item.id]
+            assert [i.id for i in await get_items_async(db, org["id"], assigned_to=user.id)] == [item.id]
+            assert await get_items_async(db, org["id"], status=ItemStatus.DONE) == []
+            assert await get_items_async(db, other_org["id"]) == []
+
+            updated = await update_item_async(
+                db, item.id, ItemUpdate(status=ItemStatus.DONE, assignee_ids=[assignee.id]), org["id"], user
+            )
+            read = ItemRead.model_validate(updated, from_attributes=True)
+            assert read.status == ItemStatus.DONE
+            assert [a.id for a in read.assignees] == [assignee.id]
+            assert await update_item_async(db, item.id, ItemUpdate(title="x"), other_org["id"], user) is None
+
+    run_async(scenario())
+
+
+def test_item_routes_on_the_async_session(org):
+    user, assignee = org["users"][:2]
+    headers = auth_headers(user)
+
+    async def scenario():
+        async with api_client() as client:
+            response = await client.post("/api/v1/items", headers=headers, json={
+                "title": "Route item", "priority": "high", "assignee_ids": [user.id], "tag_ids": [org["tag"].id]
+            })
+            assert response.status_code == 201
+            item = response.json()
+            assert item["priority"] == "high"
+            assert [a["id"] for a in item["assignees"]] == [user.id]
+
+            response = await client.get(f"/api/v1/items/{item['id']}", headers=headers)
+            assert response.status_code == 200
+            assert response.json()["title"] == "Route item"
+
+            response = await client.get("/api/v1/items", headers=headers, params={"priority": "high"})
+            assert response.status_code == 200
+            assert [i["id"] for i in response.json()["items"]] == [item["id"]]
+
+            response = await client.put(f"/api/v1/items/{item['id']}", headers=headers, json={
+                "status": "in_progress", "assignee_ids": [assignee.id]
+            })
+            assert response.status_code == 200
+            assert response.json()["status"] == "in_progress"
+            assert [a["id"] for a in response.json()["assignees"]] == [assignee.id]
+
+            for method, path in (("GET", "/api/v1/items/999999"), ("PUT", "/api/v1/items/999999")):
+                response = await client.request(method, path, headers=headers, json={"title": "x"})
+                assert response.status_code == 404
+
+    run_async(scenario())
+
+
+def test_item_routes_hide_other_organizations_items(db, org, other_org):
+    (item_id,) = seed_items(db, org, 1)
+    headers = auth_headers(other_org["users"][0])
+
+    async def scenario():
+        async with api_client() as client:
+            assert (await client.get(f"/api/v1/items/{item_id}", headers=headers)).status_code == 404
+            response = await client.put(f"/api/v1/items/{item_id}", headers=headers, json={"title": "taken"})
+            assert response.status_code == 404
+            assert (await client.get("/api/v1/items", headers=headers)).json()["items"] == []
+
+    run_async(scenario())
+
+
+def test_item_routes_reject_bad_credentials(db, org):
+    inactive_user = org["users"][2]
+    inactive_user.is_active = False
+    db.commit()
+
+    async def scenario():
+        async with api_client() as client:
+            response = await client.get("/api/v1/items", headers={"Authorization": "Bearer not-a-token"})
+            assert response.status_code == 401
+            response = await client.get("/api/v1/items", headers=auth_headers(inactive_user))
+            assert response.status_code == 401
+            response = await client.post("/api/v1/items", json={"title": "anonymous"})
+            assert response.status_code in (401, 403)
+
+    run_async(scenario())
+
+
+def test_item_routes_reject_an_inactive_organization(db, other_org):
+    db.get(Organization, other_org["id"]).is_active = False
+    db.commit()
+
+    async def scenario():
+        async with api_client() as client:
+            response = await client.post(
+                "/api/v1/items", headers=auth_headers(other_org["users"][0]),
+                json={"title": "Blocked", "priority": PriorityLevel.LOW.value}
+            )
+            assert response.status_code == 403
+
+    run_async(scenario())
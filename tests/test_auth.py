@@ -0,0 +1,80 @@
+import pytest
+from fastapi import Request
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm.exc import DetachedInstanceError
+
+from app.auth import create_access_token
+from app.database import AsyncSessionLocal
+from app.dependencies import get_current_user
+from app.models import UserRole
+
+from conftest import api_client, auth_headers, run_async
+
+
+@pytest.mark.parametrize("sub", [None, "not-a-number", ["1"]])
+def test_token_with_a_bad_subject_is_rejected(sub):
+    data = {} if sub is None else {"sub": sub}
+    headers = {"Authorization": f"Bearer {create_access_token(data=data)}"}
+
+    async def scenario():
+        async with api_client() as client:
+            return await client.get("/api/v1/auth/me", headers=headers)
+
+    response = run_async(scenario())
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Could not validate credentials"
+
+
+def test_cached_principal_is_rebuilt_for_every_request(org):
+    user = org["users"][0]
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=auth_headers(user)["Authorization"][7:])
+
+    async def authenticate():
+        async with AsyncSessionLocal() as db:
+            return await get_current_user(Request({"type": "http"}), credentials, db)
+
+    first = run_async(authenticate())
+    first.role = UserRole.OWNER
+    first.organization.is_active = False
+    second = run_async(authenticate())
+
+    assert second is not first and second.organization is not first.organization
+    assert second.role == UserRole.MEMBER and second.organization.is_active
+    # Relationships that weren't cached fail loudly instead of lazy-loading
+    with pytest.raises(DetachedInstanceError):
+        second.teams
+
+
+def test_deactivated_user_is_rejected_despite_a_cached_token(db, org):
+    admin, member = org["users"][:2]
+    admin.role = UserRole.ADMIN
+    db.commit()
+
+    async def scenario():
+        async with api_client() as client:
+            assert (await client.get("/api/v1/auth/me", headers=auth_headers(member))).status_code == 200
+            response = await client.delete(f"/api/v1/users/{admin.id}", headers=auth_headers(member))
+            assert response.status_code == 403
+            response = await client.delete(f"/api/v1/users/{member.id}", headers=auth_headers(admin))
+            assert response.status_code == 204
+            assert (await client.get("/api/v1/auth/me", headers=auth_headers(member))).status_code == 401
+            response = await client.delete("/api/v1/users/999999", headers=auth_headers(admin))
+            assert response.status_code == 404
+
+    run_async(scenario())
+
+
+def test_deactivated_organization_is_rejected_despite_a_cached_token(db, org):
+    owner, member = org["users"][:2]
+    owner.role = UserRole.OWNER
+    db.commit()
+
+    async def scenario():
+        async with api_client() as client:
+            assert (await client.get("/api/v1/organizations/current", headers=auth_headers(member))).status_code == 200
+            response = await client.delete("/api/v1/organizations/current", headers=auth_headers(owner))
+            assert response.status_code == 204
+            response = await client.get("/api/v1/organizations/current", headers=auth_headers(member))
+            assert response.status_code == 403
+
+    run_async(scenario())
@@ -0,0 +1,92 @@
+from sqlalchemy import select
+
+from app.models import Item, item_assignees
+
+from conftest import api_client, auth_headers, run_async, seed_items
+
+
+def bulk(method: str, headers: dict, json: dict) -> dict:
+    async def call():
+        async with api_client() as client:
+            response = await client.request(method, "/api/v1/items/bulk", headers=headers, json=json)
+            assert response.status_code == 200, response.text
+            return response.json()["results"]
+
+    return run_async(call())
+
+
+def assignee_ids(db, item_id: int) -> list:
+    return db.scalars(select(item_assignees.c.user_id).where(item_assignees.c.item_id == item_id)).all()
+
+
+def test_bulk_create_reports_each_row(db, org, other_org):
+    user, assignee = org["users"][:2]
+    (foreign_parent,) = seed_items(db, other_org, 1)
+
+    results = bulk("POST", auth_headers(user), {"items": [
+        {"title": "Kept", "assignee_ids": [assignee.id, other_org["users"][0].id]},
+        {"title": "No team", "team_id": 999999},
+        {"title": "Foreign parent", "parent_item_id": foreign_parent},
+        {"title": "Also kept", "priority": "high"},
+    ]})
+
+    assert [(r["index"], r["status"], r["error"]) for r in results] == [
+        (0, "created", None),
+        (1, "error", "Team not found"),
+        (2, "error", "Parent item not found"),
+        (3, "created", None),
+    ]
+    created = [db.get(Item, result["id"]) for result in (results[0], results[3])]
+    assert [item.title for item in created] == ["Kept", "Also kept"]
+    assert {item.organization_id for item in created} == {org["id"]}
+    assert assignee_ids(db, results[0]["id"]) == [assignee.id]
+
+
+def test_bulk_update_reports_each_row_and_skips_other_organizations(db, org, other_org):
+    own_id, other_own_id = seed_items(db, org, 2)
+    (foreign_id,) = seed_items(db, other_org, 1)
+    assignee = org["users"][3]
+
+    results = bulk("PATCH", auth_headers(org["users"][0]), {"items": [
+        {"id": own_id, "status": "done"},
+        {"id": foreign_id, "title": "Taken"},
+        {"id": 999999, "title": "Missing"},
+        {"id": other_own_id, "assignee_ids": [assignee.id, other_org["users"][0].id]},
+    ]})
+
+    assert [(r["index"], r["id"], r["status"]) for r in results] == [
+        (0, own_id, "updated"), (1, foreign_id, "not_found"), (2, 999999, "not_found"), (3, other_own_id, "updated"),
+    ]
+    db.expire_all()
+    assert db.get(Item, own_id).status.value == "done"
+    assert db.get(Item, foreign_id).title == "Item 0"
+    assert assignee_ids(db, other_own_id) == [assignee.id]
+
+
+def test_bulk_delete_reports_each_row_and_skips_other_organizations(db, org, other_org):
+    own_id, kept_id = seed_items(db, org, 2)
+    (foreign_id,) = seed_items(db, other_org, 1)
+
+    results = bulk("DELETE", auth_headers(org["users"][0]), {"ids": [own_id, foreign_id, 999999]})
+
+    assert [(r["index"], r["id"], r["status"]) for r in results] == [
+        (0, own_id, "deleted"), (1, foreign_id, "not_found"), (2, 999999, "not_found"),
+    ]
+    db.expire_all()
+    assert db.get(Item, own_id) is None
+    assert db.get(Item, kept_id) is not None
+    assert db.get(Item, foreign_id) is not None
+
+
+def test_bulk_routes_are_not_taken_for_an_item_id(org):
+    headers = auth_headers(org["users"][0])
+
+    async def scenario():
+        async with api_client() as client:
+            # Validated against the bulk payloads, not parsed as /items/{item_id}
+            for method, field in (("POST", "items"), ("PATCH", "items"), ("DELETE", "ids")):
+                response = await client.request(method, "/api/v1/items/bulk", headers=headers, json={})
+                assert response.status_code == 422
+                assert [error["loc"] for error in response.json()["detail"]] == [["body", field]]
+
+    run_async(scenario())
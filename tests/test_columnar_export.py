@@ -0,0 +1,45 @@
+import io
+
+import pytest
+from sqlalchemy import insert
+
+from app.database import SessionLocal
+from app.export import export_service
+from app.models import Tag, item_tags
+
+from conftest import seed_items
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def read_table(file_format: str, data: bytes):
+    if file_format == "parquet":
+        return pq.read_table(io.BytesIO(data))
+    return pa.ipc.open_file(io.BytesIO(data)).read_all()
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_tag_added_mid_export_is_encoded(db, org, file_format, monkeypatch):
+    item_ids = seed_items(db, org, 4)
+    iter_item_chunks = export_service.iter_item_chunks
+
+    def chunks_of_two(*args, **kwargs):
+        for n, chunk in enumerate(iter_item_chunks(*args, chunk_size=2, **kwargs)):
+            yield chunk
+            if n == 0:
+                # Another request tags an item the export hasn't reached yet
+                with SessionLocal() as other:
+                    tag = Tag(name=f"{org['tag'].name}-new")
+                    other.add(tag)
+                    other.flush()
+                    other.execute(insert(item_tags).values(item_id=item_ids[-1], tag_id=tag.id))
+                    other.commit()
+
+    monkeypatch.setattr(export_service, "iter_item_chunks", chunks_of_two)
+    data = b"".join(export_service.stream_items_columnar(db, org["id"], file_format))
+
+    rows = read_table(file_format, data).to_pylist()
+    assert [row["id"] for row in rows] == item_ids
+    assert sorted(rows[-1]["tags"]) == [org["tag"].name, f"{org['tag'].name}-new"]
+    assert all(row["tags"] == [org["tag"].name] for row in rows[:-1])
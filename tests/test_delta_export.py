@@ -0,0 +1,103 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import export
+from app.export import EXPORT_TOMBSTONE_RETENTION_DAYS
+from app.export_jobs import prune_item_tombstones
+from app.models import ItemTombstone
+
+from conftest import api_client, auth_headers, run_async, seed_items
+
+
+@pytest.fixture(autouse=True)
+def no_lag(monkeypatch):
+    """End delta windows at the request time, so writes made just before show up."""
+    monkeypatch.setattr(export, "EXPORT_DELTA_LAG_SECONDS", 0)
+
+
+def pull(headers: dict, since: datetime, **params):
+    async def get():
+        async with api_client() as client:
+            return await client.get(
+                "/api/v1/export/items/json", headers=headers, params={"since": since.isoformat(), **params}
+            )
+
+    return run_async(get())
+
+
+def pull_ndjson(headers: dict, since: datetime):
+    """(item ids, deleted ids, next cursor) of an NDJSON delta export."""
+    response = pull(headers, since, format="ndjson")
+    assert response.status_code == 200, response.text
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    items = [row["id"] for row in rows if "deleted_at" not in row]
+    deleted = [row["id"] for row in rows if "deleted_at" in row]
+    return items, deleted, datetime.fromisoformat(response.headers["X-Next-Cursor"])
+
+
+def test_next_cursor_round_trip_reports_each_change_once(db, org):
+    headers = auth_headers(org["users"][0])
+    kept, edited, removed = seed_items(db, org, 3)
+
+    items, deleted, cursor = pull_ndjson(headers, datetime.utcnow() - timedelta(minutes=1))
+    assert sorted(items) == [kept, edited, removed] and deleted == []
+
+    async def change():
+        async with api_client() as client:
+            response = await client.put(f"/api/v1/items/{edited}", headers=headers, json={"title": "Edited"})
+            assert response.status_code == 200
+            assert (await client.delete(f"/api/v1/items/{removed}", headers=headers)).status_code == 204
+
+    run_async(change())
+    items, deleted, next_cursor = pull_ndjson(headers, cursor)
+    assert (items, deleted) == ([edited], [removed])
+    assert next_cursor > cursor
+
+    assert pull_ndjson(headers, next_cursor)[:2] == ([], [])
+
+
+def test_json_delta_lists_deleted_items_as_tombstones(db, org):
+    headers = auth_headers(org["users"][0])
+    since = datetime.utcnow() - timedelta(minutes=1)
+    (removed,) = seed_items(db, org, 1)
+
+    async def delete():
+        async with api_client() as client:
+            assert (await client.delete(f"/api/v1/items/{removed}", headers=headers)).status_code == 204
+
+    run_async(delete())
+    response = pull(headers, since)
+    document = response.json()
+
+    assert document["items"] == []
+    assert [tombstone["id"] for tombstone in document["deleted"]] == [removed]
+    assert datetime.fromisoformat(document["deleted"][0]["deleted_at"]) > since
+    assert document["next_cursor"] == response.headers["X-Next-Cursor"]
+
+
+def test_delta_export_rejects_filters_and_expired_cursors(org):
+    headers = auth_headers(org["users"][0])
+
+    response = pull(headers, datetime.utcnow(), status="done")
+    assert response.status_code == 400
+    response = pull(headers, datetime.utcnow() - timedelta(days=EXPORT_TOMBSTONE_RETENTION_DAYS + 1))
+    assert response.status_code == 400
+    assert "full export" in response.json()["detail"]
+
+
+def test_tombstones_are_pruned_after_the_retention_period(db, org):
+    now = datetime.utcnow()
+    retention = timedelta(days=EXPORT_TOMBSTONE_RETENTION_DAYS)
+    db.execute(insert(ItemTombstone), [
+        {"organization_id": org["id"], "item_id": 1, "deleted_at": now - retention - timedelta(hours=1)},
+        {"organization_id": org["id"], "item_id": 2, "deleted_at": now - retention + timedelta(hours=1)},
+    ])
+    db.commit()
+
+    assert prune_item_tombstones(db, now=now) >= 1
+    db.commit()
+    remaining = db.scalars(select(ItemTombstone.item_id).where(ItemTombstone.organization_id == org["id"])).all()
+    assert remaining == [2]
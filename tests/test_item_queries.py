@@ -0,0 +1,46 @@
+import pytest
+
+from app.models import User
+from app.schemas import ItemCreate, ItemRead, ItemUpdate
+from app.services import create_item, get_item, get_items, update_item
+
+from conftest import capture_statements, seed_items
+
+
+def serialize(items):
+    return [ItemRead.model_validate(item, from_attributes=True).model_dump() for item in items]
+
+
+def test_full_item_page_runs_a_constant_number_of_queries(db, org):
+    seed_items(db, org, 1000)
+
+    with capture_statements() as statements:
+        page = serialize(get_items(db, org["id"], limit=1000))
+
+    assert len(page) == 1000
+    assert all(len(item["assignees"]) == 2 and len(item["tags"]) == 1 for item in page)
+    # The items, then assignees and tags batch-loaded 500 parents per query
+    assert len(statements) == 5
+
+
+@pytest.mark.parametrize("path", ["get_item", "create_item", "update_item"])
+def test_single_item_queries_do_not_grow_with_relationships(db, org, path):
+    counts = []
+    for assignees in (1, 20):
+        item_id = seed_items(db, org, 1, assignees)[0]
+        db.expire_all()
+        user = db.get(User, org["users"][0].id)
+        assignee_ids = [u.id for u in org["users"][:assignees]]
+
+        with capture_statements() as statements:
+            if path == "get_item":
+                item = get_item(db, item_id, org["id"])
+            elif path == "create_item":
+                item = create_item(db, ItemCreate(title="New", assignee_ids=assignee_ids), org["id"], user)
+            else:
+                item = update_item(db, item_id, ItemUpdate(title="Renamed", assignee_ids=assignee_ids), org["id"], user)
+            serialize([item])
+
+        assert len(item.assignees) == assignees
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
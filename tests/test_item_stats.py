@@ -0,0 +1,104 @@
+import pytest
+
+from app.database import AsyncSessionLocal
+from app.item_stats import TOTAL_KEY, check_item_stats, compute_stats, get_org_item_stats, rebuild_item_stats
+from app.models import ItemStatus, PriorityLevel, Team
+from app.schemas import ItemBulkUpdateEntry, ItemCreate, ItemUpdate
+from app.services import (
+    bulk_create_items, bulk_delete_items, bulk_update_items, create_item, create_item_async, delete_item,
+    update_item, update_item_async
+)
+
+from conftest import run_async, seed_items
+
+
+@pytest.fixture
+def team(db, org):
+    team = Team(name="Platform", organization_id=org["id"])
+    db.add(team)
+    db.commit()
+    return team
+
+
+def assert_counters_match_items(db, org_id: int) -> None:
+    db.expire_all()
+    assert check_item_stats(db, org_id) == []
+    assert get_org_item_stats(db, org_id) == compute_stats(db, org_id).get(org_id, {})
+
+
+def test_counters_follow_item_writes(db, org, team):
+    user = org["users"][0]
+
+    item = create_item(db, ItemCreate(title="One", priority=PriorityLevel.HIGH), org["id"], user)
+    assert_counters_match_items(db, org["id"])
+    assert get_org_item_stats(db, org["id"])[("priority", "high")] == (1, 0, 0)
+
+    update = ItemUpdate(status=ItemStatus.IN_PROGRESS, team_id=team.id, actual_hours=3)
+    update_item(db, item.id, update, org["id"], user)
+    assert_counters_match_items(db, org["id"])
+    assert get_org_item_stats(db, org["id"])[("team", str(team.id))] == (1, 1, 3)
+
+    update_item(db, item.id, ItemUpdate(status=ItemStatus.DONE, actual_hours=5), org["id"], user)
+    stats = get_org_item_stats(db, org["id"])
+    assert ("status", "in_progress") not in stats
+    assert stats[("status", "done")] == (1, 1, 5)
+    assert_counters_match_items(db, org["id"])
+
+    delete_item(db, item.id, org["id"], user)
+    assert_counters_match_items(db, org["id"])
+    assert TOTAL_KEY not in get_org_item_stats(db, org["id"])
+
+
+def test_counters_follow_bulk_writes(db, org, team):
+    user = org["users"][0]
+
+    results = bulk_create_items(db, [
+        ItemCreate(title="A", team_id=team.id),
+        ItemCreate(title="B", status=ItemStatus.IN_REVIEW),
+        ItemCreate(title="Rejected", team_id=999999),
+    ], org["id"], user)
+    assert_counters_match_items(db, org["id"])
+    assert get_org_item_stats(db, org["id"])[TOTAL_KEY] == (2, 0, 0)
+
+    first, second = (r["id"] for r in results[:2])
+    bulk_update_items(db, [
+        ItemBulkUpdateEntry(id=first, status=ItemStatus.DONE, actual_hours=2),
+        ItemBulkUpdateEntry(id=second, priority=PriorityLevel.URGENT, team_id=team.id),
+    ], org["id"], user)
+    assert_counters_match_items(db, org["id"])
+
+    bulk_delete_items(db, [first, 999999], org["id"], user)
+    assert_counters_match_items(db, org["id"])
+    assert get_org_item_stats(db, org["id"])[TOTAL_KEY] == (1, 0, 0)
+
+
+def test_counters_follow_async_item_writes(db, org):
+    user = org["users"][0]
+
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            item = await create_item_async(session, ItemCreate(title="Async"), org["id"], user)
+            await update_item_async(
+                session, item.id, ItemUpdate(status=ItemStatus.ARCHIVED, actual_hours=4), org["id"], user
+            )
+
+    run_async(scenario())
+    assert_counters_match_items(db, org["id"])
+    assert get_org_item_stats(db, org["id"])[("status", "archived")] == (1, 1, 4)
+
+
+def test_rebuild_matches_a_full_recount(db, org, other_org):
+    # Seeded items bypass the services, so their counters are missing
+    seed_items(db, org, 4)
+    seed_items(db, other_org, 2)
+    assert check_item_stats(db, org["id"]) != []
+
+    rebuild_item_stats(db, org["id"])
+    db.commit()
+    assert_counters_match_items(db, org["id"])
+    assert get_org_item_stats(db, org["id"])[TOTAL_KEY] == (4, 0, 0)
+    assert check_item_stats(db, other_org["id"]) != []
+
+    rebuild_item_stats(db)
+    db.commit()
+    assert check_item_stats(db) == []
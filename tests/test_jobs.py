@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app import export_jobs
+from app.database import SessionLocal
+from app.export_jobs import EXPORT_CLEANUP_LEASE, ExportCleanupJob
+from app.leases import acquire_lease
+from app.models import ExportJob, JobLease, UsageLatencySketch, UsageRollupState
+from app.sketch import QuantileSketch
+from app.usage import USAGE_ROLLUP_LEASE, UsageRollupJob, _compact_sketches
+
+from conftest import run_async
+
+
+@pytest.fixture
+def lease_held_elsewhere(db):
+    """Hand a job lease to another process for the duration of a test."""
+    names = []
+
+    def hold(name: str) -> None:
+        assert acquire_lease(db, name, 60, holder="other-process")
+        names.append(name)
+
+    yield hold
+    db.execute(delete(JobLease).where(JobLease.name.in_(names)))
+    db.commit()
+
+
+def rollup_watermarks(db):
+    db.expire_all()
+    return {state.name: state.rolled_up_to for state in db.query(UsageRollupState)}
+
+
+def test_usage_rollup_runs_only_under_its_lease(db, lease_held_elsewhere):
+    before = rollup_watermarks(db)
+    lease_held_elsewhere(USAGE_ROLLUP_LEASE)
+
+    run_async(UsageRollupJob(60).flush())
+    assert rollup_watermarks(db) == before
+
+    db.execute(delete(JobLease).where(JobLease.name == USAGE_ROLLUP_LEASE))
+    db.commit()
+    run_async(UsageRollupJob(60).flush())
+    assert set(rollup_watermarks(db)) == {"minute", "hour", "sketch"}
+
+
+def add_sketches(db, org_id: int, hour: datetime, values) -> list:
+    rows = []
+    for value in values:
+        sketch = QuantileSketch()
+        sketch.add(value)
+        rows.append(UsageLatencySketch(
+            organization_id=org_id, endpoint="GET /items", bucket_start=hour, sketch=sketch.to_json()
+        ))
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def test_sketch_compaction_merges_an_hour_into_one_row(db, org):
+    hour = datetime(2020, 1, 1, 5)
+    add_sketches(db, org["id"], hour, [10, 20, 30])
+
+    _compact_sketches(db, hour, hour + timedelta(hours=1))
+    db.commit()
+
+    (data,) = db.scalars(select(UsageLatencySketch.sketch).where(UsageLatencySketch.organization_id == org["id"]))
+    assert QuantileSketch.from_json(data).count == 3
+
+
+def test_sketch_compaction_aborts_when_another_process_compacted_first(db, org, monkeypatch):
+    hour = datetime(2020, 1, 1, 6)
+    ids = add_sketches(db, org["id"], hour, [10, 20])
+    execute = db.execute
+
+    def execute_after_other_compaction(statement, *args, **kwargs):
+        if getattr(statement, "is_delete", False):
+            with SessionLocal() as other:
+                other.execute(delete(UsageLatencySketch).where(UsageLatencySketch.id == ids[0]))
+                other.commit()
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", execute_after_other_compaction)
+    with pytest.raises(RuntimeError, match="compacted concurrently"):
+        _compact_sketches(db, hour, hour + timedelta(hours=1))
+    db.rollback()
+
+    remaining = db.scalar(select(func.count()).where(UsageLatencySketch.organization_id == org["id"]))
+    assert remaining == 1
+
+
+@pytest.fixture
+def expired_export_jobs(db, org, tmp_path, monkeypatch):
+    """Two expired completed jobs; only the first still has its artifact on disk."""
+    monkeypatch.setattr(export_jobs, "EXPORT_ARTIFACT_DIR", str(tmp_path))
+    expired = datetime.utcnow() - timedelta(minutes=1)
+    jobs = [
+        ExportJob(
+            id=uuid.uuid4().hex, organization_id=org["id"], dataset="items", format="csv", cache_key=str(n),
+            status="completed", file_name=f"{n}.csv", expires_at=expired,
+        )
+        for n in range(2)
+    ]
+    db.add_all(jobs)
+    db.commit()
+    (tmp_path / "0.csv").write_text("id\n")
+    return [job.id for job in jobs]
+
+
+def remaining_export_jobs(db, job_ids) -> int:
+    return db.scalar(select(func.count()).where(ExportJob.id.in_(job_ids)))
+
+
+def test_export_cleanup_runs_only_under_its_lease(db, expired_export_jobs, tmp_path, lease_held_elsewhere):
+    lease_held_elsewhere(EXPORT_CLEANUP_LEASE)
+
+    run_async(ExportCleanupJob(60).flush())
+    assert remaining_export_jobs(db, expired_export_jobs) == 2
+    assert (tmp_path / "0.csv").exists()
+
+
+def test_export_cleanup_treats_a_missing_artifact_as_removed(db, expired_export_jobs, tmp_path):
+    run_async(ExportCleanupJob(60).flush())
+
+    assert remaining_export_jobs(db, expired_export_jobs) == 0
+    assert not (tmp_path / "0.csv").exists()
+    db.execute(delete(JobLease).where(JobLease.name == EXPORT_CLEANUP_LEASE))
+    db.commit()
@@ -0,0 +1,41 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.export import export_service
+from app.services import delete_item
+
+from conftest import seed_items
+
+
+@pytest.mark.parametrize("count", [0, 1, 5])
+def test_streamed_json_document_matches_the_items(db, org, count, monkeypatch):
+    item_ids = seed_items(db, org, count) if count else []
+    iter_item_chunks = export_service.iter_item_chunks
+    monkeypatch.setattr(
+        export_service, "iter_item_chunks", lambda *args, **kwargs: iter_item_chunks(*args, chunk_size=2, **kwargs)
+    )
+
+    parts = list(export_service.stream_items_json(db, org["id"], include_comments=True))
+    document = json.loads("".join(parts))
+
+    assert len(parts) >= 2 + (count + 1) // 2
+    assert document["organization_id"] == org["id"]
+    assert document["total_items"] == count
+    assert sorted(item["id"] for item in document["items"]) == item_ids
+    assert all(item["comments"] == [] for item in document["items"])
+
+
+def test_streamed_json_document_lists_deletions_in_a_delta_window(db, org):
+    item_ids = seed_items(db, org, 3)
+    since = datetime.utcnow() - timedelta(minutes=1)
+    delete_item(db, item_ids[0], org["id"], org["users"][0])
+    window = export_service.delta_window(since, now=datetime.utcnow() + timedelta(hours=1))
+
+    document = json.loads(export_service.export_items_to_json(db, org["id"], window=window))
+
+    assert document["since"] == since.isoformat()
+    assert document["next_cursor"] == window[1].isoformat()
+    assert sorted(item["id"] for item in document["items"]) == item_ids[1:]
+    assert [deleted["id"] for deleted in document["deleted"]] == [item_ids[0]]
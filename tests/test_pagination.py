@@ -0,0 +1,109 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.models import ActivityLog, Comment, Item
+
+from conftest import api_client, auth_headers, run_async, seed_items
+
+# Seven rows over three timestamps, so pages end in the middle of a tie
+TIMESTAMPS = [datetime(2020, 1, 1) + timedelta(hours=h) for h in (2, 2, 2, 1, 1, 0, 0)]
+
+
+def newest_first(ids: list) -> list:
+    """ids (inserted in TIMESTAMPS order) as the listings order them: created_at DESC, id DESC."""
+    return [row_id for _, row_id in sorted(zip(TIMESTAMPS, ids), reverse=True)]
+
+
+def walk(path: str, headers: dict, limit: int, **params) -> list:
+    """Follow next_cursor from the first page to the last; returns the ids of every page."""
+    async def pages():
+        result, cursor = [], None
+        async with api_client() as client:
+            while True:
+                query = {**params, "limit": limit, **({"cursor": cursor} if cursor else {})}
+                response = await client.get(path, headers=headers, params=query)
+                assert response.status_code == 200, response.text
+                page = response.json()
+                result.append([row["id"] for row in page["items"]])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return result
+
+    return run_async(pages())
+
+
+@pytest.fixture
+def tied_items(db, org):
+    item_ids = seed_items(db, org, len(TIMESTAMPS))
+    for item_id, created_at in zip(item_ids, TIMESTAMPS):
+        db.execute(update(Item).where(Item.id == item_id).values(created_at=created_at))
+    db.commit()
+    return item_ids
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_items_cursor_walks_every_item_once(org, tied_items, limit):
+    pages = walk("/api/v1/items", auth_headers(org["users"][0]), limit)
+
+    assert [row_id for page in pages for row_id in page] == newest_first(tied_items)
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_comments_cursor_walks_every_comment_once(db, org, tied_items):
+    item_id = tied_items[0]
+    comment_ids = db.scalars(insert(Comment).returning(Comment.id, sort_by_parameter_order=True), [
+        {"content": f"Comment {n}", "item_id": item_id, "author_id": org["users"][0].id, "created_at": created_at}
+        for n, created_at in enumerate(TIMESTAMPS)
+    ]).all()
+    db.commit()
+
+    pages = walk(f"/api/v1/items/{item_id}/comments", auth_headers(org["users"][0]), 2)
+    assert [row_id for page in pages for row_id in page] == newest_first(comment_ids)
+
+
+def test_activity_cursor_walks_every_entry_once(db, org):
+    log_ids = db.scalars(insert(ActivityLog).returning(ActivityLog.id, sort_by_parameter_order=True), [
+        {"action": "created", "entity_type": "item", "entity_id": n, "organization_id": org["id"],
+         "created_at": created_at}
+        for n, created_at in enumerate(TIMESTAMPS)
+    ]).all()
+    db.commit()
+
+    pages = walk("/api/v1/activity", auth_headers(org["users"][0]), 3)
+    assert [row_id for page in pages for row_id in page] == newest_first(log_ids)
+
+
+def token(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    "%%%",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    token({"created_at": "2020-01-01T00:00:00", "id": 1}),
+    token(["2020-01-01T00:00:00"]),
+    token(["2020-01-01T00:00:00", 1, 2]),
+    token([None, 1]),
+    token(["yesterday", 1]),
+    token(["2020-01-01T00:00:00", "one"]),
+    token(["2020-01-01T00:00:00", 2 ** 70]),
+    token(["2020-01-01T00:00:00", -1]),
+])
+@pytest.mark.parametrize("path", ["/api/v1/items", "/api/v1/items/{item_id}/comments", "/api/v1/activity"])
+def test_bad_cursor_is_rejected(db, org, path, cursor):
+    (item_id,) = seed_items(db, org, 1)
+
+    async def get():
+        async with api_client() as client:
+            return await client.get(
+                path.format(item_id=item_id), headers=auth_headers(org["users"][0]), params={"cursor": cursor}
+            )
+
+    response = run_async(get())
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
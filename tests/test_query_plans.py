@@ -0,0 +1,67 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.cache import analytics_cache
+from app.database import Base, engine
+from app.models import Item, ItemStatus, PriorityLevel, Team
+from app.notifications import notification_service
+from app.services import get_item_analytics, get_items
+
+from conftest import capture_statements, seed_items
+
+TABLES = set(Base.metadata.tables)
+
+
+def full_table_scans(statement: str, parameters) -> list:
+    """Plan steps of a statement that read a whole table instead of using an index."""
+    with engine.connect() as conn:
+        plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    return [
+        step for step in plan
+        if (match := re.match(r"SCAN (\w+)$", step)) and match.group(1) in TABLES
+    ]
+
+
+@pytest.fixture
+def items(db, org):
+    team = Team(name="Team", organization_id=org["id"])
+    db.add(team)
+    db.flush()
+    item_ids = seed_items(db, org, 50)
+    now = datetime.utcnow()
+    db.execute(
+        update(Item).where(Item.id.in_(item_ids))
+        .values(team_id=team.id, due_date=now - timedelta(days=1), completed_at=now)
+    )
+    db.commit()
+    return {"team_id": team.id, "user_id": org["users"][0].id, "created_at": now, "item_id": item_ids[-1]}
+
+
+SERVICE_QUERIES = {
+    "get_items": lambda db, org_id, i: get_items(db, org_id),
+    "get_items by status": lambda db, org_id, i: get_items(db, org_id, status=ItemStatus.TODO),
+    "get_items by priority": lambda db, org_id, i: get_items(db, org_id, priority=PriorityLevel.HIGH),
+    "get_items by team": lambda db, org_id, i: get_items(db, org_id, team_id=i["team_id"]),
+    "get_items by assignee": lambda db, org_id, i: get_items(db, org_id, assigned_to=i["user_id"]),
+    "get_items after cursor": lambda db, org_id, i: get_items(db, org_id, cursor=(i["created_at"], i["item_id"])),
+    "get_item_analytics": lambda db, org_id, i: get_item_analytics(db, org_id),
+    "send_due_date_reminders": lambda db, org_id, i: notification_service.send_due_date_reminders(db),
+    "send_overdue_notifications": lambda db, org_id, i: notification_service.send_overdue_notifications(db),
+}
+
+
+@pytest.mark.parametrize("name", SERVICE_QUERIES)
+def test_service_queries_use_indexes(db, org, items, name, monkeypatch):
+    monkeypatch.setattr(notification_service, "send_email", lambda *args, **kwargs: True)
+    analytics_cache.clear()
+
+    with capture_statements() as statements:
+        SERVICE_QUERIES[name](db, org["id"], items)
+
+    selects = [(s, p) for s, p in statements if s.lstrip().upper().startswith("SELECT")]
+    assert selects
+    for statement, parameters in selects:
+        assert full_table_scans(statement, parameters) == [], statement
@@ -0,0 +1,22 @@
+from app.cache import user_report_cache
+from app.export import export_service
+
+from conftest import seed_items
+
+
+def test_user_report_callers_cannot_change_the_cached_report(db, org):
+    user = org["users"][0]
+    seed_items(db, org, 3)
+
+    first = export_service.generate_user_report(db, user.id, org["id"])
+    first["assigned_items"]["total"] = -1
+    first["priority_breakdown"].clear()
+    assert user_report_cache.get((org["id"], user.id))["assigned_items"]["total"] == 3
+
+    second = export_service.generate_user_report(db, user.id, org["id"])
+    assert second["assigned_items"]["total"] == 3
+    assert second["priority_breakdown"] == {"medium": 3}
+    second["recent_activities"].append({"action": "tampered"})
+
+    third = export_service.generate_user_report(db, user.id, org["id"])
+    assert third == {**second, "recent_activities": second["recent_activities"][:-1]}
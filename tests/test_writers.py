@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app import writers
+from app.models import UsageLog
+from app.writers import UsageLogWriter
+
+from conftest import run_async
+
+
+class FailingSession:
+    """Stands in for AsyncSessionLocal with a database that rejects every insert."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, *args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+
+def record(writer: UsageLogWriter, org_id: int, count: int, status_code: int = 200) -> None:
+    for _ in range(count):
+        writer.record(org_id, "GET /items", "GET", status_code, 5, timestamp=datetime(2020, 1, 1))
+
+
+def usage_logs(db, org_id: int) -> int:
+    return db.scalar(select(func.count()).where(UsageLog.organization_id == org_id))
+
+
+def test_usage_log_flush_keeps_records_when_the_insert_fails(db, org, monkeypatch):
+    writer = UsageLogWriter(buffer_size=10, flush_interval_seconds=0)
+    record(writer, org["id"], 4)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(writers, "AsyncSessionLocal", FailingSession)
+        with pytest.raises(RuntimeError):
+            run_async(writer.flush())
+    assert writer.dropped == 0
+
+    run_async(writer.flush())
+    assert usage_logs(db, org["id"]) == 4
+
+
+def test_usage_log_requeue_drops_the_oldest_records_that_no_longer_fit(db, other_org, monkeypatch):
+    writer = UsageLogWriter(buffer_size=5, flush_interval_seconds=0)
+    record(writer, other_org["id"], 4, status_code=500)
+
+    def record_during_flush():
+        record(writer, other_org["id"], 3)
+        return FailingSession()
+
+    monkeypatch.setattr(writers, "AsyncSessionLocal", record_during_flush)
+    with pytest.raises(RuntimeError):
+        run_async(writer.flush())
+
+    assert writer.dropped == 2
+    assert [entry["status_code"] for entry in writer._buffer] == [500, 500, 200, 200, 200]